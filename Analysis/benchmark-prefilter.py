@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+""" Benchmark the playing strength of ModelBot against the number of plays evaluated with the model per move (k = max_num_states),
+with and without the heuristic prefilter (num_candidates).
+Two ModelBots play against two MoskaBot3s, and the loss percent of the ModelBots is reported for each k, with the time taken.
+"""
+import logging
+import os
+import sys
+import time
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from Moska.Player.ModelBot import ModelBot
+from Moska.Player.MoskaBot3 import MoskaBot3
+from Moska.Model import ModelRegistry
+from new_moska import play_games
+
+model_file = ModelRegistry.DEFAULT_MODEL_FILE
+# The values of max_num_states to test
+ks = (5, 10, 25, 50, 100, 600)
+# The number of candidates ranked by the prefilter. None evaluates k random candidates.
+num_candidates = (None, 1000)
+ngames = 1000
+cpus = -1
+
+def benchmark(k : int, ncandidates : int):
+    """ Return the loss percent of ModelBot with max_num_states = k and num_candidates = ncandidates, and the time taken """
+    players = [
+        (ModelBot,lambda x : {"name" : f"M-{x}-1-", "model_file" : model_file, "max_num_states" : k, "num_candidates" : ncandidates}),
+        (ModelBot,lambda x : {"name" : f"M-{x}-2-", "model_file" : model_file, "max_num_states" : k, "num_candidates" : ncandidates}),
+        (MoskaBot3,lambda x : {"name" : f"Bot3-{x}-1-"}),
+        (MoskaBot3,lambda x : {"name" : f"Bot3-{x}-2-"}),
+    ]
+    gamekwargs = lambda x : {
+        "log_file" : f"Game-{x}.log",
+        "log_level" : logging.WARNING,
+        "timeout" : 20,
+    }
+    start = time.time()
+    # play_games returns the loss percent of the MoskaBot3s, so the ModelBots lost the rest of the games
+    bot3_loss = play_games(players, gamekwargs, n=ngames, cpus=cpus, disable_logging=True)
+    return 100 - bot3_loss, time.time() - start
+
+if __name__ == "__main__":
+    if not os.path.isdir("Logs"):
+        os.mkdir("Logs")
+    os.chdir("Logs/")
+    if not os.path.isdir("Vectors"):
+        os.mkdir("Vectors")
+    results = []
+    for ncandidates in num_candidates:
+        for k in ks:
+            loss, elapsed = benchmark(k, ncandidates)
+            results.append((ncandidates, k, loss, elapsed))
+    print("{:>14}{:>6}{:>12}{:>12}".format("num_candidates", "k", "M loss %", "time (s)"))
+    for ncandidates, k, loss, elapsed in results:
+        print("{:>14}{:>6}{:>12.2f}{:>12.1f}".format(str(ncandidates), k, loss, elapsed))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+""" Benchmark the speed of the FastGame engine loop with RolloutEvaluator.
+Rollouts are played from the start of random games, and from random positions where the deck has just run out,
+with each rollout policy. The rollouts per second are reported for each.
+"""
+import os
+import random
+import sys
+import time
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from Moska.Game import FastGame
+from Moska.Game.Rollouts import RolloutEvaluator
+
+policies = {"heuristic" : FastGame.heuristic_action, "random" : FastGame.random_action}
+nplayers = 4
+# The number of starting positions, and the number of rollouts from each
+npositions = 50
+nrollouts = 200
+seed = 0
+
+def random_game(rng : random.Random) -> FastGame.FastGame:
+    """ Deal a random game, with the triumph card at the bottom of the deck """
+    deck = list(range(52))
+    rng.shuffle(deck)
+    hands = [sum(1 << deck.pop() for _ in range(FastGame.HAND_SIZE)) for _ in range(nplayers)]
+    triumph = deck.pop()
+    deck.insert(0, triumph)
+    return FastGame.FastGame(hands, deck, "CDHS"[triumph % 4])
+
+def empty_deck_game(rng : random.Random) -> FastGame.FastGame:
+    """ Play a random game with the heuristic policy until the deck runs out """
+    while True:
+        game = random_game(rng)
+        while game.deck and not game.is_over():
+            game.apply(*FastGame.heuristic_action(game, rng))
+        if not game.is_over():
+            return game
+
+def benchmark(evaluator : RolloutEvaluator, games : list) -> float:
+    """ Return the rollouts per second from the games """
+    start = time.perf_counter()
+    for game in games:
+        evaluator.evaluate(game, nrollouts)
+    return len(games)*nrollouts / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    rng = random.Random(seed)
+    starts = {"game start" : [random_game(rng) for _ in range(npositions)],
+              "empty deck" : [empty_deck_game(rng) for _ in range(npositions)]}
+    print("{:>12}{:>12}{:>16}".format("policy", "position", "rollouts/s"))
+    for name, policy in policies.items():
+        evaluator = RolloutEvaluator(policy, seed=seed)
+        for position, games in starts.items():
+            print("{:>12}{:>12}{:>16.0f}".format(name, position, benchmark(evaluator, games)))
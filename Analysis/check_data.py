@@ -2,11 +2,24 @@
 import os
 import random
 import re
+import zlib
 import pandas as pd
 import tensorflow as tf
 
-def create_tf_dataset(paths, add_channel=False) -> tf.data.Dataset:
-    """ Create a tf dataset from a folder of files"""
+# The fraction of the files, that are never trained on (see is_held_out_file)
+HELD_OUT_FRACTION = 0.05
+
+def is_held_out_file(file_path, fraction=HELD_OUT_FRACTION) -> bool:
+    """ Whether the file is held out of training. The split is decided by a hash of the file name,
+    so it doesn't depend on the order of the files, the shuffle, or the folder the file is in.
+    """
+    return zlib.crc32(os.path.basename(file_path).encode()) % 10000 < fraction * 10000
+
+def create_tf_dataset(paths, add_channel=False, split=None) -> tf.data.Dataset:
+    """ Create a tf dataset from a folder of files.
+    If split is "train", the held-out files (see is_held_out_file) are left out, and if split is "held-out", only they are used.
+    By default all files are used.
+    """
     if not isinstance(paths, (list, tuple)):
         try:
             paths = [paths]
@@ -17,6 +30,12 @@ def create_tf_dataset(paths, add_channel=False) -> tf.data.Dataset:
         if not os.path.isdir(path):
             raise ValueError(f"Path {path} is not a directory")
         file_paths += [os.path.join(path, file) for file in os.listdir(path)]
+    if split == "train":
+        file_paths = [file for file in file_paths if not is_held_out_file(file)]
+    elif split == "held-out":
+        file_paths = [file for file in file_paths if is_held_out_file(file)]
+    elif split is not None:
+        raise ValueError(f"Unknown split '{split}'")
     print("Number of files: " + str(len(file_paths)))
     random.shuffle(file_paths)
     print("Shuffled files.")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+""" Export a Keras Dense/BatchNormalization/Dropout model to a .npz file for Moska.Model.NumpyModel,
+with the batch normalizations folded into the Dense layers.
+If the TFLite conversion of the model exists, the outputs of the NumPy model are validated against it.
+"""
+import os
+import sys
+import numpy as np
+import tensorflow as tf
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from Moska.Model.NumpyModel import NumpyModel, fold_batch_norms, save_model
+
+file_path = "/home/ilmari/python/moska/ModelMB2/model.h5"
+output_file = None
+tflite_file = None
+# The maximum allowed absolute difference to the TFLite model
+tolerance = 1e-4
+
+def keras_to_layers(model : tf.keras.Model):
+    """ Return the layers of the model in the format of NumpyModel.fold_batch_norms """
+    layers = []
+    for layer in model.layers:
+        config = layer.get_config()
+        if isinstance(layer, tf.keras.layers.Dense):
+            W, b = layer.get_weights() if config["use_bias"] else (layer.get_weights()[0], np.zeros(config["units"]))
+            layers.append(("dense", W, b, config["activation"]))
+        elif isinstance(layer, tf.keras.layers.BatchNormalization):
+            weights = layer.get_weights()
+            gamma = weights.pop(0) if config["scale"] else 1
+            beta = weights.pop(0) if config["center"] else 0
+            mean, var = weights
+            layers.append(("batchnorm", gamma, beta, mean, var, config["epsilon"]))
+        elif isinstance(layer, tf.keras.layers.Activation):
+            if not layers or layers[-1][0] != "dense" or layers[-1][3] != "linear":
+                raise ValueError(f"Activation layer '{layer.name}' must follow a Dense layer without an activation")
+            layers[-1] = layers[-1][:3] + (config["activation"],)
+        elif isinstance(layer, (tf.keras.layers.Dropout, tf.keras.layers.InputLayer)):
+            continue
+        else:
+            raise ValueError(f"Layer '{layer.name}' of type {type(layer).__name__} can not be exported")
+    return layers
+
+def validate_against_tflite(npz_file : str, tflite_file : str, input_length : int, n : int = 1000) -> float:
+    """ Return the maximum absolute difference of the NumPy and TFLite models on 'n' random states """
+    rng = np.random.default_rng(0)
+    # States have small non-negative integers, some -1's and the player statuses
+    X = rng.integers(-1, 8, size=(n, input_length)).astype(np.float32)
+    interpreter = tf.lite.Interpreter(model_path=tflite_file)
+    input_details = interpreter.get_input_details()
+    interpreter.resize_tensor_input(input_details[0]["index"], X.shape)
+    interpreter.allocate_tensors()
+    interpreter.set_tensor(input_details[0]["index"], X)
+    interpreter.invoke()
+    tflite_out = interpreter.get_tensor(interpreter.get_output_details()[0]["index"])
+    numpy_out = NumpyModel(npz_file).predict(X)
+    return float(np.max(np.abs(tflite_out - numpy_out)))
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        file_path = sys.argv[1]
+    if output_file is None:
+        output_file = os.path.splitext(file_path)[0] + ".npz"
+    if tflite_file is None:
+        tflite_file = os.path.splitext(file_path)[0] + ".tflite"
+    print("Exporting '{}' to '{}'".format(file_path, output_file))
+    model = tf.keras.models.load_model(file_path, compile=False)
+    weights, biases, activations = fold_batch_norms(keras_to_layers(model))
+    save_model(output_file, weights, biases, activations)
+    print("Layers: {}".format([(W.shape, act) for W, act in zip(weights, activations)]))
+    if os.path.exists(tflite_file):
+        diff = validate_against_tflite(output_file, tflite_file, weights[0].shape[0])
+        print("Maximum absolute difference to '{}': {}".format(tflite_file, diff))
+        if diff > tolerance:
+            raise ValueError("The exported model differs from the TFLite model by more than {}".format(tolerance))
+    else:
+        print("No TFLite model found at '{}', skipping validation".format(tflite_file))
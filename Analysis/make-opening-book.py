@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+""" Create an OpeningBook of the first InitialPlay of a game.
+The canonical opening hands (see OpeningBook.canonical_hands) are evaluated, and the chosen play of each hand is written to 'book_file'.
+With the "heuristic" evaluator the play is FastGame.heuristic_initial_play.
+With the "rollouts" evaluator every candidate play is evaluated with 'nrollouts' rollouts of 'rollout_policy' over random deals,
+and the play with which the initiator lost least often is chosen.
+The triumph card at the bottom of the deck is not a part of the key of the book, so each hand is evaluated with a random triumph card.
+"""
+import multiprocessing
+import os
+import random
+import sys
+import time
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from Moska.Game import FastGame, utils
+from Moska.Game.DealSampler import DealSampler
+from Moska.Game.Rollouts import RolloutEvaluator
+from Moska.Player.OpeningBook import CANONICAL_TRIUMPH, NSUITS, OpeningBook, canonical_hands
+
+nplayers = 4
+# "heuristic" or "rollouts"
+evaluator = "rollouts"
+rollout_policy = FastGame.heuristic_action
+nrollouts = 100
+# Evaluate a random sample of this many canonical hands. None evaluates all of them.
+max_hands = 10000
+book_file = f"opening-book-{nplayers}.npz"
+cpus = os.cpu_count()
+chunk_size = 200
+seed = 0
+
+def opening(hand : int, rng : random.Random):
+    """ Return the opening game, where the last player initiates with 'hand' on the first player, and the sampler of the hidden cards """
+    initiator = nplayers - 1
+    bottom_card = rng.choice([c for c in range(utils.SUIT_INDEX[CANONICAL_TRIUMPH], 52, NSUITS) if not hand >> c & 1])
+    known = [0]*nplayers
+    known[initiator] = hand
+    nunknown = [FastGame.HAND_SIZE]*nplayers
+    nunknown[initiator] = 0
+    hidden = [c for c in range(52) if not hand >> c & 1 and c != bottom_card]
+    sampler = DealSampler(hidden, known, nunknown, 52 - FastGame.HAND_SIZE*nplayers, bottom_card)
+    hands, deck = sampler.sample(rng)
+    game = FastGame.FastGame(hands, deck, CANONICAL_TRIUMPH, ptr=0, current=initiator)
+    return game, sampler
+
+def evaluate(args):
+    """ Return the (hand, play) of each hand in a chunk of hands """
+    hands, chunk_seed = args
+    rng = random.Random(chunk_seed)
+    rollouts = RolloutEvaluator(rollout_policy, seed=chunk_seed)
+    out = []
+    for hand in hands:
+        game, sampler = opening(hand, rng)
+        if evaluator == "heuristic":
+            play = FastGame.heuristic_initial_play(game, hand)
+        else:
+            actions = FastGame.candidate_actions(game)
+            losses = [rollouts.evaluate(game, nrollouts, sampler, action)[game.current] for action in actions]
+            play = actions[losses.index(min(losses))][1]
+        out.append((hand, play))
+    return out
+
+if __name__ == "__main__":
+    start = time.time()
+    hands = list(canonical_hands())
+    print(f"Found {len(hands)} canonical hands in {time.time() - start:.1f} s")
+    rng = random.Random(seed)
+    if max_hands is not None and max_hands < len(hands):
+        hands = rng.sample(hands, max_hands)
+    chunks = [(hands[i:i+chunk_size], rng.random()) for i in range(0, len(hands), chunk_size)]
+    book = OpeningBook(nplayers)
+    with multiprocessing.Pool(cpus) as pool:
+        for i, results in enumerate(pool.imap_unordered(evaluate, chunks)):
+            for hand, play in results:
+                book.set(hand, CANONICAL_TRIUMPH, play)
+            print(f"Evaluated {min((i+1)*chunk_size, len(hands))}/{len(hands)} hands in {time.time() - start:.1f} s", end="\r")
+    print()
+    book.save(book_file)
+    print(f"Saved {len(book)} hands to {book_file} ({os.path.getsize(book_file)/1024:.0f} kB) in {time.time() - start:.1f} s")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+""" Post-training quantization of a Keras model to int8 and float16 TFLite models.
+The int8 model is calibrated on a representative sample of the recorded state vectors.
+The accuracy of the float, float16 and int8 models on held-out states is reported next to their measured latency,
+so the quantized model can be chosen for ModelBot (model_file="...-int8.tflite") if the accuracy loss is acceptable.
+"""
+import os
+import sys
+import time
+import numpy as np
+import tensorflow as tf
+from check_data import create_tf_dataset
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from Moska.Model.TFLiteModel import TFLiteModel
+
+file_path = "/home/ilmari/python/moska/ModelMB2/model.h5"
+data_path = "./Data/MB1Logs168k/Logs/Vectors/"
+# The number of states used to calibrate the int8 model
+representative_length = 2000
+# The number of held-out states used to measure the accuracy. They are read from the files, that train_model.py
+# leaves out of training (see check_data.is_held_out_file).
+test_length = 20000
+# The batch sizes to measure the latency with. ModelBot evaluates all the possible moves of a decision in one batch.
+latency_batch_sizes = (1, 64, 600)
+latency_repeats = 50
+
+def representative_dataset_gen(dataset : tf.data.Dataset, n : int):
+    """ Return a generator of single states for TFLiteConverter.representative_dataset """
+    def gen():
+        for x, _ in dataset.take(n):
+            yield [tf.expand_dims(tf.cast(x, tf.float32), axis=0)]
+    return gen
+
+def convert(model : tf.keras.Model, output_file : str, quantization : str = "float", representative_dataset = None) -> str:
+    """ Convert the model to TFLite, and write it to 'output_file'.
+
+    Args:
+        model (tf.keras.Model): The model to convert
+        output_file (str): Where to write the model
+        quantization (str, optional): "float", "float16" (float16 weights) or "int8" (int8 weights and activations, float inputs and outputs). Defaults to "float".
+        representative_dataset (optional): The calibration data generator. Required with "int8".
+
+    Returns:
+        str: output_file
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantization == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        if representative_dataset is None:
+            raise ValueError("The int8 quantization requires a representative dataset")
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    elif quantization != "float":
+        raise ValueError(f"Unknown quantization '{quantization}'")
+    with open(output_file, "wb") as f:
+        f.write(converter.convert())
+    return output_file
+
+def load_test_data(dataset : tf.data.Dataset, n : int):
+    """ Return the first 'n' states and labels of the dataset as numpy arrays """
+    X, y = [], []
+    for x, label in dataset.take(n):
+        X.append(x.numpy())
+        y.append(label.numpy())
+    return np.array(X, dtype=np.float32), np.array(y, dtype=np.float32)
+
+def measure_latency(model : TFLiteModel, X : np.ndarray, batch_size : int, repeats : int = latency_repeats) -> float:
+    """ Return the median time (ms) to evaluate a batch of 'batch_size' states """
+    batch = X[:batch_size]
+    # The first call allocates the interpreter of the batch size
+    model.predict(batch)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(batch)
+        times.append(time.perf_counter() - start)
+    return 1000 * float(np.median(times))
+
+def report(model_files : dict, X : np.ndarray, y : np.ndarray) -> None:
+    """ Print the accuracy and latency of each model, and the largest difference to the float model """
+    reference = None
+    header = "{:<10}{:>10}{:>10}{:>12}".format("model", "size (kB)", "accuracy", "max diff") + "".join("{:>14}".format(f"ms/batch {b}") for b in latency_batch_sizes)
+    print(header)
+    for name, path in model_files.items():
+        model = TFLiteModel(path)
+        evals = model.predict(X)[:,0]
+        if reference is None:
+            reference = evals
+        accuracy = float(np.mean((evals > 0.5) == (y > 0.5)))
+        diff = float(np.max(np.abs(evals - reference)))
+        latencies = [measure_latency(model, X, b) for b in latency_batch_sizes]
+        row = "{:<10}{:>10.1f}{:>10.4f}{:>12.5f}".format(name, os.path.getsize(path) / 1000, accuracy, diff)
+        print(row + "".join("{:>14.3f}".format(t) for t in latencies))
+    return
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        file_path = sys.argv[1]
+    if len(sys.argv) > 2:
+        data_path = sys.argv[2]
+    test_ds = create_tf_dataset(data_path, add_channel=False, split="held-out").take(test_length)
+    calibration_ds = create_tf_dataset(data_path, add_channel=False, split="train")
+    model = tf.keras.models.load_model(file_path, compile=False)
+    base = os.path.splitext(file_path)[0]
+    model_files = {}
+    print("Converting '{}'".format(file_path))
+    model_files["float"] = convert(model, base + ".tflite", "float")
+    model_files["float16"] = convert(model, base + "-float16.tflite", "float16")
+    model_files["int8"] = convert(model, base + "-int8.tflite", "int8", representative_dataset_gen(calibration_ds, representative_length))
+    X, y = load_test_data(test_ds, test_length)
+    print("Evaluating on {} held-out states".format(len(X)))
+    report(model_files, X, y)
@@ -84,7 +84,7 @@ def get_transfer_model():
     return new_model
 
 if __name__ == "__main__":
-    all_dataset = create_tf_dataset("./Data/MB1Logs168k/Logs/Vectors/",add_channel=False)
+    all_dataset = create_tf_dataset("./Data/MB1Logs168k/Logs/Vectors/",add_channel=False,split="train")
     model = get_loaded_model("./Model6-39/model.h5")
     VALIDATION_LENGTH = 100000
     TEST_LENGTH = 100000
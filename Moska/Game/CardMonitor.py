@@ -2,8 +2,9 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, List, Tuple
 
 from Moska.Player.AbstractPlayer import AbstractPlayer
-from .Deck import Card, StandardDeck
-from .utils import check_can_fall_card
+from .Deck import Card
+from .CardSet import CardSet, FULL_MASK, cards_to_mask
+from . import utils
 if TYPE_CHECKING:
     from .Game import MoskaGame
     
@@ -37,35 +38,42 @@ class CardMonitor:
         self.started = True
         return
     
+    def copy(self, moskaGame : MoskaGame) -> CardMonitor:
+        """ Return a copy of the monitored knowledge, attached to 'moskaGame' (a clone of the game).
+        The lists of cards_fall_dict are never modified inplace, so the copy shares them.
+        """
+        new = CardMonitor(moskaGame)
+        new.player_cards = {name : list(cards) for name, cards in self.player_cards.items()}
+        new.cards_fall_dict = dict(self.cards_fall_dict)
+        new.started = self.started
+        return new
+    
     def get_cards_possibly_in_deck(self,player : AbstractPlayer = None) -> set[Card]:
         """Get a list of cards that are possibly in the deck. This is done by checking which cards are not known to the player.
         """
-        cards_not_in_deck = self.game.fell_cards + self.game.cards_to_fall
+        return set(CardSet(self.get_cards_possibly_in_deck_mask(player)))
+    
+    def get_cards_possibly_in_deck_mask(self, player : AbstractPlayer = None) -> int:
+        """ Return the cards possibly in the deck (see 'get_cards_possibly_in_deck') as a bit mask (see CardSet):
+        The cards still in the game, that are not on the table, in the players hand, or known to be in an opponents hand.
+        """
+        not_in_deck = self.game.get_table_card_set().mask
         if player is not None:
-            cards_not_in_deck += player.hand.copy().cards
+            not_in_deck |= player.hand.card_set.mask
         for pl, cards in self.player_cards.items():
             if player is not None and pl == player.name:
                 continue
-            for card in cards:
-                if card != Card(-1,"X"):
-                    cards_not_in_deck.append(card)
-        #self.player.plog.debug(f"Cards NOT in deck: {len(cards_not_in_deck)}")
-        cards_possibly_in_deck = set(self.game.card_monitor.cards_fall_dict.keys()).difference(cards_not_in_deck)
-        #self.player.plog.debug(f"Cards possibly in deck: {len(cards_possibly_in_deck)}")
-        return cards_possibly_in_deck
+            # Unknown cards have a negative id
+            not_in_deck |= cards_to_mask(card for card in cards if card.id >= 0)
+        return cards_to_mask(self.cards_fall_dict.keys()) & ~not_in_deck
         
     def make_cards_fall_dict(self):
-        """Create the cards_fall_dict by going through each card and checking if each card can be fell with the card
+        """Create the cards_fall_dict, by looking up which cards each card can fall from the precomputed tables in utils.CAN_FALL_MASKS
         """
-        deck = StandardDeck().pop_cards(52)
-        for i,card in enumerate(deck):
-            self.cards_fall_dict[card] = []
-            for i2,card2 in enumerate(deck):
-                if i == i2:
-                    continue
-                # Requires the game to be started, otherwise we have no information on the triumph suit
-                if check_can_fall_card(card,card2,self.game.triumph):
-                    self.cards_fall_dict[card].append(card2)
+        # Requires the game to be started, otherwise we have no information on the triumph suit
+        can_fall_masks = utils.CAN_FALL_MASKS[self.game.triumph]
+        for card in CardSet(FULL_MASK):
+            self.cards_fall_dict[card] = CardSet(can_fall_masks[card.id]).cards()
         return
     
     def update_from_move(self, moveid : str, args : Tuple) -> None:
@@ -79,6 +87,9 @@ class CardMonitor:
             None
         """
         player = args[0]
+        # Record the monitored hand, so the move can be undone
+        if self.game.undo_log is not None:
+            self.game.undo_log.save_list(self.player_cards[player.name])
         if moveid == "EndTurn":
             picked = args[1]
             self.update_known(player.name,picked,add=True)
@@ -103,17 +114,23 @@ class CardMonitor:
         Args:
             cards (List[Card]): _description_
         """
+        log = self.game.undo_log
         # Remove the removed cards from the cards_fall_dict
         for card in cards:
             # Remove the fallen card as a key
             if card in self.cards_fall_dict:
+                if log is not None:
+                    log.save_fall_dict_entry(card, removed=True)
                 self.cards_fall_dict.pop(card)
                 self.game.glog.debug(f"Removed {card} from cards_fall_dict keys")
-        # Remove the card as value from the list
+        # Remove the card as value from the list. The lists are replaced instead of modified inplace, so copies of the card monitor can share them.
         for card_d, falls in self.cards_fall_dict.copy().items():
             for card in cards:
                 if card in falls:
-                    self.cards_fall_dict[card_d].remove(card)
+                    if log is not None:
+                        log.save_fall_dict_entry(card_d)
+                    falls = [c for c in falls if c != card]
+                    self.cards_fall_dict[card_d] = falls
                     self.game.glog.debug(f"Removed {card} from {card_d} list of cards")
         for card,falls in self.cards_fall_dict.items():
             self.game.glog.info(f"{card} : {len(falls)}")
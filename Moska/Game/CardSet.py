@@ -0,0 +1,156 @@
+from __future__ import annotations
+from typing import Iterable, Iterator, List, Set
+from . import utils
+from .Deck import Card, REFERENCE_DECK
+
+# Bit masks of all cards with a certain value, and of all cards with a certain suit
+VALUE_MASKS = {v : sum(1 << c.id for c in REFERENCE_DECK if c.value == v) for v in utils.CARD_VALUES}
+SUIT_MASKS = {s : sum(1 << c.id for c in REFERENCE_DECK if c.suit == s) for s in utils.CARD_SUITS}
+FULL_MASK = (1 << len(REFERENCE_DECK)) - 1
+# The lowest bit of each value group of four bits
+_VALUE_GROUP_LSB = sum(1 << (i*len(utils.CARD_SUITS)) for i in range(len(utils.CARD_VALUES)))
+
+
+class CardSet:
+    """ An immutable set of cards, represented as a 52-bit integer where bit 'card.id' denotes the card.
+    Union, intersection, difference, membership and the value and suit queries are single integer operations,
+    so this can be used instead of lists of cards, where the order of the cards doesn't matter.
+    
+    Eq.
+    hand = CardSet.from_cards(player.hand.cards)
+    table = CardSet.from_cards(game.cards_to_fall)
+    print(hand.values() & table.values())
+    """
+    __slots__ = ("mask",)
+    
+    def __init__(self, mask : int = 0):
+        """ Create a CardSet from a bit mask.
+
+        Args:
+            mask (int, optional): The bits of the cards in the set. Defaults to 0 (an empty set).
+        """
+        object.__setattr__(self, "mask", mask)
+    
+    def __setattr__(self, name, value):
+        raise TypeError(f"CardSet is immutable.")
+    
+    @classmethod
+    def from_cards(cls, cards : Iterable[Card]) -> CardSet:
+        """ Create a CardSet from an iterable of cards. """
+        return cls(cards_to_mask(cards))
+    
+    @classmethod
+    def of_value(cls, value : int) -> CardSet:
+        """ Return the set of all cards with the value """
+        return cls(VALUE_MASKS[value])
+    
+    @classmethod
+    def of_suit(cls, suit : str) -> CardSet:
+        """ Return the set of all cards with the suit """
+        return cls(SUIT_MASKS[suit])
+    
+    def __contains__(self, card : Card) -> bool:
+        return card.id >= 0 and bool(self.mask >> card.id & 1)
+    
+    def __iter__(self) -> Iterator[Card]:
+        """ Iterate over the cards in the set, in the order of their index """
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            yield REFERENCE_DECK[low.bit_length() - 1]
+            mask ^= low
+    
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+    
+    def __bool__(self) -> bool:
+        return self.mask != 0
+    
+    def __or__(self, other : CardSet) -> CardSet:
+        return CardSet(self.mask | other.mask)
+    
+    def __and__(self, other : CardSet) -> CardSet:
+        return CardSet(self.mask & other.mask)
+    
+    def __sub__(self, other : CardSet) -> CardSet:
+        return CardSet(self.mask & ~other.mask)
+    
+    def __xor__(self, other : CardSet) -> CardSet:
+        return CardSet(self.mask ^ other.mask)
+    
+    def __le__(self, other : CardSet) -> bool:
+        """ Whether self is a subset of other """
+        return self.mask & ~other.mask == 0
+    
+    def __ge__(self, other : CardSet) -> bool:
+        """ Whether self is a superset of other """
+        return other.mask & ~self.mask == 0
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CardSet):
+            return False
+        return self.mask == other.mask
+    
+    def __hash__(self) -> int:
+        return hash(self.mask)
+    
+    def __repr__(self) -> str:
+        return f"CardSet({self.cards()})"
+    
+    def cards(self) -> List[Card]:
+        """ Return a list view of the cards in the set """
+        return list(self)
+    
+    def with_value(self, value : int) -> CardSet:
+        """ Return the cards in self, that have the value """
+        return CardSet(self.mask & VALUE_MASKS[value])
+    
+    def with_suit(self, suit : str) -> CardSet:
+        """ Return the cards in self, that have the suit """
+        return CardSet(self.mask & SUIT_MASKS[suit])
+    
+    def with_values_of(self, other : CardSet) -> CardSet:
+        """ Return the cards in self, whose value is the value of some card in other """
+        return CardSet(self.mask & value_cover(other.mask))
+    
+    def value_bits(self) -> int:
+        """ Return a 13-bit integer, where bit i is set if the set contains a card with the value CARD_VALUES[i] """
+        return value_bits(self.mask)
+    
+    def values(self) -> Set[int]:
+        """ Return the set of values of the cards in self """
+        return bits_to_values(self.value_bits())
+
+
+def cards_to_mask(cards : Iterable[Card]) -> int:
+    """ Return the bit mask of the cards in the iterable """
+    mask = 0
+    for card in cards:
+        mask |= 1 << card.id
+    return mask
+
+def value_cover(mask : int) -> int:
+    """ Return the mask of all cards, that have the same value as some card in the mask """
+    # Collect the four suit bits of each value to the lowest bit of the group, and spread it back to the whole group.
+    # The groups don't overlap, so the multiplication has no carries.
+    mask |= mask >> 1
+    mask |= mask >> 2
+    return (mask & _VALUE_GROUP_LSB) * 0b1111
+
+def value_bits(mask : int) -> int:
+    """ Fold a card mask to a 13-bit integer, where bit i is set if the mask has a card with the value CARD_VALUES[i]"""
+    mask |= mask >> 1
+    mask |= mask >> 2
+    mask &= _VALUE_GROUP_LSB
+    out = 0
+    i = 0
+    while mask:
+        if mask & 1:
+            out |= 1 << i
+        mask >>= len(utils.CARD_SUITS)
+        i += 1
+    return out
+
+def bits_to_values(bits : int) -> Set[int]:
+    """ Convert the output of value_bits to a set of card values """
+    return {v for i,v in enumerate(utils.CARD_VALUES) if bits >> i & 1}
@@ -0,0 +1,131 @@
+from __future__ import annotations
+import random
+from typing import TYPE_CHECKING, Iterable, List, Sequence, Tuple
+import numpy as np
+from .CardSet import cards_to_mask
+from .FastGame import iter_bits
+if TYPE_CHECKING:
+    from .Deck import Card
+    from .Game import MoskaGame
+    from .GameState import GameState
+    from ..Player.AbstractPlayer import AbstractPlayer
+
+
+class DealSampler:
+    """ Samples deals (determinizations) of the cards hidden from a player, consistently with what the player knows.
+
+    The hidden cards are the cards still in the game, that are not on the table, in the players hand, or known to be
+    in an opponents hand (see CardMonitor). A deal fills the unknown cards of each hand and the deck with the hidden cards
+    uniformly at random. The known cards stay in their hands, and the triumph card stays at the bottom of the deck.
+
+    The deals use the conventions of FastGame: hands are bit masks (see CardSet) indexed by pid,
+    and decks are lists of card ids with the top card last and the bottom card first.
+    The sampler is built once per decision, after which sampling only shuffles the hidden cards.
+    """
+    def __init__(self, hidden : Sequence[int], known : Sequence[int], nunknown : Sequence[int], deck_size : int, bottom_card : int = -1):
+        """
+        Args:
+            hidden (Sequence[int]): The ids of the hidden cards.
+            known (Sequence[int]): The known cards of each player as bit masks.
+            nunknown (Sequence[int]): The number of unknown cards in each players hand.
+            deck_size (int): The number of cards in the deck.
+            bottom_card (int, optional): The id of the known bottom card of the deck (the triumph card), which is not hidden. Defaults to -1 (none).
+
+        Raises:
+            ValueError: If the number of hidden cards doesn't match the number of unknown cards in the hands and the deck.
+        """
+        self.hidden = list(hidden)
+        self.known = list(known)
+        self.nunknown = list(nunknown)
+        self.deck_size = deck_size
+        self.bottom_card = bottom_card
+        # The bottom card of the deck is known
+        self.deck_unknown = deck_size - 1 if bottom_card >= 0 and deck_size > 0 else deck_size
+        if any(n < 0 for n in self.nunknown) or self.deck_unknown < 0 or len(self.hidden) != sum(self.nunknown) + self.deck_unknown:
+            raise ValueError(f"Can't deal {len(self.hidden)} hidden cards to {self.nunknown} unknown cards in hands and {self.deck_unknown} in the deck")
+        self._hidden_array = np.array(self.hidden, dtype=np.int64)
+
+    @classmethod
+    def from_game(cls, moskaGame : MoskaGame, player : AbstractPlayer) -> DealSampler:
+        """ Create a sampler of the cards hidden from 'player' in 'moskaGame' """
+        monitor = moskaGame.card_monitor
+        hidden = monitor.get_cards_possibly_in_deck_mask(player)
+        known = []
+        nunknown = []
+        for pl in moskaGame.players:
+            if pl is player:
+                mask = pl.hand.card_set.mask
+            else:
+                mask = cards_to_mask(card for card in monitor.player_cards[pl.name] if card.id >= 0)
+            known.append(mask)
+            nunknown.append(len(pl.hand) - mask.bit_count())
+        bottom_card = -1
+        if len(moskaGame.deck) > 0:
+            bottom_card = moskaGame.triumph_card.id
+            hidden &= ~(1 << bottom_card)
+        return cls(list(iter_bits(hidden)), known, nunknown, len(moskaGame.deck), bottom_card)
+
+    @classmethod
+    def from_state(cls, state : GameState, pid : int = None, hand : Iterable[Card] = None) -> DealSampler:
+        """ Create a sampler of the cards hidden in 'state'. The state only contains the cards known to everyone,
+        so the bottom card of the deck is hidden too.
+
+        Args:
+            state (GameState): The state
+            pid (int, optional): The pid of the player, whose 'hand' is known. Defaults to None (no hand is known).
+            hand (Iterable[Card], optional): The cards in the hand of player 'pid'. Defaults to None.
+        """
+        known = [cards_to_mask(card for card in cards if card.id >= 0) for cards in state.player_cards]
+        if pid is not None and hand is not None:
+            known[pid] |= cards_to_mask(hand)
+        hidden = cards_to_mask(state.cards_fall) & ~cards_to_mask(state.cards_on_table) & ~cards_to_mask(state.fell_cards)
+        for mask in known:
+            hidden &= ~mask
+        nunknown = [len(cards) - mask.bit_count() for cards, mask in zip(state.player_cards, known)]
+        return cls(list(iter_bits(hidden)), known, nunknown, state.deck_left)
+
+    def sample(self, rng : random.Random = random) -> Tuple[List[int],List[int]]:
+        """ Sample one deal.
+
+        Returns:
+            Tuple[List[int],List[int]]: The hands of the players as bit masks, and the deck as card ids with the top card last.
+        """
+        cards = self.hidden.copy()
+        rng.shuffle(cards)
+        hands = []
+        dealt = 0
+        for mask, n in zip(self.known, self.nunknown):
+            for card in cards[dealt:dealt+n]:
+                mask |= 1 << card
+            hands.append(mask)
+            dealt += n
+        deck = cards[dealt:]
+        if self.bottom_card >= 0 and self.deck_size > 0:
+            deck.insert(0, self.bottom_card)
+        return hands, deck
+
+    def sample_batch(self, n : int, rng : np.random.Generator = None) -> Tuple[np.ndarray,np.ndarray]:
+        """ Sample 'n' deals at once.
+
+        Args:
+            n (int): The number of deals.
+            rng (np.random.Generator, optional): The random generator. Defaults to None (a freshly seeded generator).
+
+        Returns:
+            Tuple[np.ndarray,np.ndarray]: The hands as an (n, nplayers) int64 array of bit masks,
+            and the decks as an (n, deck_size) array of card ids with the top card last.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        # Each row is a random permutation of the hidden cards
+        cards = rng.permuted(np.broadcast_to(self._hidden_array, (n, len(self.hidden))), axis=1)
+        bits = np.left_shift(np.int64(1), cards)
+        hands = np.empty((n, len(self.known)), dtype=np.int64)
+        dealt = 0
+        for i, (mask, m) in enumerate(zip(self.known, self.nunknown)):
+            hands[:, i] = np.bitwise_or.reduce(bits[:, dealt:dealt+m], axis=1) | mask if m > 0 else mask
+            dealt += m
+        decks = cards[:, dealt:]
+        if self.bottom_card >= 0 and self.deck_size > 0:
+            decks = np.concatenate((np.full((n, 1), self.bottom_card, dtype=np.int64), decks), axis=1)
+        return hands, decks
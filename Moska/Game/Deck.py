@@ -7,30 +7,46 @@ from . import utils
 
 class Card:
     """ A class representing a card.
-    This is sort of like a named tuple, but with more freedom to customize
+    There is only one instance of each card: Card(value,suit) always returns the same, immutable object.
+    The 52 cards have ids 0...51 (see utils.card_index), and the unknown card Card(-1,"X") has id -1.
+    
+    Cards don't carry game or player specific information; whether a card is kopled is stored in the MoskaGame,
+    and the scores of cards are stored in each players _ScoreCards -instance.
     """
-    value : int = None
-    suit : str = None
-    kopled : bool = False
-    score : int = None
-    _frozen : bool = False
-    
-    def __init__(self,value,suit,kopled=False,score=None):
-        self.value = value
-        self.suit = suit
-        self.kopled = kopled
-        self.score = score
-        self._frozen = True
+    __slots__ = ("value","suit","id","_hash")
+    _instances = {}
+    
+    def __new__(cls,value,suit):
+        """ Return the canonical instance of the card """
+        try:
+            return cls._instances[(value,suit)]
+        except KeyError:
+            pass
+        card = object.__new__(cls)
+        object.__setattr__(card,"value",value)
+        object.__setattr__(card,"suit",suit)
+        object.__setattr__(card,"id",utils.card_index(card) if suit in utils.SUIT_INDEX else -1)
+        object.__setattr__(card,"_hash",hash(card.id))
+        cls._instances[(value,suit)] = card
+        return card
     
     def __setattr__(self, name, value):
-        ## TODO
-        if name in ["value","suit"] and self._frozen:
-            raise TypeError(f"{name} can not be set, as it is frozen.")
-        super.__setattr__(self,name, value)
+        raise TypeError(f"{name} can not be set, as Card is immutable.")
+    
+    def __reduce__(self):
+        """ Unpickle (for ex. when sending to another process) to the canonical instance """
+        return (Card,(self.value,self.suit))
+    
+    def __copy__(self):
+        return self
+    
+    def __deepcopy__(self,memo):
+        return self
     
     def __hash__(self):
-        """ Only hash by value and suit """
-        return hash((self.value,self.suit))
+        """ Only hash by value and suit (the id of the card). The hash (and the order of sets of cards)
+        doesn't depend on the process' string hash randomization """
+        return self._hash
         
     
     def __repr__(self) -> str:
@@ -48,9 +64,13 @@ class Card:
         return self.value < other.value
     
     def __eq__(self,other):
-        return self.value == other.value and self.suit == other.suit
+        return self is other or (self.value == other.value and self.suit == other.suit)
     
 
+# The canonical cards ordered by id, and the unknown card
+REFERENCE_DECK = tuple(Card(v,s) for v,s in it.product(utils.CARD_VALUES,utils.CARD_SUITS))
+UNKNOWN_CARD = Card(-1,"X")
+
 class StandardDeck:
     """ The class representing a standard deck implementation as a deque, to mitigate some risks """
     def __init__(self,shuffle : bool=True, seed=None):
@@ -76,6 +96,12 @@ class StandardDeck:
         """ The amount of cards in the deck"""
         return len(self.cards)
     
+    def copy(self) -> "StandardDeck":
+        """ Return a copy of the deck with the cards in the same order. Unlike the constructor, this does not reseed the random module. """
+        new = object.__new__(type(self))
+        new.cards = deque(self.cards)
+        return new
+    
     def shuffle(self) -> None:
         """ Shuffle the deck inplace """
         random.shuffle(self.cards)
@@ -0,0 +1,186 @@
+from __future__ import annotations
+import random
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Set, Tuple
+from .DealSampler import DealSampler
+from .FastGame import FastGame, candidate_actions, heuristic_action
+if TYPE_CHECKING:
+    from .Game import MoskaGame
+    from ..Player.AbstractPlayer import AbstractPlayer
+
+
+class BudgetExceeded(Exception):
+    """ Raised when a search visits more nodes than its budget """
+    pass
+
+
+def state_key(game : FastGame) -> tuple:
+    """ A hashable key of everything that decides the rest of a game, when the deck is empty """
+    return (tuple(game.hands), game.to_fall, game.fell, game.ptr % game.nplayers, game.current, tuple(game.ready), tuple(game.ranks))
+
+
+class EndgameSolver:
+    """ Searches the endgame, once the deck is empty, exactly on FastGame.
+
+    With an empty deck every deal of the hidden cards is a game of perfect information. The game tree of a deal is searched depth first,
+    branching on FastGame.candidate_actions, and each player chooses an action after which they don't lose, if there is one.
+    The loser of each searched position is stored in a transposition table keyed by 'state_key', which is kept between decisions.
+    Players can pass the same cards around forever, so a player who repeats a position on the search path loses.
+    This doesn't depend on the path, so also positions with repetitions below them are stored in the table.
+    A path longer than 'max_depth' is finished with a play out of the fallback policy.
+
+    If all the hidden cards are in one hand (for example when two players are left) a decision is solved exactly from one deal.
+    Otherwise up to 'ndeals' deals of the hidden cards are solved (see DealSampler), and the action with the fewest losses over the deals is chosen.
+    Each deal can search 'max_nodes' positions, and the moves of the play outs count as positions.
+    The search is anytime: if a deal runs out of budget, or the decision runs out of time, the best action over the deals solved so far is chosen.
+    The size of the search grows exponentially with the number of cards, so 'choose_action' doesn't search positions with more than 'max_cards' cards.
+    """
+    def __init__(self, max_nodes : int = 20000, ndeals : int = 8, max_depth : int = 300, max_table_size : int = 10**6, fallback : Callable = None, seed : int = None,
+                 max_cards : int = 10, time_limit : float = None):
+        """
+        Args:
+            max_nodes (int, optional): The number of positions the search of one deal can visit. Defaults to 20000.
+            ndeals (int, optional): The maximum number of deals solved, if some cards are hidden. Defaults to 8.
+            max_depth (int, optional): The maximum length of a search path, after which the position is resolved with a play out. Defaults to 300.
+            max_table_size (int, optional): The transposition table is cleared, when it has more positions than this. Defaults to 10**6.
+            fallback (Callable, optional): The policy of the play outs, and the first action tried in each position. Defaults to FastGame.heuristic_action.
+            seed (int, optional): The seed of the deals and play outs. Defaults to None.
+            max_cards (int, optional): The maximum number of cards in the hands and to fall, for 'choose_action' to search the position. Defaults to 10.
+            time_limit (float, optional): No more deals are solved after this many seconds. Defaults to None (no time limit).
+        """
+        self.max_nodes = max_nodes
+        self.ndeals = ndeals
+        self.max_depth = max_depth
+        self.max_table_size = max_table_size
+        self.fallback = fallback if fallback is not None else heuristic_action
+        self.rng = random.Random(seed)
+        self.max_cards = max_cards
+        self.time_limit = time_limit
+        self.table : Dict[tuple,int] = {}
+        self.nodes = 0
+        # The number of deals solved by the last call to 'best_action'
+        self.deals_solved = 0
+
+    def solve(self, game : FastGame) -> int:
+        """ Return the pid of the loser of 'game' (a game with an empty deck), when every player plays optimally.
+
+        Raises:
+            BudgetExceeded: If the search visits more than 'max_nodes' positions.
+        """
+        self.nodes = 0
+        return self._loser(game.copy(), set(), -1)
+
+    def best_action(self, game : FastGame, actions : List[Tuple] = None, sampler : DealSampler = None) -> Tuple[Tuple,float]:
+        """ Return the action of the current player with the lowest probability of losing, and the probability.
+        The deals are solved one at a time, and the search stops at the first deal, that exceeds 'max_nodes', or when 'time_limit' is exceeded.
+
+        Args:
+            game (FastGame): The game, with an empty deck. It is not modified.
+            actions (List[Tuple], optional): The actions to choose from. Defaults to FastGame.candidate_actions.
+            sampler (DealSampler, optional): The sampler of the hidden cards. Defaults to None, in which case the hands of 'game' are known.
+
+        Raises:
+            BudgetExceeded: If the first deal visits more than 'max_nodes' positions.
+        """
+        if len(self.table) > self.max_table_size:
+            self.table.clear()
+        if actions is None:
+            actions = candidate_actions(game)
+        first = self.fallback(game, self.rng)
+        actions = sorted(actions, key=lambda action : action != first)
+        sampled = sampler is not None and len(sampler.hidden) > 0
+        # If the hidden cards can only be in one hand (for example with two players left), there is only one deal
+        ndeals = self.ndeals if sampled and sum(n > 0 for n in sampler.nunknown) + (sampler.deck_unknown > 0) > 1 else 1
+        i = game.current
+        losses = [0]*len(actions)
+        self.deals_solved = 0
+        start_time = time.perf_counter()
+        for _ in range(ndeals):
+            if self.deals_solved > 0 and self.time_limit is not None and time.perf_counter() - start_time > self.time_limit:
+                break
+            start = game.copy()
+            if sampled:
+                start.hands, start.deck = sampler.sample(self.rng)
+            self.nodes = 0
+            try:
+                deal_losses = []
+                for action in actions:
+                    child = start.copy()
+                    child.apply(*action)
+                    deal_losses.append(self._loser(child, set(), i) == i)
+            except BudgetExceeded:
+                if self.deals_solved == 0:
+                    raise
+                break
+            losses = [loss + deal_loss for loss, deal_loss in zip(losses, deal_losses)]
+            self.deals_solved += 1
+        best = min(range(len(actions)), key=losses.__getitem__)
+        return actions[best], losses[best] / self.deals_solved
+
+    def choose_action(self, moskaGame : MoskaGame, player : AbstractPlayer, playable : List[str] = None) -> Tuple:
+        """ Return the best action of 'player' in 'moskaGame' (a game with an empty deck), among the candidate actions of the 'playable' moves,
+        or None if the position has more than 'max_cards' cards, or not even one deal could be solved within the budget.
+        Must be called while holding the games lock.
+        """
+        game = FastGame.from_game(moskaGame, current=player.pid)
+        if sum(hand.bit_count() for hand in game.hands) + game.to_fall.bit_count() > self.max_cards:
+            return None
+        actions = [action for action in candidate_actions(game) if playable is None or action[0] in playable]
+        if not actions:
+            return None
+        if len(actions) == 1:
+            return actions[0]
+        try:
+            action, loss = self.best_action(game, actions, DealSampler.from_game(moskaGame, player))
+        except BudgetExceeded:
+            player.plog.info(f"Endgame search exceeded {self.max_nodes} nodes")
+            return None
+        player.plog.info(f"Endgame search chose {action} with loss probability {loss} over {self.deals_solved} deals")
+        return action
+
+    def _visit(self) -> None:
+        """ Count a visited position against the budget """
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise BudgetExceeded()
+
+    def _play_out(self, game : FastGame) -> int:
+        """ Return the loser of a play out of 'game' with the fallback policy. Every move counts against the budget. """
+        game = game.copy()
+        while game.current >= 0:
+            self._visit()
+            game.apply(*self.fallback(game, self.rng))
+        return game.loser()
+
+    def _loser(self, game : FastGame, path : Set[tuple], mover : int) -> int:
+        """ Return the pid of the loser of 'game' with optimal play, and store it in the table.
+        'mover' is the player, whose action led to 'game', and who loses if the position is on the search 'path'.
+        """
+        # Skip through the decisions, which have no choice
+        while game.current >= 0 and game.legal_moves() == ["Skip"]:
+            game.apply("Skip")
+        if game.current < 0:
+            return game.loser()
+        key = state_key(game)
+        loser = self.table.get(key)
+        if loser is not None:
+            return loser
+        if key in path:
+            return mover
+        if len(path) >= self.max_depth:
+            return self._play_out(game)
+        self._visit()
+        path.add(key)
+        i = game.current
+        first = self.fallback(game, self.rng)
+        actions = sorted(candidate_actions(game), key=lambda action : action != first)
+        loser = i
+        for action in actions:
+            child = game.copy()
+            child.apply(*action)
+            loser = self._loser(child, path, i)
+            if loser != i:
+                break
+        path.discard(key)
+        self.table[key] = loser
+        return loser
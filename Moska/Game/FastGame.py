@@ -0,0 +1,550 @@
+from __future__ import annotations
+import random
+from typing import TYPE_CHECKING, Callable, List, Sequence, Tuple
+from . import utils
+from .CardSet import cards_to_mask, value_cover
+from .Deck import REFERENCE_DECK
+if TYPE_CHECKING:
+    from .Deck import Card
+    from .Game import MoskaGame
+    from .GameState import GameState
+    from ..Player.AbstractPlayer import AbstractPlayer
+
+# The number of cards a player fills their hand to
+HAND_SIZE = 6
+# The order of the moves in AbstractPlayer.moves, so legal_moves lists the moves in the same order as AbstractPlayer._playable_moves
+MOVES = ("EndTurn", "InitialPlay", "PlayToOther", "PlayToSelf", "PlayFallFromHand", "PlayFallFromDeck", "Skip")
+# The default threshold for falling cards, as in HeuristicParameters.fall_card_maximum_play_score_from_hand
+FALL_THRESHOLD_AT_START = 30.44
+
+def _make_fallen_by_masks(triumph : str) -> tuple:
+    """ Invert CAN_FALL_MASKS: FALLEN_BY_MASKS[triumph][card.id] is the bit mask of cards that can fall the card """
+    can_fall = utils.CAN_FALL_MASKS[triumph]
+    return tuple(sum(1 << i for i in range(len(REFERENCE_DECK)) if can_fall[i] >> j & 1) for j in range(len(REFERENCE_DECK)))
+
+def _make_scores(triumph : str) -> tuple:
+    """ The basic score of each card (see _ScoreCards._basic_score): triumph cards score above all other cards """
+    return tuple(4*13 - (14 - c.value) if c.suit == triumph else c.value - 2 for c in REFERENCE_DECK)
+
+FALLEN_BY_MASKS = {triumph : _make_fallen_by_masks(triumph) for triumph in utils.CARD_SUITS}
+SCORES = {triumph : _make_scores(triumph) for triumph in utils.CARD_SUITS}
+
+def _triumph_of_state(state : GameState) -> str:
+    """ Deduce the triumph suit from the cards a card can fall (see GameState.cards_fall): only triumph cards fall cards of other suits.
+    If no such card is left, the triumph suit doesn't affect the game, and any suit without cards in the game is returned.
+    """
+    for card, falls in state.cards_fall.items():
+        if any(fall.suit != card.suit for fall in falls):
+            return card.suit
+    suits = set(card.suit for card in state.cards_fall)
+    for suit in utils.CARD_SUITS:
+        if suit not in suits:
+            return suit
+    raise ValueError("The triumph suit can not be deduced from the state")
+
+def iter_bits(mask : int):
+    """ Iterate over the card ids in a mask, in increasing order """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class FastGame:
+    """ A compact copy of the rules of MoskaGame for search and rollouts. It has no players, loggers, locks or card monitor:
+    hands and the table are bit masks (see CardSet), the deck is a list of card ids with the top card last,
+    and a move is a (move, argument) tuple. Copying a game copies only a few short lists.
+
+    The game is advanced one decision at a time, like MoskaGame._play_single_threaded: 'current' is the player who decides next,
+    players decide in the order of their pids, and the decision is made with 'apply'. Ranks are set, and a finished target ends their turn,
+    exactly as in AbstractPlayer._play_turn. The game is over, when 'current' is -1.
+
+    The arguments of the moves are:
+    - InitialPlay, PlayToOther, PlayToSelf : The mask of the played cards
+    - PlayFallFromHand : A tuple of (card in hand, card on table) id pairs
+    - PlayFallFromDeck : A callable(game, card_id, fall_mask) -> table card id, to choose which card the lifted card falls, or None to fall the highest scoring card
+    - EndTurn : The mask of the picked cards
+    - Skip : None
+    """
+    __slots__ = ("nplayers", "triumph", "can_fall", "fallen_by", "scores", "hands", "ranks", "ready", "deck",
+                 "to_fall", "fell", "kopled", "ptr", "current", "nranked")
+    def __init__(self,
+                 hands : List[int],
+                 deck : List[int],
+                 triumph : str,
+                 ptr : int = 0,
+                 current : int = 0,
+                 to_fall : int = 0,
+                 fell : int = 0,
+                 kopled : int = 0,
+                 ranks : List[int] = None,
+                 ready : List[bool] = None,
+                 ):
+        """ Create a game.
+
+        Args:
+            hands (List[int]): The card masks of the players hands, by pid
+            deck (List[int]): The card ids of the deck, the top card last
+            triumph (str): The triumph suit
+            ptr (int, optional): The pointer of the TurnCycle. The target is ptr % nplayers. Defaults to 0.
+            current (int, optional): The pid of the player who decides next. Defaults to 0.
+            to_fall (int, optional): The mask of the cards to fall. Defaults to 0.
+            fell (int, optional): The mask of the fell cards. Defaults to 0.
+            kopled (int, optional): The mask of the kopled cards. Defaults to 0.
+            ranks (List[int], optional): The ranks of the players, None for players still in the game. Defaults to no ranks.
+            ready (List[bool], optional): The ready states of the players. Defaults to all False.
+        """
+        self.nplayers = len(hands)
+        self.triumph = triumph
+        self.can_fall = utils.CAN_FALL_MASKS[triumph]
+        self.fallen_by = FALLEN_BY_MASKS[triumph]
+        self.scores = SCORES[triumph]
+        self.hands = list(hands)
+        self.deck = list(deck)
+        self.ptr = ptr
+        self.current = current
+        self.to_fall = to_fall
+        self.fell = fell
+        self.kopled = kopled
+        self.ranks = list(ranks) if ranks is not None else [None]*self.nplayers
+        self.ready = list(ready) if ready is not None else [False]*self.nplayers
+        self.nranked = sum(1 for r in self.ranks if r is not None)
+
+    @classmethod
+    def from_game(cls, game : MoskaGame, current : int = None, hands : Sequence[int] = None, deck : Sequence[int] = None) -> FastGame:
+        """ Copy the state of a MoskaGame. Must be called while holding the games lock.
+
+        Args:
+            game (MoskaGame): The game to copy
+            current (int, optional): The pid of the player who decides next. Defaults to the player holding the lock.
+            hands (Sequence[int], optional): The card masks of the hands to use instead of the real hands, for example a determinization. Defaults to the real hands.
+            deck (Sequence[int], optional): The deck to use, the top card last. Defaults to the real deck.
+        """
+        if current is None:
+            current = game.threads[game.lock_holder].pid
+        if hands is None:
+            hands = [pl.hand.card_set.mask for pl in game.players]
+        if deck is None:
+            deck = [card.id for card in reversed(game.deck.cards)]
+        return cls(hands,
+                   deck,
+                   game.triumph,
+                   ptr = game.turnCycle.ptr,
+                   current = current,
+                   to_fall = cards_to_mask(game.cards_to_fall),
+                   fell = cards_to_mask(game.fell_cards),
+                   kopled = game.kopled_mask,
+                   ranks = [pl.rank for pl in game.players],
+                   ready = [pl.ready for pl in game.players],
+                   )
+
+    @classmethod
+    def from_state(cls, state : GameState, triumph : str = None, current : int = None, hands : Sequence[int] = None, deck : Sequence[int] = None) -> FastGame:
+        """ Create a game from a GameState. A state doesn't contain the hidden cards, so the hands and the deck should be a determinization (see DealSampler.from_state).
+        Players without cards, when the deck is empty, are ranked in the order of their pids.
+
+        Args:
+            state (GameState): The state to copy
+            triumph (str, optional): The triumph suit. Defaults to the suit of the cards that can fall cards of other suits.
+            current (int, optional): The pid of the player who decides next. Defaults to the initiator if the table is empty, and the target otherwise.
+            hands (Sequence[int], optional): The card masks of the hands. Defaults to the cards known to everyone.
+            deck (Sequence[int], optional): The card ids of the deck, the top card last. Defaults to an empty deck.
+
+        Raises:
+            ValueError: If the triumph suit can't be deduced from the state.
+        """
+        if triumph is None:
+            triumph = _triumph_of_state(state)
+        if hands is None:
+            hands = [cards_to_mask(card for card in cards if card.id >= 0) for cards in state.player_cards]
+        nplayers = len(state.player_cards)
+        ranks = [None]*nplayers
+        if state.deck_left == 0:
+            nranked = 0
+            for i, cards in enumerate(state.player_cards):
+                if not cards:
+                    nranked += 1
+                    ranks[i] = nranked
+        ptr = state.player_status.index(1) if 1 in state.player_status else 0
+        game = cls(hands,
+                   deck if deck is not None else [],
+                   triumph,
+                   ptr = ptr,
+                   to_fall = cards_to_mask(state.cards_on_table),
+                   fell = cards_to_mask(state.fell_cards),
+                   ranks = ranks,
+                   )
+        game.current = current if current is not None else game.first_player()
+        return game
+
+    def copy(self) -> FastGame:
+        """ Return an independent copy of the game """
+        new = FastGame.__new__(FastGame)
+        new.nplayers = self.nplayers
+        new.triumph = self.triumph
+        new.can_fall = self.can_fall
+        new.fallen_by = self.fallen_by
+        new.scores = self.scores
+        new.hands = self.hands.copy()
+        new.deck = self.deck.copy()
+        new.ptr = self.ptr
+        new.current = self.current
+        new.to_fall = self.to_fall
+        new.fell = self.fell
+        new.kopled = self.kopled
+        new.ranks = self.ranks.copy()
+        new.ready = self.ready.copy()
+        new.nranked = self.nranked
+        return new
+
+    def __repr__(self) -> str:
+        cards = lambda mask : [REFERENCE_DECK[i] for i in iter_bits(mask)]
+        s = f"Triumph: {self.triumph}, deck: {len(self.deck)}, target: {self.target}, current: {self.current}\n"
+        for i, hand in enumerate(self.hands):
+            s += f"{i}{'*' if i == self.target else ''} (rank {self.ranks[i]}) : {cards(hand)}\n"
+        s += f"Cards to fall : {cards(self.to_fall)}\nFell cards : {cards(self.fell)}\n"
+        return s
+
+    @property
+    def target(self) -> int:
+        """ The pid of the target player """
+        return self.ptr % self.nplayers
+
+    def is_over(self) -> bool:
+        return self.current < 0
+
+    def loser(self) -> int:
+        """ Return the pid of the player who lost, or -1 if the game is not over """
+        for i, rank in enumerate(self.ranks):
+            if rank == self.nplayers:
+                return i
+        return -1
+
+    def initiator(self) -> int:
+        """ Return the pid of the initiating player; the previous player from the target, who is still in the game """
+        n = self.nplayers
+        for k in range(1, n):
+            i = (self.ptr - k) % n
+            if self.ranks[i] is None:
+                return i
+        return -1
+
+    def first_player(self) -> int:
+        """ The player who decides first in a position without history: the initiator if the table is empty, and otherwise the target """
+        return self.ptr % self.nplayers if self.to_fall or self.fell else self.initiator()
+
+    def fits(self) -> int:
+        """ The number of cards that can be played to the target """
+        return self.hands[self.ptr % self.nplayers].bit_count() - self.to_fall.bit_count()
+
+    def can_end_turn(self, i : int) -> bool:
+        """ Whether all the other players in the game are ready, and there are cards on the table """
+        if not (self.to_fall or self.fell):
+            return False
+        ready, ranks = self.ready, self.ranks
+        for j in range(self.nplayers):
+            if j != i and ranks[j] is None and not ready[j]:
+                return False
+        return True
+
+    def can_fall_from_hand(self, i : int) -> bool:
+        """ Whether player 'i' can fall some card on the table with a card from their hand """
+        hand, fallen_by = self.hands[i], self.fallen_by
+        for t in iter_bits(self.to_fall):
+            if hand & fallen_by[t]:
+                return True
+        return False
+
+    def legal_moves(self) -> List[str]:
+        """ Return the moves that the current player can make, like AbstractPlayer._playable_moves """
+        i = self.current
+        t = self.ptr % self.nplayers
+        if self.ranks[i] is not None:
+            return ["EndTurn"] if i == t else ["Skip"]
+        table = self.to_fall | self.fell
+        playable = self.hands[i] & value_cover(table)
+        if i == t:
+            moves = []
+            can_end = self.can_end_turn(i)
+            if can_end:
+                moves.append("EndTurn")
+            if playable and self.deck:
+                moves.append("PlayToSelf")
+            if self.can_fall_from_hand(i):
+                moves.append("PlayFallFromHand")
+            if self.deck and self.to_fall and not self.kopled & self.to_fall:
+                moves.append("PlayFallFromDeck")
+            # The target can not skip, if they can (or must) end the turn
+            if not can_end:
+                moves.append("Skip")
+            return moves
+        if not table:
+            return ["InitialPlay"] if i == self.initiator() else ["Skip"]
+        if playable and self.fits() > 0:
+            return ["PlayToOther", "Skip"]
+        return ["Skip"]
+
+    def apply(self, move : str, arg = None) -> None:
+        """ Make a decision for the current player, and advance the game to the next player who decides.
+        The move is assumed to be legal.
+
+        Args:
+            move (str): The move, one of MOVES
+            arg (optional): The argument of the move (see the class docstring)
+        """
+        i = self.current
+        self.ready[i] = True
+        if move != "Skip":
+            before = value_cover(self.to_fall | self.fell)
+            if move == "PlayToOther" or move == "InitialPlay":
+                self.hands[i] &= ~arg
+                self.to_fall |= arg
+                self._draw(i)
+            elif move == "PlayFallFromHand":
+                hand, to_fall, fell = self.hands[i], self.to_fall, self.fell
+                for h, c in arg:
+                    hand &= ~(1 << h)
+                    to_fall &= ~(1 << c)
+                    fell |= (1 << h) | (1 << c)
+                self.hands[i], self.to_fall, self.fell = hand, to_fall, fell
+            elif move == "PlayFallFromDeck":
+                self._fall_from_deck(arg)
+            elif move == "EndTurn":
+                self._end_turn(i, arg)
+            elif move == "PlayToSelf":
+                self.hands[i] &= ~arg
+                self.to_fall |= arg
+            else:
+                raise NameError(f"Attempted to make move '{move}' which is not recognized as a move")
+            # The values on the table changed
+            if value_cover(self.to_fall | self.fell) != before:
+                self.ready = [False]*self.nplayers
+        self._set_rank(i)
+        if self.ranks[i] is not None and i == self.ptr % self.nplayers and (self.to_fall or self.fell):
+            self._end_turn(i, 0)
+        self.current = self._next_player(i)
+
+    def _draw(self, i : int) -> None:
+        """ Fill the hand of player 'i' from the deck """
+        hand = self.hands[i]
+        deck = self.deck
+        for _ in range(HAND_SIZE - hand.bit_count()):
+            if not deck:
+                break
+            hand |= 1 << deck.pop()
+        self.hands[i] = hand
+
+    def _fall_from_deck(self, choose : Callable = None) -> None:
+        """ Lift the top card of the deck, and fall a card on the table with it, or add it to the cards to fall """
+        card = self.deck.pop()
+        self.kopled |= 1 << card
+        falls = self.can_fall[card] & self.to_fall
+        if not falls:
+            self.to_fall |= 1 << card
+            return
+        c = choose(self, card, falls) if choose is not None else -1
+        if c < 0 or not falls >> c & 1:
+            c = max(iter_bits(falls), key=self.scores.__getitem__)
+        self.to_fall &= ~(1 << c)
+        self.fell |= (1 << c) | (1 << card)
+
+    def _end_turn(self, i : int, pick : int) -> None:
+        """ Pick the cards to hand, draw from the deck, and move the turn to the next player (or the one after that if cards were picked) """
+        self.hands[i] |= pick
+        self._draw(i)
+        self.kopled &= ~self.hands[i]
+        self._next_target()
+        if pick or self.ranks[i] is not None:
+            self._next_target()
+        self.to_fall = 0
+        self.fell = 0
+
+    def _next_target(self) -> None:
+        """ Increment the pointer to the next player in the game, like TurnCycle.get_next_condition """
+        n = self.nplayers
+        for _ in range(n):
+            self.ptr += 1
+            if self.ranks[self.ptr % n] is None:
+                return
+
+    def _set_rank(self, i : int) -> None:
+        """ Set the rank of player 'i', if they have finished, like AbstractPlayer._set_rank """
+        if self.ranks[i] is None and ((not self.hands[i] and not self.deck) or self.nplayers - self.nranked <= 1):
+            self.nranked += 1
+            self.ranks[i] = self.nranked
+
+    def _next_player(self, i : int) -> int:
+        """ Return the pid of the player who decides after player 'i'. The last player in the game gets the last rank. """
+        n = self.nplayers
+        while self.nranked < n:
+            i = (i + 1) % n
+            if self.ranks[i] is None:
+                if self.nranked >= n - 1:
+                    self.nranked += 1
+                    self.ranks[i] = self.nranked
+                    continue
+                return i
+        return -1
+
+    def play_out(self, policy : Callable = None, rng : random.Random = random, max_decisions : int = 1000) -> int:
+        """ Play the game to the end, with every player using 'policy'. Returns the pid of the loser.
+        Deterministic policies can pass the same cards around forever in an endgame, so after 'max_decisions'
+        the players make random moves, until the game ends.
+
+        Args:
+            policy (Callable, optional): A callable(game, rng) -> (move, arg). Defaults to heuristic_action.
+            rng (random.Random, optional): The random number generator passed to the policy. Defaults to the random module.
+            max_decisions (int, optional): The number of decisions after which random moves are made. Defaults to 1000.
+        """
+        policy = policy if policy is not None else heuristic_action
+        ndecisions = 0
+        while self.current >= 0:
+            if ndecisions == max_decisions:
+                policy = random_action
+            move, arg = policy(self, rng)
+            self.apply(move, arg)
+            ndecisions += 1
+        return self.loser()
+
+def fall_threshold(game : FastGame) -> float:
+    """ The maximum score difference of a card in hand and a card on the table to fall, as in HeuristicParameters """
+    return ((FALL_THRESHOLD_AT_START - 52)/52)*len(game.deck) + 52
+
+def greedy_fall_pairs(game : FastGame, hand : int, threshold : float = float("inf")) -> Tuple[Tuple[int,int],...]:
+    """ Greedily fall the cards on the table, highest score first, each with the lowest scoring card in 'hand' that can fall it,
+    if the difference in scores is at most 'threshold'.
+
+    Returns:
+        Tuple[Tuple[int,int],...]: The (card in hand, card on table) pairs
+    """
+    scores, fallen_by = game.scores, game.fallen_by
+    pairs = []
+    for c in sorted(iter_bits(game.to_fall), key=scores.__getitem__, reverse=True):
+        options = hand & fallen_by[c]
+        if not options:
+            continue
+        h = min(iter_bits(options), key=scores.__getitem__)
+        if scores[h] - scores[c] > threshold:
+            continue
+        pairs.append((h, c))
+        hand &= ~(1 << h)
+    return tuple(pairs)
+
+def _lowest(game : FastGame, mask : int, n : int = 1) -> int:
+    """ Return the mask of the 'n' lowest scoring cards in 'mask' """
+    out = 0
+    for c in sorted(iter_bits(mask), key=game.scores.__getitem__)[:n]:
+        out |= 1 << c
+    return out
+
+def _initial_plays(game : FastGame, hand : int) -> List[int]:
+    """ Return the masks of the sensible initial plays: each single card, and each value with multiple cards (as many as fit) """
+    fits = game.fits()
+    plays = [1 << c for c in iter_bits(hand)]
+    if fits >= 2:
+        for k in range(len(utils.CARD_VALUES)):
+            cards = hand & (0b1111 << len(utils.CARD_SUITS)*k)
+            if cards.bit_count() >= 2:
+                plays.append(_lowest(game, cards, fits))
+    return plays
+
+def heuristic_initial_play(game : FastGame, hand : int) -> int:
+    """ Play the value with the lowest mean score, all the cards of the value if there are many, like MoskaBot3.play_initial """
+    scores = game.scores
+    mean = lambda mask : sum(scores[c] for c in iter_bits(mask)) / mask.bit_count()
+    return min(_initial_plays(game, hand), key=lambda mask : (mean(mask), -mask.bit_count()))
+
+def heuristic_play_to_target(game : FastGame, hand : int) -> int:
+    """ Play the cheap (non-triumph, below jack) playable cards that fit, like MoskaBot3.play_to_target. Late in the game, play all playable cards. """
+    playable = hand & value_cover(game.to_fall | game.fell)
+    if game.deck:
+        scores = game.scores
+        playable = sum(1 << c for c in iter_bits(playable) if scores[c] < 10)
+    return _lowest(game, playable, max(game.fits(), 0))
+
+def heuristic_action(game : FastGame, rng : random.Random = random) -> Tuple[str,object]:
+    """ A cheap MoskaBot3-style policy: initiate with the lowest cards, play cheap cards to the target,
+    fall cards if it is cheap, koplaa if the cards can't be fallen, and otherwise pick the cards to fall.
+    """
+    moves = game.legal_moves()
+    if len(moves) == 1 and moves[0] == "Skip":
+        return ("Skip", None)
+    i = game.current
+    hand = game.hands[i]
+    if "InitialPlay" in moves:
+        return ("InitialPlay", heuristic_initial_play(game, hand))
+    if "PlayToOther" in moves:
+        play = heuristic_play_to_target(game, hand)
+        if play:
+            return ("PlayToOther", play)
+    if "PlayFallFromHand" in moves:
+        pairs = greedy_fall_pairs(game, hand, fall_threshold(game))
+        if pairs:
+            return ("PlayFallFromHand", pairs)
+    if "PlayFallFromDeck" in moves:
+        return ("PlayFallFromDeck", None)
+    if "EndTurn" in moves:
+        return ("EndTurn", game.to_fall)
+    if "Skip" in moves:
+        return ("Skip", None)
+    if "PlayFallFromHand" in moves:
+        return ("PlayFallFromHand", greedy_fall_pairs(game, hand))
+    return ("PlayToSelf", _lowest(game, hand & value_cover(game.to_fall | game.fell)))
+
+def random_action(game : FastGame, rng : random.Random = random) -> Tuple[str,object]:
+    """ A uniformly random legal move, with a random single card or pair as the argument (all cards of a value for InitialPlay) """
+    move = rng.choice(game.legal_moves())
+    i = game.current
+    hand = game.hands[i]
+    if move == "InitialPlay":
+        return (move, rng.choice(_initial_plays(game, hand)))
+    if move == "PlayToOther" or move == "PlayToSelf":
+        return (move, 1 << rng.choice(list(iter_bits(hand & value_cover(game.to_fall | game.fell)))))
+    if move == "PlayFallFromHand":
+        c = rng.choice([c for c in iter_bits(game.to_fall) if hand & game.fallen_by[c]])
+        return (move, ((rng.choice(list(iter_bits(hand & game.fallen_by[c]))), c),))
+    if move == "EndTurn":
+        return (move, game.to_fall)
+    return (move, None)
+
+def candidate_actions(game : FastGame) -> List[Tuple[str,object]]:
+    """ Return a small set of distinct sensible actions for the current player, including at least one action of every legal move.
+    Used as the branches of a search tree.
+    """
+    moves = game.legal_moves()
+    if moves == ["Skip"]:
+        return [("Skip", None)]
+    i = game.current
+    hand = game.hands[i]
+    actions = []
+    for move in moves:
+        if move == "InitialPlay":
+            actions += [(move, play) for play in _initial_plays(game, hand)]
+        elif move == "PlayToOther":
+            plays = {heuristic_play_to_target(game, hand), _lowest(game, hand & value_cover(game.to_fall | game.fell), game.fits())}
+            actions += [(move, play) for play in plays if play]
+        elif move == "PlayToSelf":
+            actions.append((move, _lowest(game, hand & value_cover(game.to_fall | game.fell))))
+        elif move == "PlayFallFromHand":
+            cheap = greedy_fall_pairs(game, hand, fall_threshold(game))
+            full = greedy_fall_pairs(game, hand)
+            actions += [(move, pairs) for pairs in dict.fromkeys((cheap, full)) if pairs]
+        elif move == "EndTurn":
+            actions.append((move, game.to_fall))
+        else:
+            actions.append((move, None))
+    return actions
+
+def cards_of_action(moskaGame : MoskaGame, player : AbstractPlayer, move : str, arg) -> object:
+    """ Convert the argument of an action of 'player' to the return value of the players play method of the move (see AbstractPlayer):
+    a list of cards for InitialPlay, PlayToOther, PlayToSelf and EndTurn, and a dict of hand card : table card for PlayFallFromHand.
+    """
+    if move in ("InitialPlay", "PlayToOther", "PlayToSelf"):
+        return [card for card in player.hand.cards if arg >> card.id & 1]
+    if move == "PlayFallFromHand":
+        hand = {card.id : card for card in player.hand.cards}
+        table = {card.id : card for card in moskaGame.cards_to_fall}
+        return {hand[h] : table[c] for h, c in arg}
+    if move == "EndTurn":
+        return [card for card in moskaGame.cards_to_fall + moskaGame.fell_cards if arg >> card.id & 1]
+    return arg
@@ -1,7 +1,6 @@
 import contextlib
 import copy
 import os
-import tensorflow as tf
 from Moska.Game.GameState import GameState
 from ..Player.MoskaBot3 import MoskaBot3
 from . import utils
@@ -13,10 +12,14 @@ from ..Player.RandomPlayer import RandomPlayer
 import numpy as np
 from typing import Any, Callable, Dict, List, Tuple
 from .Deck import Card, StandardDeck
+from .CardSet import CardSet, cards_to_mask
 from .CardMonitor import CardMonitor
+from .UndoLog import UndoLog
+from ..Model import ModelRegistry
 import threading
 import logging
 import random
+import time
 #import tensorflow as tf
 from .Turns import PlayFallFromDeck, PlayFallFromHand, PlayToOther, InitialPlay, EndTurn, PlayToSelf, Skip, PlayToSelfFromDeck
 
@@ -41,6 +44,10 @@ class MoskaGame:
     random_seed = None
     nplayers : int = 0
     card_monitor : CardMonitor = None
+    kopled_mask : int = 0                         # The bits (see CardSet) of the cards, that have been kopled from the deck
+    threaded : bool = False
+    undo_log : UndoLog = None                     # Set only while a move is applied with _apply_move
+    detached : bool = False                       # True for copies made with clone, which have no locks or threads
     EXIT_FLAG = False
     def __init__(self,
                  deck : StandardDeck = None,
@@ -49,18 +56,16 @@ class MoskaGame:
                  log_file : str = "",
                  log_level = logging.INFO,
                  timeout=3,
-                 random_seed=None
+                 random_seed=None,
+                 threaded : bool = False,
                  ):
         """Create a MoskaGame -instance.
 
         Args:
             deck (StandardDeck): The deck instance, from which to draw cards.
+            threaded (bool, optional): Whether to run each player in a separate thread. Defaults to False, in which case the game is played
+            in the calling thread, by asking the players for their decisions in turns. This is deterministic for a given random_seed.
         """
-        self.interpreter = tf.lite.Interpreter(model_path="/home/ilmari/python/moska/ModelMB2/model.tflite",)
-        self.interpreter.allocate_tensors()
-        self.input_details = self.interpreter.get_input_details()
-        self.output_details = self.interpreter.get_output_details()
-        #print(self.input_details)
         self.threads = {}
         if self.players or self.nplayers > 0:
             print("LEFTOVER PLAYERS FOUND!!!!!!!!!!!!!")
@@ -74,19 +79,34 @@ class MoskaGame:
         self.deck = deck if deck else StandardDeck(seed = self.random_seed)
         self.players = players if players else self._get_random_players(nplayers)
         self.timeout = timeout
+        self.threaded = threaded
         self.EXIT_FLAG = False
+        self.kopled_mask = 0
+        # The cards in cards_to_fall and fell_cards as bit masks (see CardSet), kept up to date with the lists
+        self.to_fall_mask = 0
+        self.fell_mask = 0
+        self.undo_log = None
         self.card_monitor = CardMonitor(self)
         self._set_turns()
         #self.model = tf.keras.models.load_model("/home/ilmari/python/moska/Model5-300/model.h5")
     
-    def model_predict(self, X):
-        self.threads[threading.get_native_id()].plog.debug(f"Predicting with model, X.shape = {X.shape}")
-        self.interpreter.resize_tensor_input(self.input_details[0]["index"],X.shape)
-        self.interpreter.allocate_tensors()
-        self.interpreter.set_tensor(self.input_details[0]['index'], X)
-        self.interpreter.invoke()
-        output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-        return output_data
+    def model_predict(self, X : np.ndarray, model_file : str = ModelRegistry.DEFAULT_MODEL_FILE) -> np.ndarray:
+        """ Evaluate a contiguous float32 array of state vectors with a model.
+        The model is loaded once per process, on first use, and shared between games.
+        The evaluations are cached, so identical states are evaluated only once (see ModelRegistry.get_cached_model).
+
+        Args:
+            X (np.ndarray): The states, of shape (n, input_length)
+            model_file (str, optional): The model to use. Defaults to ModelRegistry.DEFAULT_MODEL_FILE.
+
+        Returns:
+            np.ndarray: The evaluations, of shape (n, 1)
+        """
+        # Clones have no threads, and the game itself can hold the lock, so log to the games logger if no player is playing in this thread
+        holder = self.threads.get(threading.get_native_id())
+        log = holder.plog if isinstance(holder, AbstractPlayer) else self.glog
+        log.debug(f"Predicting with model {model_file}, X.shape = {X.shape}")
+        return ModelRegistry.get_cached_model(model_file).predict(X)
     
     def _set_turns(self):
         self.turns = {
@@ -230,103 +250,104 @@ class MoskaGame:
     def _make_move(self,move,args) -> Tuple[bool,str]:
         """ This is called from a AbstractPlayer -instance
         """
-        if self.lock_holder != threading.get_native_id():
+        if not self.detached and self.lock_holder != threading.get_native_id():
             raise threading.ThreadError(f"Making moves is supposed to be implicit and called in a context manager after acquiring the games lock")
         if move not in self.turns.keys():
             raise NameError(f"Attempted to make move '{move}' which is not recognized as a move in Turns.py")
         move_call = self.turns[move]
-        self.glog.debug(f"Player {self.threads[self.lock_holder].name} called {move} with args {args}")
+        # The player making the move is always the first argument
+        self.glog.debug(f"Player {args[0].name} called {move} with args {args}")
         try:
             move_call(*args)  # Calls a class from Turns, which raises AssertionError if the move is not playable
         except AssertionError as ae:
-            self.glog.warning(f"{self.threads[threading.get_native_id()].name}:{ae}")
+            self.glog.warning(f"{args[0].name}:{ae}")
             return False, str(ae)
         except TypeError as te:
-            self.glog.warning(f"{self.threads[threading.get_native_id()].name}:{te}")
+            self.glog.warning(f"{args[0].name}:{te}")
             return False, str(te)
         self.card_monitor.update_from_move(move,args)
         return True, ""
     
-    def _make_mock_move(self,move,args) -> GameState:
-        """ Makes a move, like '_make_move', but returns the game state after the move and restores self and attributes to its original state.
+    def _apply_move(self,move,args) -> UndoLog:
+        """ Make a move like '_make_move', while recording the changed parts of the game to an UndoLog.
+        The move can then be reverted with '_undo_move'. Moves can be nested, if they are undone in reverse order.
+
+        Args:
+            move (str): The name of the move
+            args (list): The arguments of the move
+
+        Raises:
+            AssertionError: If the move is not playable
+
+        Returns:
+            UndoLog: The log, which must be passed to '_undo_move'
         """
-        # Save information about the game state
-        curr_state = GameState.from_game(self)
-        curr_card_monitor_player_cards = copy.deepcopy(self.card_monitor.player_cards)
-        curr_card_monitor_cards_fall_dict = copy.deepcopy(self.card_monitor.cards_fall_dict)
-        curr_tc_ptr = self.turnCycle.ptr
-        curr_deck_state = copy.deepcopy(self.deck.cards)
-        curr_pl_hands = {pl.pid:pl.hand.copy() for pl in self.players}
-        # Normally play the move; change games state precisely as it would actually change.
-        success, msg = self._make_move(move,args)
+        prev_log = self.undo_log
+        log = UndoLog(self)
+        self.undo_log = log
+        try:
+            success, msg = self._make_move(move,args)
+        finally:
+            self.undo_log = prev_log
         if not success:
+            log.undo()
             raise AssertionError(f"Mock move failed: {msg}")
+        return log
+    
+    def _undo_move(self, log : UndoLog) -> None:
+        """ Restore the game to the state it was in before the move that created 'log' """
+        log.undo()
+        return
+    
+    def _make_mock_move(self,move,args) -> GameState:
+        """ Makes a move, like '_make_move', but returns the game state after the move and restores self and attributes to its original state.
+        """
+        log = self._apply_move(move,args)
         # Save the new game state, for evaluation of the move
         new_state = GameState.from_game(self)
-        
-        # Restore the game state to its original state
-        # Restore the turn cycle
-        self.turnCycle.ptr = curr_tc_ptr
-        # Restore the deck
-        self.deck.cards = curr_deck_state
-        # Restore the players ACTUAL hands
-        for pid, hand in curr_pl_hands.items():
-            self.players[pid].hand = hand
-        # Restore the cards on the table; fell cards and cards_to_fall
-        self.fell_cards = curr_state.fell_cards
-        self.cards_to_fall = curr_state.cards_on_table
-        
-        # Restore card monitors Fall dictionary, and MONITORED player hands
-        self.card_monitor.cards_fall_dict = curr_card_monitor_cards_fall_dict
-        self.card_monitor.player_cards = curr_card_monitor_player_cards
-    
-        
-        if self.card_monitor.cards_fall_dict != curr_card_monitor_cards_fall_dict:
-            print("Fall dict was: ",curr_card_monitor_cards_fall_dict)
-            print("Fall dict is: ",self.card_monitor.cards_fall_dict)
-            raise AssertionError(f"Mock move failed: Incorrect fall dict!")
-        
-        if self.card_monitor.player_cards != curr_card_monitor_player_cards:
-            print("Player CARD MONITOR cards were: ",{self.players[pid].name : cards for pid, cards in enumerate(curr_state.player_cards)})
-            print("Player CARD MONITOR cards are: ",self.card_monitor.player_cards)
-            raise AssertionError(f"Mock move failed: Incorrect card monitor!")
-        
-        # The actual hands on players
-        restored_hands = {pl.pid:pl.hand for pl in self.players}
-        if curr_pl_hands != restored_hands:  # Check that the hands are the same
-            print("Actual hands were: ",curr_pl_hands)
-            print("Actual hands are: ",restored_hands)
-            print("Difference: ", list(set(curr_pl_hands.items()) - set(restored_hands.items())))
-            raise AssertionError(f"Mock move failed: Incorrect player hands!")
-        
-        if curr_tc_ptr != self.turnCycle.ptr:
-            print("TC was: ",curr_tc_ptr)
-            print("TC is: ",self.turnCycle.ptr)
-            raise AssertionError(f"Mock move failed: Incorrect turn cycle pointer!")
-        
-        if curr_deck_state != self.deck.cards:
-            print("Deck was: ",curr_deck_state)
-            print("Deck is: ",self.deck.cards)
-            raise AssertionError(f"Mock move failed: Incorrect order of deck!")
-        
-        if curr_state.fell_cards != self.fell_cards:
-            print("Fell cards were: ",curr_state.fell_cards)
-            print("Fell cards are: ",self.fell_cards)
-            raise AssertionError(f"Mock move failed: Incorrect fell cards!")
-        
-        if curr_state.cards_on_table != self.cards_to_fall:
-            print("Cards to fall were: ",curr_state.cards_on_table)
-            print("Cards to fall are: ",self.cards_to_fall)
-            raise AssertionError(f"Mock move failed: Incorrect cards to fall!")
-        
-        if curr_state.as_vector(normalize=False) != GameState.from_game(self).as_vector(normalize=False):
-            print("State was: ",curr_state.as_vector(normalize=False))
-            print("State is: ",GameState.from_game(self).as_vector(normalize=False))
-            raise AssertionError(f"Mock move failed: Incorrect state vector! {msg}")
+        self._undo_move(log)
         return new_state
-        
-        
     
+    def clone(self) -> "MoskaGame":
+        """ Return a detached copy of the game engine: the deck in the same order, copies of the players with their hands and ranks,
+        the table, the TurnCycle pointer, the card monitors knowledge and the kopled cards.
+        The copy has no threads, locks or log files, and moves can be made on it with '_make_move', '_apply_move' or '_make_mock_move'
+        from any thread. The players of the copy are only used to hold their state (see AbstractPlayer._clone); they are not asked for decisions.
+
+        The attributes are set directly, bypassing '__setattr__', so no new deck or hands are dealt, and no loggers are created.
+        """
+        new = object.__new__(MoskaGame)
+        players = [pl._clone(new) for pl in self.players]
+        new.__dict__.update({
+            "players" : players,
+            "nplayers" : self.nplayers,
+            "triumph" : self.triumph,
+            "triumph_card" : self.triumph_card,
+            # The lists are copied, since the class level lists are shared by all games in the process
+            "cards_to_fall" : list(self.cards_to_fall),
+            "fell_cards" : list(self.fell_cards),
+            "turnCycle" : utils.TurnCycle(players, ptr=self.turnCycle.ptr),
+            "deck" : self.deck.copy(),
+            "threads" : {},
+            "log_file" : os.devnull,
+            "log_level" : self.log_level,
+            "name" : self.name,
+            "glog" : utils.NULL_LOGGER,
+            "main_lock" : None,
+            "lock_holder" : None,
+            "timeout" : self.timeout,
+            "random_seed" : self.random_seed,
+            "kopled_mask" : self.kopled_mask,
+            "to_fall_mask" : self.to_fall_mask,
+            "fell_mask" : self.fell_mask,
+            "threaded" : False,
+            "undo_log" : None,
+            "EXIT_FLAG" : False,
+            "detached" : True,
+        })
+        new.__dict__["card_monitor"] = self.card_monitor.copy(new)
+        new._set_turns()
+        return new
     
     def __repr__(self) -> str:
         """ What to print when calling print(self) """
@@ -341,6 +362,8 @@ class MoskaGame:
         """ Starts all player threads. """
         self.cards_to_fall.clear()
         self.fell_cards.clear()
+        self.to_fall_mask = 0
+        self.fell_mask = 0
         # Add self to allowed threads
         self.threads[threading.get_native_id()] = self
         with self.get_lock() as ml:
@@ -368,6 +391,56 @@ class MoskaGame:
         return True
     
     
+    def _start_players(self) -> None:
+        """ Initializes all players, without starting threads for them. The game is then played with '_play_single_threaded'. """
+        self.cards_to_fall.clear()
+        self.fell_cards.clear()
+        self.to_fall_mask = 0
+        self.fell_mask = 0
+        # Add self to allowed threads
+        self.threads[threading.get_native_id()] = self
+        with self.get_lock() as ml:
+            for pl in self.players:
+                pl._start(threaded=False)
+            self.glog.debug("Started players")
+            assert len(set([pl.pid for pl in self.players])) == len(self.players), f"A non-unique player id ('pid' attribute) found."
+            self.card_monitor.start()
+        return
+    
+    def _play_single_threaded(self) -> bool:
+        """ Play the game in the calling thread. The players who are still in the game are asked for a decision in turns,
+        in the order of their pids, until every player has a rank.
+        A player whose only playable move is 'Skip' returns immediately, so only players whose decision is due, do work.
+        
+        Returns:
+            bool: True if the game finished, False if the game timed out.
+        """
+        tid = threading.get_native_id()
+        # The threads would be joined one after another, each with 'timeout'
+        max_time = self.timeout * len(self.players)
+        start = time.time()
+        while any((pl.rank is None for pl in self.players)):
+            for pl in self.players:
+                if pl.rank is not None:
+                    continue
+                if time.time() - start > max_time:
+                    self.threads[tid] = self
+                    with self.get_lock() as ml:
+                        self.glog.error(f"Game timed out, while player {pl.name} was playing. Exiting.")
+                        pl.plog.error(f"Game timedout!")
+                        print(f"Game with log {self.log_file} failed.")
+                        self.EXIT_FLAG = True
+                    return False
+                # The player in turn holds the lock in this thread
+                self.threads[tid] = pl
+                with self.get_lock() as ml:
+                    pl._play_turn()
+                if pl.rank is not None:
+                    pl.plog.info(f"Finished as {pl.rank}")
+        self.threads[tid] = self
+        self.glog.debug("Players finished")
+        return True
+    
     def get_initiating_player(self) -> AbstractPlayer:
         """ Return the player, whose turn it is/was to initiate the turn aka. play to an empty table. """
         active = self.get_target_player()
@@ -395,8 +468,25 @@ class MoskaGame:
             add (List): The list of cards to add to the table.
         """
         self.cards_to_fall += add
+        self.to_fall_mask |= cards_to_mask(add)
         return
         
+    def is_kopled(self, card : Card) -> bool:
+        """ Return whether the card has been kopled (lifted from the deck during this turn) """
+        return bool(self.kopled_mask >> card.id & 1)
+    
+    def kopled_on_table(self) -> bool:
+        """ Return whether there is a kopled card among the cards to fall; then kopling is not allowed. """
+        return bool(self.kopled_mask & self.get_cards_to_fall_set().mask)
+    
+    def get_cards_to_fall_set(self) -> CardSet:
+        """ Return the cards on the table, that have not yet been fallen, as a CardSet. """
+        return CardSet(self.to_fall_mask)
+    
+    def get_table_card_set(self) -> CardSet:
+        """ Return all cards on the table (cards to fall and fell cards) as a CardSet. """
+        return CardSet(self.to_fall_mask | self.fell_mask)
+    
     def get_target_player(self) -> AbstractPlayer:
         """Return the player, who is currently the target; To who cards are played to.
 
@@ -428,7 +518,7 @@ class MoskaGame:
     
     def start(self) -> bool:
         """The main method of MoskaGame. Sets the triumph card, locks the game to avoid race conditions between players,
-        initializes and starts the player threads.
+        initializes the players and either starts the player threads, or plays the game in the calling thread.
         After that, the players play the game, only one modifying the state of the game at a time.
 
         Returns:
@@ -437,10 +527,15 @@ class MoskaGame:
         self._set_triumph()
         self._create_locks()
         self.glog.info(f"Starting the game with seed {self.random_seed}...")
-        self._start_player_threads()
-        self.glog.info(f"Started moska game with players {[pl.name for pl in self.players]}")
-        # Wait for the threads to finish
-        success = self._join_threads()
+        if self.threaded:
+            self._start_player_threads()
+            self.glog.info(f"Started moska game with players {[pl.name for pl in self.players]}")
+            # Wait for the threads to finish
+            success = self._join_threads()
+        else:
+            self._start_players()
+            self.glog.info(f"Started moska game with players {[pl.name for pl in self.players]}")
+            success = self._play_single_threaded()
         if not success:
             return None, None
         self.glog.info("Final ranking: ")
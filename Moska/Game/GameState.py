@@ -1,12 +1,12 @@
 import copy
 from dataclasses import dataclass
-from typing import Dict, List, TYPE_CHECKING
+from typing import Callable, Dict, Iterable, List, TYPE_CHECKING
+import numpy as np
 from .Deck import Card
 if TYPE_CHECKING:
     from .Game import MoskaGame
     from Moska.Player.AbstractPlayer import AbstractPlayer
-from .Deck import StandardDeck
-REFERENCE_DECK = tuple(StandardDeck(shuffle = False).cards)
+from .Deck import REFERENCE_DECK
 
 
 class GameState:
@@ -30,17 +30,20 @@ class GameState:
         self.cards_on_table = cards_on_table#tuple(cards_on_table)
         self.fell_cards = fell_cards#tuple(fell_cards)
         self.player_status = tuple(player_status)
+        self._fall_counts = None
     
     @classmethod
     def from_game(cls, game : 'MoskaGame'):
         """ Creates a GameState object from a MoskaGame object."""
-        player_hands_dict = copy.deepcopy(game.card_monitor.player_cards)
+        # Cards are immutable, so copying the lists is enough
+        player_hands_dict = game.card_monitor.player_cards
         player_names = [pl.name for pl in game.players]
         player_hands = []
         # Loop through the list by pid, and add the player's hand to the list.
         for pl in player_names:
-            player_hands.append(player_hands_dict[pl])
-        return cls(len(game.deck), player_hands, copy.deepcopy(game.card_monitor.cards_fall_dict), game.cards_to_fall.copy(), game.fell_cards.copy(), cls._get_player_status(cls,game))
+            player_hands.append(list(player_hands_dict[pl]))
+        cards_fall = {card : list(falls) for card, falls in game.card_monitor.cards_fall_dict.items()}
+        return cls(len(game.deck), player_hands, cards_fall, game.cards_to_fall.copy(), game.fell_cards.copy(), cls._get_player_status(cls,game))
     
     def encode_cards(self, cards : List[Card],normalize : bool = False) -> List[int]:
         """Encodes a list of cards into a list of integers.
@@ -56,11 +59,10 @@ class GameState:
             encoding_value = -1
             if card in self.cards_fall:
                 encoding_value = len(self.cards_fall[card])
-            try:
-                out[REFERENCE_DECK.index(card)] = encoding_value/52 if normalize else encoding_value
             # If the card is not in the reference deck it is likely an unknown card
-            except ValueError:
-                pass
+            if card.id < 0:
+                continue
+            out[card.id] = encoding_value/52 if normalize else encoding_value
         return out
     
     def as_vector(self,normalize : bool = True):
@@ -86,6 +88,70 @@ class GameState:
         # len out should be 7x52 + 1 + 4 + 4 (+52 + 1) = 426  
         return out
     
+    def vector_length(self, with_hand : bool = False) -> int:
+        """ The length of the vector returned by 'as_vector', or by 'as_array' if 'with_hand' is True and a hand is encoded """
+        nplayers = len(self.player_status)
+        return 1 + 52*nplayers + 3*52 + 2*nplayers + (52 if with_hand else 0)
+    
+    def fall_counts(self) -> np.ndarray:
+        """ Return a float32 array, indexed by card id, of how many cards each card can fall, or -1 if the card is not in the game.
+        The array is calculated once per state.
+        """
+        if self._fall_counts is None:
+            counts = np.full(52, -1, dtype=np.float32)
+            if self.cards_fall:
+                counts[[card.id for card in self.cards_fall]] = [len(falls) for falls in self.cards_fall.values()]
+            self._fall_counts = counts
+        return self._fall_counts
+    
+    def encode_cards_into(self, out : np.ndarray, cards : Iterable[Card]) -> np.ndarray:
+        """ Write the encoding of cards (see 'encode_cards') to the 52 long array 'out' and return it. """
+        out[:] = 0
+        ids = [card.id for card in cards if card.id >= 0]
+        if ids:
+            out[ids] = self.fall_counts()[ids]
+        return out
+    
+    def as_array(self, normalize : bool = True, out : np.ndarray = None, hand_cards : Iterable[Card] = None) -> np.ndarray:
+        """Write the state vector to a float32 array. The values are identical to 'np.array(self.as_vector(normalize), dtype=np.float32)'.
+        If 'hand_cards' is given, the encoding of the cards (see 'encode_cards') is appended to the vector, unnormalized.
+
+        Args:
+            normalize (bool, optional): Whether to divide the values, except the player statuses, by 52. Defaults to True.
+            out (np.ndarray, optional): A preallocated float32 array of length 'vector_length' to write to. Defaults to None, in which case a new array is created.
+            hand_cards (Iterable[Card], optional): The cards to encode to the end of the vector. Defaults to None.
+
+        Returns:
+            np.ndarray: The state vector
+        """
+        length = self.vector_length(with_hand = hand_cards is not None)
+        if out is None:
+            out = np.empty(length, dtype=np.float32)
+        elif out.shape != (length,):
+            raise ValueError(f"The output array must have shape ({length},), not {out.shape}")
+        nplayers = len(self.player_status)
+        out[0] = self.deck_left
+        ind = 1
+        for cards in self.player_cards:
+            self.encode_cards_into(out[ind:ind+52], cards)
+            ind += 52
+        out[ind:ind+52] = self.fall_counts()
+        ind += 52
+        self.encode_cards_into(out[ind:ind+52], self.cards_on_table)
+        ind += 52
+        self.encode_cards_into(out[ind:ind+52], self.fell_cards)
+        ind += 52
+        out[ind:ind+nplayers] = [len(cards) for cards in self.player_cards]
+        ind += nplayers
+        if normalize:
+            # The values are integers, so dividing in float32 rounds the same as dividing in float64 and casting
+            out[:ind] /= 52
+        out[ind:ind+nplayers] = self.player_status
+        ind += nplayers
+        if hand_cards is not None:
+            self.encode_cards_into(out[ind:ind+52], hand_cards)
+        return out
+    
     def _get_player_status(cls, game : 'MoskaGame') -> List[int]:
         """Get the status vector of the players in the game instance.
             - 0 : the player is not in the game.
@@ -103,4 +169,67 @@ class GameState:
             statuses.append(out)
         return tuple(statuses)
     
-        
\ No newline at end of file
+        
+
+class StateBatch:
+    """ A reusable float32 buffer of state vectors, for evaluating many states with a single model call.
+    The states are written directly to the rows of the buffer. If more states are added than fit in the buffer,
+    the full buffer is evaluated and reused, so large sets of states are streamed in chunks of 'max_rows' states.
+    """
+    def __init__(self, vector_length : int, max_rows : int = 600, evaluate : Callable[[np.ndarray],np.ndarray] = None):
+        """ Allocate the buffer.
+
+        Args:
+            vector_length (int): The length of a single state vector (see GameState.vector_length)
+            max_rows (int, optional): The number of states evaluated at once. Defaults to 600.
+            evaluate (Callable[[np.ndarray],np.ndarray], optional): The function used to evaluate a (n, vector_length) array of states,
+            for example MoskaGame.model_predict. Defaults to None, in which case the batch can't be evaluated.
+        """
+        self.vector_length = vector_length
+        self.buffer = np.empty((max_rows, vector_length), dtype=np.float32)
+        self.evaluate = evaluate
+        self.nrows = 0
+        self._nstates = 0
+        self._evaluations = []
+    
+    def __len__(self) -> int:
+        """ The number of states added since the last reset """
+        return self._nstates
+    
+    def add(self, state : GameState, hand_cards : Iterable[Card] = None, normalize : bool = False) -> np.ndarray:
+        """ Encode a state to the next free row of the buffer (see GameState.as_array), and return the row.
+        If the buffer is full, it is first evaluated and emptied.
+        """
+        if self.nrows == len(self.buffer):
+            self.flush()
+        row = self.buffer[self.nrows]
+        state.as_array(normalize=normalize, out=row, hand_cards=hand_cards)
+        self.nrows += 1
+        self._nstates += 1
+        return row
+    
+    def flush(self) -> None:
+        """ Evaluate the states in the buffer, store the evaluations and empty the buffer """
+        if self.nrows == 0:
+            return
+        if self.evaluate is None:
+            raise ValueError("The StateBatch is full, and there is no 'evaluate' function")
+        # The rows are a contiguous view of the buffer, so they are passed to the model without copying
+        evals = self.evaluate(self.buffer[:self.nrows])
+        self._evaluations.append(np.array(evals, copy=True))
+        self.nrows = 0
+        return
+    
+    def finish(self) -> np.ndarray:
+        """ Evaluate the remaining states and return the evaluations of all states added since the last reset, in order. """
+        self.flush()
+        evals = np.concatenate(self._evaluations) if self._evaluations else np.empty((0,1), dtype=np.float32)
+        self.reset()
+        return evals
+    
+    def reset(self) -> None:
+        """ Empty the buffer, and forget the stored evaluations """
+        self.nrows = 0
+        self._nstates = 0
+        self._evaluations = []
+        return
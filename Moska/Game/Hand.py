@@ -1,14 +1,17 @@
 from __future__ import annotations
-from typing import Iterable, TYPE_CHECKING
+from typing import Iterable, List, TYPE_CHECKING
+from .CardSet import CardSet, cards_to_mask
 if TYPE_CHECKING:
     from Game import MoskaGame
     from Deck import Card
 
 
 class MoskaHand:
-    """This class represents a players Hand
+    """This class represents a players Hand.
+    The cards are available as a list in 'cards', and as a CardSet in 'card_set'.
     """
-    cards = []
+    _cards : List[Card] = []
+    _mask : int = 0
     moskaGame = None
     def __init__(self,moskaGame : MoskaGame):
         """Initialize a MoskaHand instance. This requires a reference to a MoskaGame instance.
@@ -19,6 +22,21 @@ class MoskaHand:
         self.cards = moskaGame.deck.pop_cards(6)
         self.moskaGame = moskaGame
     
+    @property
+    def cards(self) -> List[Card]:
+        """ The cards in hand as a list. If the list is modified inplace, it must be set again (eq. hand.cards += cards) """
+        return self._cards
+    
+    @cards.setter
+    def cards(self, cards : List[Card]) -> None:
+        self._cards = cards
+        self._mask = cards_to_mask(cards)
+    
+    @property
+    def card_set(self) -> CardSet:
+        """ The cards in hand as a CardSet """
+        return CardSet(self._mask)
+    
     def draw(self,n : int):
         """Draw n cards from the deck associated with the MoskaGame -instance.
         Add the cards to this hand.
@@ -26,7 +44,9 @@ class MoskaHand:
         Args:
             n (_type_): _description_
         """
-        self.cards += self.moskaGame.deck.pop_cards(n)
+        drawn = self.moskaGame.deck.pop_cards(n)
+        self._cards += drawn
+        self._mask |= cards_to_mask(drawn)
         return
     
     def add(self,cards : Iterable[Card]):
@@ -35,7 +55,9 @@ class MoskaHand:
         Args:
             cards (Iterable[Card]): Cards to add
         """
-        self.cards += [c for c in cards]
+        cards = [c for c in cards]
+        self._cards += cards
+        self._mask |= cards_to_mask(cards)
         return
     
     def pop_cards(self,cond = lambda x : True, max_cards = float("inf")):
@@ -47,11 +69,12 @@ class MoskaHand:
         TODO: Make safer, for ex by checking whether the calling thread has the moskaGames lock.
         """
         out = []
-        for card in self.cards.copy():
+        for card in self._cards.copy():
             if cond(card):
-                out.append(self.cards.pop(self.cards.index(card)))
+                out.append(self._cards.pop(self._cards.index(card)))
             if len(out) >= max_cards:
                 break
+        self._mask &= ~cards_to_mask(out)
         return out[0:min(max_cards,len(out))]
     
     def __repr__(self) -> str:
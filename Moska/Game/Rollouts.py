@@ -0,0 +1,90 @@
+from __future__ import annotations
+import random
+from typing import TYPE_CHECKING, Callable, Iterable, Tuple
+import numpy as np
+from .DealSampler import DealSampler
+from .FastGame import FastGame, heuristic_action
+if TYPE_CHECKING:
+    from .Deck import Card
+    from .Game import MoskaGame
+    from .GameState import GameState
+    from ..Player.AbstractPlayer import AbstractPlayer
+
+
+class RolloutEvaluator:
+    """ Estimates the value of a position by playing it to the end many times with a cheap policy on FastGame.
+    The rollouts have no players, logging, threads or state vectors.
+
+    The hidden cards are dealt again for every rollout (see DealSampler), so the estimate is an average over the deals
+    consistent with what is known. The result is the frequency at which each player lost, indexed by pid.
+    """
+    def __init__(self, policy : Callable = None, max_decisions : int = 1000, seed : int = None):
+        """
+        Args:
+            policy (Callable, optional): A callable(FastGame, random.Random) -> (move, arg), which all players use.
+            For example FastGame.heuristic_action (MoskaBot3-style) or FastGame.random_action (random legal moves). Defaults to FastGame.heuristic_action.
+            max_decisions (int, optional): The number of decisions, after which a rollout continues with random moves (see FastGame.play_out). Defaults to 1000.
+            seed (int, optional): The seed of the deals and the policy. Defaults to None.
+        """
+        self.policy = policy if policy is not None else heuristic_action
+        self.max_decisions = max_decisions
+        self.rng = random.Random(seed)
+
+    def evaluate(self, game : FastGame, n : int, sampler : DealSampler = None, action : Tuple = None) -> np.ndarray:
+        """ Play 'game' to the end 'n' times, and return the loss frequency of each player.
+
+        Args:
+            game (FastGame): The starting position. It is not modified.
+            n (int): The number of rollouts.
+            sampler (DealSampler, optional): The sampler of the hidden cards, whose deal replaces the hands and the deck of 'game' in each rollout.
+            Defaults to None, in which case the hands and the deck of 'game' are used as they are.
+            action (Tuple, optional): The (move, arg) action, that the current player makes first in each rollout, to evaluate the action. Defaults to None.
+        """
+        losses = np.zeros(game.nplayers, dtype=np.float64)
+        policy, rng, max_decisions = self.policy, self.rng, self.max_decisions
+        for _ in range(n):
+            rollout = game.copy()
+            if sampler is not None:
+                rollout.hands, rollout.deck = sampler.sample(rng)
+            if action is not None:
+                rollout.apply(*action)
+            loser = rollout.play_out(policy, rng, max_decisions)
+            if loser >= 0:
+                losses[loser] += 1
+        return losses / max(n, 1)
+
+    def evaluate_game(self, moskaGame : MoskaGame, n : int, player : AbstractPlayer = None, current : int = None) -> np.ndarray:
+        """ Return the loss frequencies of the players of 'moskaGame' (for example a MoskaGame.clone) in 'n' rollouts.
+
+        Args:
+            moskaGame (MoskaGame): The game. It is not modified.
+            n (int): The number of rollouts.
+            player (AbstractPlayer, optional): The player whose knowledge is used: the cards hidden from the player are dealt randomly.
+            Defaults to None, in which case all the hands are known and only the order of the deck is random.
+            current (int, optional): The pid of the player who decides next. Defaults to the player holding the lock,
+            or if the game has no running players, the initiator if the table is empty and the target otherwise.
+        """
+        running = moskaGame.lock_holder in moskaGame.threads
+        game = FastGame.from_game(moskaGame, current=current if current is not None or running else 0)
+        if current is None and not running:
+            game.current = game.first_player()
+        if player is not None:
+            sampler = DealSampler.from_game(moskaGame, player)
+        else:
+            # The triumph card stays at the bottom of the deck
+            sampler = DealSampler(game.deck[1:], game.hands, [0]*game.nplayers, len(game.deck), game.deck[0] if game.deck else -1)
+        return self.evaluate(game, n, sampler)
+
+    def evaluate_state(self, state : GameState, n : int, triumph : str = None, pid : int = None, hand : Iterable[Card] = None, current : int = None) -> np.ndarray:
+        """ Return the loss frequencies of the players in 'state' in 'n' rollouts. The cards not known to everyone are dealt randomly.
+
+        Args:
+            state (GameState): The state.
+            n (int): The number of rollouts.
+            triumph (str, optional): The triumph suit. Defaults to the suit deduced from the state (see FastGame.from_state).
+            pid (int, optional): The pid of the player, whose 'hand' is known. Defaults to None.
+            hand (Iterable[Card], optional): The cards in the hand of player 'pid'. Defaults to None.
+            current (int, optional): The pid of the player who decides next (see FastGame.from_state).
+        """
+        game = FastGame.from_state(state, triumph=triumph, current=current)
+        return self.evaluate(game, n, DealSampler.from_state(state, pid, hand))
@@ -2,9 +2,11 @@ from __future__ import annotations
 from typing import Callable, TYPE_CHECKING, Dict, List
 from collections import Counter
 from .Deck import Card
+from .CardSet import CardSet
 from ..Player.AbstractPlayer import AbstractPlayer
 if TYPE_CHECKING:
     from .Game import MoskaGame
+    from .UndoLog import UndoLog
 from . import utils
 
 
@@ -28,7 +30,7 @@ class _PlayToPlayer:
         """ Check that the cards are playable.
         Return whether the player has the play_cards in hand.
         """
-        return all([card in self.player.hand.cards for card in self.cards])
+        return CardSet.from_cards(self.cards) <= self.player.hand.card_set
     
     def check_fits(self) -> bool:
         """ Check that the cards fit in the table.
@@ -40,6 +42,14 @@ class _PlayToPlayer:
         """ Check that the target is the active player """
         return tg is self.moskaGame.get_target_player()
     
+    def record_undo(self, log : UndoLog) -> None:
+        """ Record the parts of the game, that 'play' modifies, to the undo log """
+        log.save_hand(self.player.hand)
+        log.save_list(self.moskaGame.cards_to_fall)
+        log.save_attr(self.moskaGame, "to_fall_mask")
+        if self.player is not self.target:
+            log.save_deck(6)
+    
     def play(self) -> None:
         """Play the play_cards to the table;
         Modify the players hand, add cards to the table, and draw cards from the deck.
@@ -74,6 +84,8 @@ class InitialPlay(_PlayToPlayer):
         assert self.check_cards_available(), "Some of the played cards are not available"
         assert self.check_fits(), "Attempted to play too many cards."
         assert self.check_target_active(self.target), "Target is not active"
+        if self.moskaGame.undo_log is not None:
+            self.record_undo(self.moskaGame.undo_log)
         self.play()
         
     def check_single_or_multiple(self):
@@ -101,6 +113,8 @@ class PlayToOther(_PlayToPlayer):
         else:
             assert self.check_deck_left(), "There is no deck left, and playing to self is not possible."
         assert self.check_in_table(), "Some of the cards you tried to play, are not playable, because they haven't yet been played by another player."
+        if self.moskaGame.undo_log is not None:
+            self.record_undo(self.moskaGame.undo_log)
         self.play()
         
     def check_deck_left(self):
@@ -109,12 +123,12 @@ class PlayToOther(_PlayToPlayer):
     
     def _playable_values(self):
         """ Return a set of values, that can be played to target"""
-        return set([c.value for c in self.moskaGame.cards_to_fall + self.moskaGame.fell_cards])
+        return self.moskaGame.get_table_card_set().values()
     
     def check_in_table(self):
         """ Check that the cards have already been played by either the player or an opponent"""
-        playable_values = self._playable_values()
-        return all((card.value in playable_values for card in self.cards))
+        play_set = CardSet.from_cards(self.cards)
+        return play_set.with_values_of(self.moskaGame.get_table_card_set()) == play_set
 
 class PlayToSelfFromDeck(_PlayToPlayer):
     def __call__(self, player : AbstractPlayer, target : AbstractPlayer, cards : List[Card]):
@@ -125,6 +139,8 @@ class PlayToSelfFromDeck(_PlayToPlayer):
         assert self.player is self.target, "Player is not playing to self"
         assert self.check_cards_available(), "Some of the played cards are not available"
         assert self.check_target_active(self.target), "The specified target is not active"
+        if self.moskaGame.undo_log is not None:
+            self.record_undo(self.moskaGame.undo_log)
         self.play()
 
 class PlayToSelf(PlayToOther):
@@ -146,6 +162,8 @@ class PlayFallFromHand:
         assert self.check_cards_fall(), "Some of the played cards were not matched to a correct card to fall."
         assert self.check_player_has_turn(), "The player does not have the turn."
         assert self.check_cards_available(), "Some of the played cards are not available"
+        if self.moskaGame.undo_log is not None:
+            self.record_undo(self.moskaGame.undo_log)
         self.play()
         
     def check_cards_fall(self):
@@ -156,10 +174,18 @@ class PlayFallFromHand:
         """ Check that the cards are playable.
         Return whether the player has the play_cards in hand.
         """
-        return all([card in self.player.hand.cards for card in self.play_fall.keys()])
+        return CardSet.from_cards(self.play_fall.keys()) <= self.player.hand.card_set
     
     def check_player_has_turn(self):
         return self.moskaGame.get_target_player() is self.player
+    
+    def record_undo(self, log : UndoLog) -> None:
+        """ Record the parts of the game, that 'play' modifies, to the undo log """
+        log.save_hand(self.player.hand)
+        log.save_list(self.moskaGame.cards_to_fall)
+        log.save_list(self.moskaGame.fell_cards)
+        log.save_attr(self.moskaGame, "to_fall_mask")
+        log.save_attr(self.moskaGame, "fell_mask")
         
     def play(self):
         """For played_card, fall_card -pair, modify the game state;
@@ -172,6 +198,8 @@ class PlayFallFromHand:
             self.moskaGame.fell_cards.append(fc)                                            # Add to fell cards
             self.player.hand.pop_cards(cond = lambda x : x == pc)                           # Remove card from hand
             self.moskaGame.fell_cards.append(pc)                                            # Add card to fell cards
+            self.moskaGame.to_fall_mask &= ~(1 << fc.id)
+            self.moskaGame.fell_mask |= 1 << fc.id | 1 << pc.id
         
             
 class PlayFallFromDeck:
@@ -193,6 +221,8 @@ class PlayFallFromDeck:
         assert self.fall_method is not None, "No fall_method specified"
         assert self.check_cards_on_table(), "There are no cards on the table which should be fell"
         assert self.check_cards_in_deck(), "There are no cards from which to draw"
+        if self.moskaGame.undo_log is not None:
+            self.record_undo(self.moskaGame.undo_log)
         self.play_card()
     
     def check_cards_on_table(self):
@@ -204,14 +234,23 @@ class PlayFallFromDeck:
         return len(self.moskaGame.deck) > 0
     
     def check_not_already_kopled(self):
-        return not any((c.kopled for c in self.moskaGame.cards_to_fall))
+        return not self.moskaGame.kopled_on_table()
+    
+    def record_undo(self, log : UndoLog) -> None:
+        """ Record the parts of the game, that 'play_card' modifies, to the undo log """
+        log.save_deck(1)
+        log.save_attr(self.moskaGame, "kopled_mask")
+        log.save_list(self.moskaGame.cards_to_fall)
+        log.save_list(self.moskaGame.fell_cards)
+        log.save_attr(self.moskaGame, "to_fall_mask")
+        log.save_attr(self.moskaGame, "fell_mask")
     
     def play_card(self):
         """ Pop a card from deck, if the card can fall a card on the table, use fall_method to select the card.
         If the card can't fall any card, add it to table.
         """
         self.card = self.moskaGame.deck.pop_cards(1)[0]
-        self.card.kopled = True
+        self.moskaGame.kopled_mask |= 1 << self.card.id
         self.moskaGame.glog.info(f"{self.player.name} kopled {self.card}")
         if self.check_can_fall():
             play_fall = self.fall_method(self.card)
@@ -226,6 +265,8 @@ class PlayFallFromDeck:
             self.moskaGame.cards_to_fall.pop(self.moskaGame.cards_to_fall.index(play_fall[1]))
             self.moskaGame.fell_cards.append(play_fall[1])
             self.moskaGame.fell_cards.append(play_fall[0])
+            self.moskaGame.to_fall_mask &= ~(1 << play_fall[1].id)
+            self.moskaGame.fell_mask |= 1 << play_fall[1].id | 1 << play_fall[0].id
         else:
             self.player.plog.debug(f"Adding {self.card} to cards_to_fall")
             self.moskaGame.glog.info(f"Adding {self.card} to cards_to_fall")
@@ -234,7 +275,7 @@ class PlayFallFromDeck:
     def check_can_fall(self,in_ = None):
         """ Return if the card can fall a card on the table """
         in_ = self.moskaGame.cards_to_fall if not in_ else in_
-        return any([utils.check_can_fall_card(self.card,fc,self.moskaGame.triumph) for fc in in_])
+        return bool(utils.can_fall_mask(self.card,self.moskaGame.triumph) & CardSet.from_cards(in_).mask)
 
 class EndTurn:
     """ Class representing ending a turn. """
@@ -259,14 +300,33 @@ class EndTurn:
         else:
             assert self.check_pick_all_cards() or self.check_pick_cards_to_fall(), f"Either pick all cards that have not been fallen, or pick all cards from table"
             assert self.check_turn(), "It is not this players turn to lift the cards"
+        if self.moskaGame.undo_log is not None:
+            self.record_undo(self.moskaGame.undo_log)
         self.pick_the_cards()
     
+    def record_undo(self, log : UndoLog) -> None:
+        """ Record the parts of the game, that 'pick_the_cards' modifies, to the undo log.
+        The changes to the card monitor, when cards are removed from the game, are recorded by the CardMonitor.
+        """
+        log.save_hand(self.player.hand)
+        log.save_deck(6)
+        log.save_attr(self.moskaGame, "kopled_mask")
+        log.save_attr(self.moskaGame.turnCycle, "ptr")
+        log.save_list(self.moskaGame.cards_to_fall)
+        log.save_list(self.moskaGame.fell_cards)
+        log.save_attr(self.moskaGame, "to_fall_mask")
+        log.save_attr(self.moskaGame, "fell_mask")
+    
     def clear_table(self):
-        # Only remove cards from game, if they were not picked. Then they were lifted by the player
-        if self.check_pick_cards_to_fall():
-            self.moskaGame.card_monitor.remove_from_game(self.moskaGame.fell_cards)
+        # Remove the cards, that were not picked, from the game. A finished player can leave cards to fall on the table.
+        picked = CardSet.from_cards(self.pick_cards)
+        removed = [card for card in self.moskaGame.cards_to_fall + self.moskaGame.fell_cards if card not in picked]
+        if removed:
+            self.moskaGame.card_monitor.remove_from_game(removed)
         self.moskaGame.cards_to_fall.clear()
         self.moskaGame.fell_cards.clear()
+        self.moskaGame.to_fall_mask = 0
+        self.moskaGame.fell_mask = 0
         
     def check_can_pick_none(self):
         """ Check if there are cards to fall"""
@@ -282,13 +342,13 @@ class EndTurn:
         """ Check if every pick_card equals cards_to_fall"""
         #return all([card in self.moskaGame.cards_to_fall for card in self.pick_cards])
         #return all([picked == card for picked,card in zip(self.pick_cards,self.moskaGame.cards_to_fall)])
-        return set(self.pick_cards) == set(self.moskaGame.cards_to_fall)
+        return CardSet.from_cards(self.pick_cards) == self.moskaGame.get_cards_to_fall_set()
     
     def check_pick_all_cards(self):
         """ Check if every pick_card is in either cards_to_fall or in fell_cards and not every card is in cards_to_fall"""
         #return all([card in self.moskaGame.cards_to_fall + self.moskaGame.fell_cards for card in self.pick_cards]) and not self.check_pick_cards_to_fall()
         #return all([picked == card for picked,card in zip(self.pick_cards,self.moskaGame.cards_to_fall + self.moskaGame.fell_cards)])
-        return set(self.pick_cards) == set(self.moskaGame.cards_to_fall + self.moskaGame.fell_cards)
+        return CardSet.from_cards(self.pick_cards) == self.moskaGame.get_table_card_set()
     
     def check_has_played_cards(self):
         """ Check if there are cards that are not fallen or that are fallen"""
@@ -300,8 +360,7 @@ class EndTurn:
         """
         self.player.hand.cards += self.pick_cards
         self.player.hand.draw(6 - len(self.player.hand))
-        for card in self.player.hand.cards:
-            card.kopled = False
+        self.moskaGame.kopled_mask &= ~self.player.hand.card_set.mask
         self.moskaGame.turnCycle.get_next_condition(cond = lambda x : x.rank is None)
         self.moskaGame.glog.info(f"{self.player.name} ending turn.")
         self.player.plog.info(f"Lifted cards {self.pick_cards}")
@@ -0,0 +1,95 @@
+from __future__ import annotations
+import itertools as it
+from typing import Any, Dict, List, Tuple, TYPE_CHECKING
+from .Deck import REFERENCE_DECK
+if TYPE_CHECKING:
+    from .Game import MoskaGame
+    from .Hand import MoskaHand
+    from .Deck import Card
+
+
+class UndoLog:
+    """ A log of the parts of a MoskaGame, that were changed by a move.
+    The Turns classes and the CardMonitor record the state they are about to change to MoskaGame.undo_log,
+    which is only set while a move is applied with MoskaGame._apply_move.
+    Only the first recording of each object is kept, so the log always holds the state before the move.
+    Calling undo() restores the game in O(changed cards).
+    """
+    moskaGame : MoskaGame = None
+    def __init__(self, moskaGame : MoskaGame):
+        """ Create an empty UndoLog for the game.
+
+        Args:
+            moskaGame (MoskaGame): The game whose state is recorded
+        """
+        self.moskaGame = moskaGame
+        self._hands : Dict[int,Tuple[MoskaHand,List[Card],int]] = {}
+        self._lists : Dict[int,Tuple[List,List]] = {}
+        self._attrs : Dict[Tuple[int,str],Tuple[Any,str,Any]] = {}
+        self._deck : Tuple[int,List[Card]] = None
+        self._fall_dict_entries : Dict[Card,List[Card]] = {}
+        self._fall_dict_keys_removed = False
+
+    def save_hand(self, hand : MoskaHand) -> None:
+        """ Record the cards in a hand """
+        if id(hand) not in self._hands:
+            self._hands[id(hand)] = (hand, list(hand._cards), hand._mask)
+        return
+
+    def save_list(self, lst : List) -> None:
+        """ Record the contents of a list, which is modified inplace by the move """
+        if id(lst) not in self._lists:
+            self._lists[id(lst)] = (lst, list(lst))
+        return
+
+    def save_attr(self, obj : Any, name : str) -> None:
+        """ Record the value of an immutable attribute, for example MoskaGame.kopled_mask or TurnCycle.ptr """
+        if (id(obj),name) not in self._attrs:
+            self._attrs[(id(obj),name)] = (obj, name, getattr(obj,name))
+        return
+
+    def save_deck(self, n : int = 6) -> None:
+        """ Record the top n cards of the deck. Moves only pop cards from the top of the deck,
+        so the deck is restored by placing the popped cards back on top.
+        """
+        if self._deck is None:
+            self._deck = (len(self.moskaGame.deck), list(it.islice(self.moskaGame.deck.cards, n)))
+        return
+
+    def save_fall_dict_entry(self, card : Card, removed : bool = False) -> None:
+        """ Record the entry of a card in CardMonitor.cards_fall_dict.
+
+        Args:
+            card (Card): The key of the entry
+            removed (bool, optional): Whether the key is about to be removed. Defaults to False.
+        """
+        if card not in self._fall_dict_entries:
+            self._fall_dict_entries[card] = list(self.moskaGame.card_monitor.cards_fall_dict[card])
+        self._fall_dict_keys_removed = self._fall_dict_keys_removed or removed
+        return
+
+    def undo(self) -> None:
+        """ Restore the recorded state of the game. Lists are restored inplace, so references to them stay valid
+        (except the lists of CardMonitor.cards_fall_dict, which are replaced)."""
+        for hand, cards, mask in self._hands.values():
+            hand._cards[:] = cards
+            hand._mask = mask
+        for lst, content in self._lists.values():
+            lst[:] = content
+        for obj, name, value in self._attrs.values():
+            setattr(obj, name, value)
+        if self._deck is not None:
+            deck_len, top_cards = self._deck
+            popped = deck_len - len(self.moskaGame.deck)
+            self.moskaGame.deck.cards.extendleft(reversed(top_cards[:popped]))
+        if self._fall_dict_entries:
+            cards_fall_dict = self.moskaGame.card_monitor.cards_fall_dict
+            # The lists are replaced, like in CardMonitor.remove_from_game, since they can be shared with clones of the game
+            for card, falls in self._fall_dict_entries.items():
+                cards_fall_dict[card] = falls
+            # The dictionary is created in the order of card ids, and keys are only removed, so restore the order
+            if self._fall_dict_keys_removed:
+                ordered = [(card, cards_fall_dict[card]) for card in REFERENCE_DECK if card in cards_fall_dict]
+                cards_fall_dict.clear()
+                cards_fall_dict.update(ordered)
+        return
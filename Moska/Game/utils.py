@@ -1,13 +1,32 @@
 from __future__ import annotations
+import logging
+import random
 from functools import wraps
-from typing import Any, Callable, Iterable, List, TYPE_CHECKING, Sequence
+from math import comb
+from typing import Any, Callable, Iterable, Iterator, List, TYPE_CHECKING, Sequence, Tuple
 if TYPE_CHECKING:
     from .Deck import Card
 
 CARD_VALUES = tuple(range(2,15))                            # Initialize the standard deck
 CARD_SUITS = ("C","D","H","S") 
 CARD_SUIT_SYMBOLS = {"S":'♠', "D":'♦',"H": '♥',"C": '♣',"X":"X"}    #Conversion table
+SUIT_INDEX = {suit : i for i,suit in enumerate(CARD_SUITS)} # The position of each suit in CARD_SUITS
 MAIN_DECK = None                                            # The main deck
+# A logger that discards all messages, used by the copies made with MoskaGame.clone
+NULL_LOGGER = logging.getLogger("Moska.null")
+NULL_LOGGER.disabled = True
+
+def card_index(card : Card) -> int:
+    """Return the index of the card in an unshuffled deck, where the cards are ordered by value and then by suit.
+    This is the id of the card (card.id), the position of the card in Deck.REFERENCE_DECK, and the cards bit in a CardSet.
+
+    Args:
+        card (Card): The card. Must not be an unknown card (Card(-1,"X"))
+
+    Returns:
+        int: index of the card, 0...51
+    """
+    return (card.value - CARD_VALUES[0])*len(CARD_SUITS) + SUIT_INDEX[card.suit]
 
 def check_signature(sig : Sequence, inp : Sequence) -> bool:
     for s, i in zip(sig,inp):
@@ -43,11 +62,56 @@ def suit_to_symbol(suits : Iterable or str) -> List or str:
         return CARD_SUIT_SYMBOLS[suits]
     return [CARD_SUIT_SYMBOLS[s] for s in suits]
 
+def _check_can_fall_card_rule(played_value : int, played_suit : str, fall_value : int, fall_suit : str, triumph : str) -> bool:
+    """ The rule for whether a card can fall another card. Used to build CAN_FALL_MASKS. """
+    # Jos kortit ovat samaa maata ja pelattu kortti on suurempi
+    if played_suit == fall_suit and played_value > fall_value:
+        return True
+    # Jos pelattu kortti on valttia, ja kaadettava kortti ei ole valttia
+    return played_suit == triumph and fall_suit != triumph
+
+def _make_can_fall_masks(triumph : str) -> tuple:
+    """ Return a tuple of 52 bit masks, where bit j of the i:th mask is set if the card with index i can fall the card with index j,
+    when the triumph suit is 'triumph'. The indices are as in 'card_index'.
+    """
+    cards = [(v,s) for v in CARD_VALUES for s in CARD_SUITS]
+    masks = []
+    for pv, ps in cards:
+        mask = 0
+        for j, (fv, fs) in enumerate(cards):
+            if _check_can_fall_card_rule(pv, ps, fv, fs, triumph):
+                mask |= 1 << j
+        masks.append(mask)
+    return tuple(masks)
+
+# The precomputed dominance tables; CAN_FALL_MASKS[triumph][played_card.id] is the bit mask of cards that played_card can fall.
+# These are built once at import, and shared read-only.
+CAN_FALL_MASKS = {triumph : _make_can_fall_masks(triumph) for triumph in CARD_SUITS}
+
+def can_fall_mask(played_card : Card, triumph : str) -> int:
+    """Return the bit mask (see CardSet) of all cards, that played_card can fall.
+
+    Args:
+        played_card (Card): The card played from hand
+        triumph (str): The triumph suit of the current game
+
+    Returns:
+        int: The bit mask of cards that played_card can fall
+
+    Raises:
+        ValueError: If played_card is the unknown card
+    """
+    if played_card.id < 0:
+        raise ValueError(f"Can not fall cards with the unknown card {played_card}")
+    return CAN_FALL_MASKS[triumph][played_card.id]
+
 def check_can_fall_card(played_card : Card, fall_card : Card,triumph : str) -> bool:
     """Returns true, if the played_card, can fall the fall_card.
     The played card can fall fall_card, if:
     - The played card has the same suit and is greater than fall_card
     - If the played_card is triumph suit, and the fall_card is not.
+    
+    This is a lookup from the precomputed CAN_FALL_MASKS.
 
     Args:
         played_card (Card): The card played from hand
@@ -57,14 +121,146 @@ def check_can_fall_card(played_card : Card, fall_card : Card,triumph : str) -> b
     Returns:
         bool: True if played_card can fall fall_card, false otherwise
     """
-    success = False
-    # Jos kortit ovat samaa maata ja pelattu kortti on suurempi
-    if played_card.suit == fall_card.suit and played_card.value > fall_card.value:
-        success = True
-    # Jos pelattu kortti on valttia, ja kaadettava kortti ei ole valttia
-    elif played_card.suit == triumph and fall_card.suit != triumph:
-            success = True
-    return success
+    return bool(CAN_FALL_MASKS[triumph][played_card.id] >> fall_card.id & 1)
+
+def iter_assignments(row_masks : Sequence[int], max_assignments : int = None, max_work : int = None) -> Iterator[Tuple[int,...]]:
+    """Lazily yield each distinct partial matching of rows (cards in hand) to columns (cards on the table) exactly once.
+    A matching is yielded as a flat tuple (row0, col0, row1, col1, ...) with increasing rows,
+    so different orders of the same pairs are not yielded separately.
+    The search is an iterative depth first search, where the used columns are a bit mask and the rows are assigned in increasing order.
+    The single pairs are yielded first.
+
+    Args:
+        row_masks (Sequence[int]): For each row, the bit mask of the columns it can be assigned to
+        max_assignments (int, optional): Stop after this many matchings. Defaults to None (no limit).
+        max_work (int, optional): Stop after examining this many rows and pairs in total, even if few matchings were found. Defaults to None (no limit).
+
+    Yields:
+        Tuple[int,...]: A non-empty matching
+    """
+    # The rows that can be assigned to at least one column
+    rows = [r for r, mask in enumerate(row_masks) if mask]
+    nfound = 0
+    work = 0
+    # (position in 'rows' of the first row that can still be assigned, mask of used columns, matching so far)
+    stack = [(0, 0, ())]
+    while stack:
+        start, used, matching = stack.pop()
+        for i in range(start, len(rows)):
+            row = rows[i]
+            free = row_masks[row] & ~used
+            work += 1
+            while free:
+                low = free & -free
+                free ^= low
+                work += 1
+                if max_work is not None and work > max_work:
+                    return
+                new_matching = matching + (row, low.bit_length() - 1)
+                yield new_matching
+                nfound += 1
+                if max_assignments is not None and nfound >= max_assignments:
+                    return
+                if i + 1 < len(rows):
+                    stack.append((i + 1, used | low, new_matching))
+    return
+
+def _count_plays_by_size(groups : Sequence[Sequence[Card]], min_per_value : int, max_size : int) -> List[List[int]]:
+    """Return a table 'counts', where counts[i][s] is the number of ways to pick s cards from groups[i:],
+    picking either none or at least 'min_per_value' cards from each group.
+    """
+    counts = [[0]*(max_size + 1) for _ in range(len(groups) + 1)]
+    counts[-1][0] = 1
+    for i in reversed(range(len(groups))):
+        m = len(groups[i])
+        for size in range(max_size + 1):
+            total = counts[i+1][size]
+            for j in range(min_per_value, min(m, size) + 1):
+                total += comb(m, j) * counts[i+1][size - j]
+            counts[i][size] = total
+    return counts
+
+def _unrank_combination(cards : Sequence[Card], k : int, index : int) -> List[Card]:
+    """Return the combination of k cards at 'index' (0 <= index < comb(len(cards),k)) in lexicographic order"""
+    out = []
+    start = 0
+    while k > 0:
+        # The number of combinations, that begin with cards[start]
+        ncombs = comb(len(cards) - start - 1, k - 1)
+        if index < ncombs:
+            out.append(cards[start])
+            k -= 1
+        else:
+            index -= ncombs
+        start += 1
+    return out
+
+def iter_random_plays(cards : Sequence[Card], max_size : int, min_per_value : int = 1, include_singles : bool = False, exhaustive_limit : int = 4096) -> Iterator[List[Card]]:
+    """Lazily yield distinct plays (lists of cards) from 'cards' in a uniformly random order, without listing all the plays.
+    A play has 1...max_size cards, and has either none or at least 'min_per_value' cards of each value.
+    For example the plays to the table are 'iter_random_plays(playable_cards, fits_to_table)',
+    and the initial plays (a single card, or only pairs or larger groups) are 'iter_random_plays(hand, fits_to_table, 2, include_singles=True)'.
+
+    The plays are numbered with the number of plays of each size, and a random number is decoded to a play
+    by choosing the number of cards of each value, and then the cards. The cost of each play depends only on the number
+    of distinct values (at most 13). If there are at most 'exhaustive_limit' plays, they are yielded in a random permutation.
+    Otherwise random numbers are drawn and the already yielded ones are rejected, which is fast while less than about half of the plays are taken.
+
+    Args:
+        cards (Sequence[Card]): The cards to make the plays from
+        max_size (int): The maximum number of cards in a play
+        min_per_value (int, optional): The minimum number of cards of each value in the play. Defaults to 1.
+        include_singles (bool, optional): Also yield all single cards, if min_per_value > 1. Defaults to False.
+        exhaustive_limit (int, optional): See above. Defaults to 4096.
+
+    Yields:
+        List[Card]: A play, the cards ordered by value
+    """
+    groups = {}
+    for card in cards:
+        groups.setdefault(card.value, []).append(card)
+    groups = [groups[value] for value in sorted(groups)]
+    max_size = max(min(max_size, len(cards)), 0)
+    counts = _count_plays_by_size(groups, min_per_value, max_size)
+    singles = list(cards) if include_singles and min_per_value > 1 and max_size >= 1 else []
+    # The number of plays of each size
+    sizes = [(size, counts[0][size]) for size in range(1, max_size + 1) if counts[0][size] > 0]
+    total = len(singles) + sum(n for _, n in sizes)
+
+    def unrank(index : int) -> List[Card]:
+        if index < len(singles):
+            return [singles[index]]
+        index -= len(singles)
+        for size, n in sizes:
+            if index < n:
+                break
+            index -= n
+        play = []
+        for i, group in enumerate(groups):
+            # Choose how many cards of this value to take
+            for j in [0] + list(range(min_per_value, min(len(group), size) + 1)):
+                rest = counts[i+1][size - j]
+                ncombs = comb(len(group), j) * rest
+                if index < ncombs:
+                    break
+                index -= ncombs
+            combination_index, index = divmod(index, rest)
+            play += _unrank_combination(group, j, combination_index)
+            size -= j
+        return play
+
+    if total <= exhaustive_limit:
+        for index in random.sample(range(total), total):
+            yield unrank(index)
+        return
+    yielded = set()
+    while len(yielded) < total:
+        index = random.randrange(total)
+        if index in yielded:
+            continue
+        yielded.add(index)
+        yield unrank(index)
+    return
 
 def announce_new_card(self) -> None:
     """Change all players ready -state to False.
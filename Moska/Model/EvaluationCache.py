@@ -0,0 +1,81 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+class EvaluationCache:
+    """ A bounded LRU cache of model evaluations in front of a model.
+    The states are keyed by a 16 byte hash of the state vector, so identical states are evaluated only once,
+    for example the same successor state in consecutive decisions, or in different games of the process.
+    The number of hits and misses are counted in 'hits' and 'misses'.
+    """
+    def __init__(self, model, maxsize : int = 2**16):
+        """ Create an empty cache.
+
+        Args:
+            model : The model to evaluate the states not found in the cache. Must have a 'predict(X)' method.
+            maxsize (int, optional): The maximum number of evaluations to store. Defaults to 2**16.
+        """
+        self.model = model
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def state_key(state : np.ndarray) -> bytes:
+        """ The compact hash of a state vector, used as the key in the cache """
+        return hashlib.blake2b(state.tobytes(), digest_size=16).digest()
+
+    def predict(self, X : np.ndarray) -> np.ndarray:
+        """ Return the evaluations of the states in X, of shape (n, 1).
+        The states not found in the cache are evaluated with the model in a single batch, and stored.
+        A state repeated in X is evaluated once, and counted as a single miss.
+        """
+        keys = [self.state_key(row) for row in X]
+        evals = np.empty((len(X), 1), dtype=np.float32)
+        # key : indices of the rows with the key, for the keys not in the cache
+        missing = {}
+        with self.lock:
+            for i, key in enumerate(keys):
+                if key in missing:
+                    missing[key].append(i)
+                    continue
+                value = self.cache.get(key)
+                if value is None:
+                    missing[key] = [i]
+                else:
+                    self.cache.move_to_end(key)
+                    evals[i,0] = value
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        if not missing:
+            return evals
+        # Evaluate the first row of each missing key
+        rows = [indices[0] for indices in missing.values()]
+        X_missing = X if len(rows) == len(X) else X[rows]
+        new_evals = self.model.predict(X_missing)
+        for indices, value in zip(missing.values(), new_evals[:,0]):
+            evals[indices,0] = value
+        with self.lock:
+            for key, value in zip(missing.keys(), new_evals[:,0]):
+                self.cache[key] = value
+                self.cache.move_to_end(key)
+            while len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+        return evals
+
+    def hit_rate(self) -> float:
+        """ The fraction of evaluations found in the cache """
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def clear(self) -> None:
+        """ Empty the cache, and reset the counters """
+        with self.lock:
+            self.cache.clear()
+            self.hits = 0
+            self.misses = 0
+        return
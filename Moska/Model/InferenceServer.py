@@ -0,0 +1,209 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Tuple
+import numpy as np
+
+
+class InferenceServer:
+    """ A process that owns the models, and evaluates batches of states for game processes.
+    Clients (see InferenceClient) send their states through a shared request queue. The server coalesces the requests
+    that arrive within 'max_latency' seconds of the first request (up to 'max_batch_size' states) into a single batch per model,
+    evaluates the batch once, and sends each client its part of the evaluations.
+
+    The server is used by passing 'handle' to 'ModelRegistry.connect' in the game processes,
+    for example in the initializer of a multiprocessing.Pool. After that, MoskaGame.model_predict uses the server.
+    """
+    def __init__(self, max_latency : float = 0.002, max_batch_size : int = 1024, max_clients : int = 64):
+        """ Create the queues of the server. The server is started with 'start'.
+
+        Args:
+            max_latency (float, optional): How long (seconds) to wait for more requests after the first request, before evaluating. Defaults to 0.002.
+            max_batch_size (int, optional): Evaluate immediately, when there are this many states waiting. Defaults to 1024.
+            max_clients (int, optional): The maximum number of processes that can connect to the server. Defaults to 64.
+        """
+        self.max_latency = max_latency
+        self.max_batch_size = max_batch_size
+        self.request_queue = multiprocessing.Queue()
+        self.response_queues = [multiprocessing.Queue() for _ in range(max_clients)]
+        self.next_client_id = multiprocessing.Value("i", 0)
+        # The pid of the server process, so the clients can notice if it has exited
+        self.pid = multiprocessing.Value("i", 0)
+        self.process = None
+
+    @property
+    def handle(self) -> Tuple:
+        """ The arguments needed to connect to the server. Must be passed to the client process when it is created. """
+        return (self.request_queue, self.response_queues, self.next_client_id, self.pid)
+
+    def start(self) -> None:
+        """ Start the server process """
+        self.process = multiprocessing.Process(target=_serve, args=(self.request_queue, self.response_queues, self.max_latency, self.max_batch_size), daemon=True)
+        self.process.start()
+        self.pid.value = self.process.pid
+        return
+
+    def is_alive(self) -> bool:
+        """ Whether the server process is running """
+        return self.process is not None and self.process.is_alive()
+
+    def stop(self) -> None:
+        """ Tell the server process to exit, and wait for it """
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            self.request_queue.put(None)
+        self.process.join()
+        self.process = None
+        self.pid.value = 0
+        return
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+        return
+
+
+def _serve(request_queue : multiprocessing.Queue, response_queues : List[multiprocessing.Queue], max_latency : float, max_batch_size : int) -> None:
+    """ The main loop of the server process.
+    A request is a tuple (client_id, request_id, model_file, X), and the response is (request_id, evaluations or an Exception).
+    """
+    from . import ModelRegistry
+    # The models are loaded in this process, even if the parent process was connected to a server
+    ModelRegistry.disconnect()
+    running = True
+    while running:
+        request = request_queue.get()
+        if request is None:
+            break
+        requests = [request]
+        nstates = len(request[3])
+        deadline = time.time() + max_latency
+        # Coalesce the requests, that arrive before the deadline
+        while nstates < max_batch_size:
+            timeout = deadline - time.time()
+            if timeout <= 0:
+                break
+            try:
+                request = request_queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is None:
+                running = False
+                break
+            requests.append(request)
+            nstates += len(request[3])
+        # Evaluate the states of each model in a single batch
+        by_model : Dict[str,list] = {}
+        for request in requests:
+            by_model.setdefault(request[2],[]).append(request)
+        for model_file, model_requests in by_model.items():
+            try:
+                X = np.concatenate([r[3] for r in model_requests]) if len(model_requests) > 1 else model_requests[0][3]
+                evals = ModelRegistry.get_model(model_file).predict(X)
+            except Exception as e:
+                for client_id, request_id, _, _ in model_requests:
+                    response_queues[client_id].put((request_id, e))
+                continue
+            start = 0
+            for client_id, request_id, _, X in model_requests:
+                response_queues[client_id].put((request_id, evals[start:start+len(X)]))
+                start += len(X)
+    return
+
+
+def _is_alive(pid : int) -> bool:
+    """ Whether the process 'pid' is running. A process, that has exited but not been joined by its parent, is not running. """
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # The state follows the name of the executable in parentheses
+            return f.read().rsplit(")", 1)[1].split()[0] not in ("Z", "X")
+    except OSError:
+        return True
+
+
+class InferenceClient:
+    """ The connection of a process to an InferenceServer. Created with ModelRegistry.connect(server.handle).
+    Calls from different threads of the process are serialized.
+    """
+    def __init__(self, handle : Tuple, timeout : float = 60, poll_interval : float = 1):
+        """ Claim a response queue from the server.
+
+        Args:
+            handle (Tuple): InferenceServer.handle
+            timeout (float, optional): The maximum time (seconds) to wait for the response to a request. Defaults to 60.
+            poll_interval (float, optional): How often (seconds) to check that the server is still running, while waiting for a response. Defaults to 1.
+
+        Raises:
+            RuntimeError: If all response queues of the server are taken
+        """
+        self.request_queue, response_queues, next_client_id, self.server_pid = handle
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        with next_client_id.get_lock():
+            self.client_id = next_client_id.value
+            next_client_id.value += 1
+        if self.client_id >= len(response_queues):
+            raise RuntimeError(f"The InferenceServer accepts at most {len(response_queues)} clients")
+        self.response_queue = response_queues[self.client_id]
+        self.lock = threading.Lock()
+        self.request_id = 0
+
+    def predict(self, X : np.ndarray, model_file : str) -> np.ndarray:
+        """ Evaluate X with the model in 'model_file' on the server, and wait for the evaluations.
+
+        Raises:
+            RuntimeError: If the server process isn't running
+            TimeoutError: If there is no response in 'timeout' seconds
+        """
+        with self.lock:
+            if not _is_alive(self.server_pid.value):
+                raise RuntimeError("The InferenceServer is not running")
+            self.request_id += 1
+            request_id = self.request_id
+            self.request_queue.put((self.client_id, request_id, model_file, X))
+            response_id, evals = self._get_response(request_id)
+        if response_id != request_id:
+            raise RuntimeError(f"Received response {response_id} to request {request_id}")
+        if isinstance(evals, Exception):
+            raise evals
+        return evals
+
+    def _get_response(self, request_id : int) -> Tuple:
+        """ Wait for the response to 'request_id'. Responses to earlier requests, that timed out, are discarded. """
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                response = self.response_queue.get(timeout=max(min(self.poll_interval, deadline - time.time()), 0))
+            except queue.Empty:
+                if not _is_alive(self.server_pid.value):
+                    raise RuntimeError("The InferenceServer exited before responding")
+                if time.time() >= deadline:
+                    raise TimeoutError(f"No response from the InferenceServer in {self.timeout} seconds")
+                continue
+            if response[0] < request_id:
+                continue
+            return response
+
+
+class RemoteModel:
+    """ A model evaluated on an InferenceServer. Has the same 'predict' method as the models loaded locally. """
+    def __init__(self, client : InferenceClient, model_file : str):
+        self.client = client
+        self.model_file = model_file
+
+    def predict(self, X : np.ndarray) -> np.ndarray:
+        return self.client.predict(X, self.model_file)
@@ -0,0 +1,98 @@
+""" A process-wide registry of inference models.
+Each model file is loaded once per process, the first time it is requested, and then shared by all games and players.
+If the process is connected to an InferenceServer, the models are evaluated on the server instead.
+"""
+import os
+import threading
+from typing import Dict, Tuple
+from .TFLiteModel import TFLiteModel
+from .NumpyModel import NumpyModel
+from .InferenceServer import InferenceClient, RemoteModel
+from .EvaluationCache import EvaluationCache
+
+DEFAULT_MODEL_FILE = "/home/ilmari/python/moska/ModelMB2/model.tflite"
+# The maximum number of cached evaluations per model. 0 disables the caches.
+CACHE_SIZE = 2**16
+
+# file extension : loader
+MODEL_LOADERS = {
+    ".tflite" : TFLiteModel,
+    ".npz" : NumpyModel,
+}
+
+_models : Dict[str,object] = {}
+_caches : Dict[str,EvaluationCache] = {}
+_lock = threading.Lock()
+# The InferenceClient of this process, if connected to an InferenceServer
+_client = None
+
+def get_model(model_file : str = DEFAULT_MODEL_FILE):
+    """ Return the model loaded from 'model_file'. The model is loaded on the first call with the file, and shared afterwards.
+    The returned model has a thread-safe 'predict(X)' method.
+
+    Args:
+        model_file (str, optional): Path to the model. The loader is selected by the file extension. Defaults to DEFAULT_MODEL_FILE.
+
+    Raises:
+        ValueError: If there is no loader for the file extension
+    """
+    model_file = os.path.abspath(model_file)
+    if _client is not None:
+        return RemoteModel(_client, model_file)
+    model = _models.get(model_file)
+    if model is not None:
+        return model
+    with _lock:
+        # Another thread might have loaded the model while we waited for the lock
+        if model_file not in _models:
+            ext = os.path.splitext(model_file)[1]
+            if ext not in MODEL_LOADERS:
+                raise ValueError(f"Can not load model '{model_file}'. Supported file types are {list(MODEL_LOADERS.keys())}")
+            _models[model_file] = MODEL_LOADERS[ext](model_file)
+        return _models[model_file]
+
+def get_cached_model(model_file : str = DEFAULT_MODEL_FILE):
+    """ Return the model in 'model_file' behind a process-wide EvaluationCache of CACHE_SIZE evaluations,
+    or the model itself if CACHE_SIZE is 0. The cache counts its hits and misses.
+    """
+    if CACHE_SIZE <= 0:
+        return get_model(model_file)
+    model_file = os.path.abspath(model_file)
+    cache = _caches.get(model_file)
+    if cache is not None:
+        return cache
+    model = get_model(model_file)
+    with _lock:
+        if model_file not in _caches:
+            _caches[model_file] = EvaluationCache(model, maxsize=CACHE_SIZE)
+        return _caches[model_file]
+
+def is_loaded(model_file : str = DEFAULT_MODEL_FILE) -> bool:
+    """ Return whether the model has already been loaded in this process """
+    return os.path.abspath(model_file) in _models
+
+def clear() -> None:
+    """ Forget all loaded models and cached evaluations """
+    with _lock:
+        _models.clear()
+        _caches.clear()
+    return
+
+def connect(handle : Tuple) -> None:
+    """ Evaluate the models of this process on an InferenceServer.
+    Should be called once in each game process, for example in the initializer of a multiprocessing.Pool.
+
+    Args:
+        handle (Tuple): InferenceServer.handle
+    """
+    global _client
+    _client = InferenceClient(handle)
+    _caches.clear()
+    return
+
+def disconnect() -> None:
+    """ Load and evaluate the models in this process again """
+    global _client
+    _client = None
+    _caches.clear()
+    return
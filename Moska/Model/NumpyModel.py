@@ -0,0 +1,107 @@
+from typing import List, Sequence, Tuple
+import numpy as np
+
+def _sigmoid(x : np.ndarray) -> np.ndarray:
+    # exp overflows to inf for large negative inputs, which correctly gives 0
+    with np.errstate(over="ignore"):
+        np.exp(np.negative(x, out=x), out=x)
+    x += 1
+    return np.reciprocal(x, out=x)
+
+# The activations are applied inplace
+ACTIVATIONS = {
+    "linear" : lambda x : x,
+    "relu" : lambda x : np.maximum(x, 0, out=x),
+    "sigmoid" : _sigmoid,
+    "tanh" : lambda x : np.tanh(x, out=x),
+}
+
+
+class NumpyModel:
+    """ A multilayer perceptron evaluated with NumPy, so no TensorFlow is needed at runtime.
+    The model is loaded from a .npz file with arrays 'W0','b0','W1','b1',... and 'activations',
+    written by 'save_model' (see Analysis/export-to-numpy.py).
+    The model has no state, so it can be shared between threads.
+    """
+    model_file : str = ""
+    def __init__(self, model_file : str):
+        """ Load the weights of the model.
+
+        Args:
+            model_file (str): Path to a .npz file
+        """
+        self.model_file = model_file
+        with np.load(model_file) as data:
+            self.activations = [str(a) for a in data["activations"]]
+            self.weights = [data[f"W{i}"].astype(np.float32) for i in range(len(self.activations))]
+            self.biases = [data[f"b{i}"].astype(np.float32) for i in range(len(self.activations))]
+        for act in self.activations:
+            if act not in ACTIVATIONS:
+                raise ValueError(f"Unknown activation '{act}' in {model_file}. Supported activations are {list(ACTIVATIONS.keys())}")
+        self.input_length = self.weights[0].shape[0]
+
+    def predict(self, X : np.ndarray) -> np.ndarray:
+        """ Evaluate a float32 array of state vectors, of shape (n, input_length).
+
+        Returns:
+            np.ndarray: The evaluations, of shape (n, 1)
+        """
+        h = X
+        for W, b, act in zip(self.weights, self.biases, self.activations):
+            h = h @ W
+            h += b
+            h = ACTIVATIONS[act](h)
+        return h
+
+
+def fold_batch_norms(layers : Sequence[Tuple]) -> Tuple[List[np.ndarray],List[np.ndarray],List[str]]:
+    """ Fold the batch normalization layers of a Dense/BatchNormalization stack into the Dense layers.
+    A batch normalization is an affine map x*s + t, so it is folded into the input of the next Dense layer:
+    W' = s[:,None]*W and b' = t @ W + b. Dropout layers should be left out, since they do nothing at inference.
+
+    Args:
+        layers (Sequence[Tuple]): The layers in order, either ("dense", W, b, activation) or ("batchnorm", gamma, beta, moving_mean, moving_variance, epsilon)
+
+    Raises:
+        ValueError: If the stack ends with a batch normalization, or a layer is not recognized
+
+    Returns:
+        Tuple[List[np.ndarray],List[np.ndarray],List[str]]: The weights, biases and activations of the folded Dense layers
+    """
+    weights, biases, activations = [], [], []
+    # The affine map of the batch normalizations since the last Dense layer
+    scale, shift = None, None
+    for layer in layers:
+        kind = layer[0]
+        if kind == "batchnorm":
+            gamma, beta, mean, var, eps = (np.asarray(v, dtype=np.float64) for v in layer[1:])
+            s = gamma / np.sqrt(var + eps)
+            t = beta - mean * s
+            if scale is None:
+                scale, shift = s, t
+            else:
+                scale, shift = scale * s, shift * s + t
+        elif kind == "dense":
+            W, b = np.asarray(layer[1], dtype=np.float64), np.asarray(layer[2], dtype=np.float64)
+            if scale is not None:
+                b = shift @ W + b
+                W = scale[:,None] * W
+                scale, shift = None, None
+            weights.append(W.astype(np.float32))
+            biases.append(b.astype(np.float32))
+            activations.append(layer[3])
+        else:
+            raise ValueError(f"Unknown layer type '{kind}'")
+    if scale is not None:
+        raise ValueError("A batch normalization after the last Dense layer can not be folded")
+    return weights, biases, activations
+
+
+def save_model(path : str, weights : List[np.ndarray], biases : List[np.ndarray], activations : List[str]) -> None:
+    """ Write the Dense layers to a .npz file, that can be loaded with NumpyModel """
+    arrays = {"activations" : np.array(activations)}
+    for i, (W, b) in enumerate(zip(weights, biases)):
+        arrays[f"W{i}"] = W
+        arrays[f"b{i}"] = b
+    np.savez(path, **arrays)
+    return
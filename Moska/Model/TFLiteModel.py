@@ -0,0 +1,87 @@
+import threading
+from typing import Dict, Tuple
+import numpy as np
+
+# The batch sizes, for which an interpreter is allocated. Batches are padded to the next bucket,
+# and batches larger than the largest bucket are evaluated in chunks.
+BATCH_BUCKETS = (1, 8, 64, 256, 1024)
+
+
+class TFLiteModel:
+    """ A TFLite model, evaluated with tf.lite.Interpreters.
+    TensorFlow is imported only when the model is loaded, and the interpreters are guarded by a lock,
+    so a single instance can be shared by all the games and players in a process.
+
+    An interpreter is allocated once for each batch size in BATCH_BUCKETS (when first needed), so the tensors
+    are never resized or reallocated. The inputs are padded to the nearest bucket, and the outputs sliced.
+
+    Quantized models (see Analysis/quantize-tflite.py) are supported. If the model has integer inputs or outputs,
+    the states are quantized and the evaluations dequantized with the quantization parameters of the model.
+    """
+    model_file : str = ""
+    def __init__(self, model_file : str, batch_buckets : Tuple[int] = BATCH_BUCKETS):
+        """ Load the model.
+
+        Args:
+            model_file (str): Path to a .tflite file
+            batch_buckets (Tuple[int], optional): The batch sizes to allocate interpreters for, in increasing order. Defaults to BATCH_BUCKETS.
+        """
+        import tensorflow as tf
+        self._tf = tf
+        self.model_file = model_file
+        self.batch_buckets = tuple(sorted(batch_buckets))
+        self.lock = threading.Lock()
+        interpreter = tf.lite.Interpreter(model_path=model_file)
+        self.input_details = interpreter.get_input_details()
+        self.output_details = interpreter.get_output_details()
+        self.input_length = int(self.input_details[0]["shape"][-1])
+        self.input_dtype = self.input_details[0]["dtype"]
+        self.output_dtype = self.output_details[0]["dtype"]
+        # bucket : (interpreter, padded input)
+        self._buckets : Dict[int,Tuple[object,np.ndarray]] = {}
+
+    def _get_bucket(self, batch_size : int) -> Tuple[object,np.ndarray]:
+        """ Return the interpreter and the padded input array of the smallest bucket that fits 'batch_size' states """
+        bucket = next(b for b in self.batch_buckets if b >= batch_size)
+        if bucket not in self._buckets:
+            interpreter = self._tf.lite.Interpreter(model_path=self.model_file)
+            interpreter.resize_tensor_input(self.input_details[0]["index"],(bucket, self.input_length))
+            interpreter.allocate_tensors()
+            self._buckets[bucket] = (interpreter, np.zeros((bucket, self.input_length), dtype=self.input_dtype))
+        return self._buckets[bucket]
+
+    def predict(self, X : np.ndarray) -> np.ndarray:
+        """ Evaluate a float32 array of state vectors, of shape (n, input_length).
+
+        Returns:
+            np.ndarray: The evaluations, of shape (n, 1)
+        """
+        n = len(X)
+        if n == 0:
+            return np.empty((0,1), dtype=np.float32)
+        max_bucket = self.batch_buckets[-1]
+        if n > max_bucket:
+            return np.concatenate([self.predict(X[i:i+max_bucket]) for i in range(0, n, max_bucket)])
+        with self.lock:
+            interpreter, padded = self._get_bucket(n)
+            # If X fills the bucket, it is passed as is. The rows are evaluated independently, so the padding doesn't matter.
+            if self.input_dtype != np.float32:
+                padded[:n] = self._quantize(X)
+                X = padded
+            elif n < len(padded):
+                padded[:n] = X
+                X = padded
+            interpreter.set_tensor(self.input_details[0]["index"], X)
+            interpreter.invoke()
+            # get_tensor returns a copy, so the output stays valid after releasing the lock
+            out = interpreter.get_tensor(self.output_details[0]["index"])[:n]
+        if self.output_dtype != np.float32:
+            scale, zero_point = self.output_details[0]["quantization"]
+            out = (out.astype(np.float32) - zero_point) * scale
+        return out
+
+    def _quantize(self, X : np.ndarray) -> np.ndarray:
+        """ Quantize float states to the integer input type of the model """
+        scale, zero_point = self.input_details[0]["quantization"]
+        info = np.iinfo(self.input_dtype)
+        return np.clip(np.round(X / scale + zero_point), info.min, info.max).astype(self.input_dtype)
@@ -98,6 +98,27 @@ class AbstractPlayer(ABC):
         if name == "moskaGame" and value is not None:
             self._set_moskaGame()
     
+    def _clone(self, moskaGame : MoskaGame) -> AbstractPlayer:
+        """ Return a copy of the player for MoskaGame.clone. The copy is of the same type, has a copy of the hand attached to 'moskaGame',
+        no thread, and logs nowhere. The other attributes are shallow copies, so helper objects (eq. scoring) are shared with the original.
+        The attributes are set directly, so setting moskaGame doesn't deal a new hand.
+        """
+        new = object.__new__(type(self))
+        new.__dict__.update(self.__dict__)
+        hand = self.hand.copy()
+        hand.moskaGame = moskaGame
+        new.__dict__.update({
+            "moskaGame" : moskaGame,
+            "hand" : hand,
+            "thread" : None,
+            "thread_id" : None,
+            "plog" : utils.NULL_LOGGER,
+            "state_vectors" : [],
+            "requires_graphic" : False,
+            "moves" : {move : getattr(new, method.__name__) for move, method in self.moves.items()},
+        })
+        return new
+    
     def _set_pid_name_logfile(self,pid) -> None:
         """ Set the players pid. The pid is used to identify the player in the game. The pid is the index of the player in the players list of the game."""
         self.pid = pid
@@ -112,7 +133,7 @@ class AbstractPlayer(ABC):
         Returns:
             set: Which values have been played to the table
         """
-        return set([c.value for c in self.moskaGame.cards_to_fall + self.moskaGame.fell_cards])
+        return self.moskaGame.get_table_card_set().values()
     
     def _playable_values_from_hand(self) -> Set[int]:
         """Return a set of values, that can be played to target.
@@ -121,7 +142,7 @@ class AbstractPlayer(ABC):
         Returns:
             set: intersection of played values and values in the hand
         """
-        return self._playable_values_to_table().intersection([c.value for c in self.hand])
+        return self.hand.card_set.with_values_of(self.moskaGame.get_table_card_set()).values()
     
     def _fits_to_table(self) -> int:
         """Return the number of cards playable to the active/target player.
@@ -180,7 +201,7 @@ class AbstractPlayer(ABC):
         - All players are ready
         - And the player cant koplata (there is no deck left or there is a kopled card already)
         """
-        if self._can_end_turn() and not self._can_fall_cards() and not self._playable_values_from_hand() and (len(self.moskaGame.deck) == 0 or any(c.kopled for c in self.moskaGame.cards_to_fall)):
+        if self._can_end_turn() and not self._can_fall_cards() and not self._playable_values_from_hand() and (len(self.moskaGame.deck) == 0 or self.moskaGame.kopled_on_table()):
             return True
         return False
     
@@ -190,10 +211,10 @@ class AbstractPlayer(ABC):
         Returns:
             bool: _description_
         """
+        table_mask = self.moskaGame.get_cards_to_fall_set().mask
         for pc in self.hand:
-            for fc in self.moskaGame.cards_to_fall:
-                 if utils.check_can_fall_card(pc,fc,self.moskaGame.triumph):
-                     return True
+            if utils.can_fall_mask(pc,self.moskaGame.triumph) & table_mask:
+                return True
         return False
 
     def _play_fall_from_deck(self) -> None:
@@ -238,13 +259,16 @@ class AbstractPlayer(ABC):
     @utils.check_new_card
     def _play_move(self) -> Tuple[bool,str]:
         """Calls moskaGame to propose a move.
-        This is called on each turn from _continuous play
+        This is called on each turn from _play_turn
 
         Returns:
             Tuple[bool,str]: _description_
         """
         success = False
         playable = self._playable_moves()
+        # If skipping is the only option, there is no decision to make and the game state does not change
+        if playable == ["Skip"] and self.state_vectors:
+            return True, ""
         move = self.choose_move(playable)
         extra_args = self.moves[move]()
         extra_args = [arg.copy() if isinstance(arg,list) else arg for arg in extra_args]
@@ -290,7 +314,7 @@ class AbstractPlayer(ABC):
             if not self._can_fall_cards():
                 playable.remove("PlayFallFromHand")
             # If there is no deck left, or there is already a kopled card on the table, or there are no cards to fall
-            if any((c.kopled for c in self.moskaGame.cards_to_fall)) or len(self.moskaGame.deck) <= 0 or not self.moskaGame.cards_to_fall:
+            if self.moskaGame.kopled_on_table() or len(self.moskaGame.deck) <= 0 or not self.moskaGame.cards_to_fall:
                 playable.remove("PlayFallFromDeck")
             # If all players are ready and there are no other moves left OR all other players are ready and there are played cards
             if self._must_end_turn() or self._can_end_turn():
@@ -315,9 +339,16 @@ class AbstractPlayer(ABC):
         self.plog.info(f"Playable moves: {playable}")
         return playable
     
-    def _start(self) -> int:
-        """ Initializes the players thread, starts the thread and returns the threads identification with get_ident() """
+    def _start(self, threaded : bool = True) -> int:
+        """ Initializes the player. If 'threaded', also initializes and starts the players thread.
+        Returns the identification (native id) of the thread that runs the player.
+        """
         self._set_pid_name_logfile(self.moskaGame.players.index(self))
+        if not threaded:
+            self._set_plogger()
+            self.thread_id = threading.get_native_id()
+            self._log_table_info()
+            return self.thread_id
         if self.thread is None or not self.thread.is_alive():
             self._set_plogger()
             self.thread = threading.Thread(target=self._continuous_play,name=self.name,daemon=True)
@@ -326,14 +357,19 @@ class AbstractPlayer(ABC):
             self.thread_id = self.thread.native_id
         return self.thread_id
     
-    def _continuous_play(self) -> None:
-        """ The main method of MoskaPlayer. This method is meant to be run indirectly, by starting the Thread associated with the player.
-        This function starts a while loop, that runs as long as the players rank is None and there are atleast 2 players in the game.
-        """
+    def _log_table_info(self) -> None:
+        """ Log information about the table, when the game begins. """
         tb_info = {"players" : len(self.moskaGame.players),
                    "Triumph card" : self.moskaGame.triumph_card,
                    }
         self.plog.info(f"Table info: {tb_info}")
+        return
+    
+    def _continuous_play(self) -> None:
+        """ The main method of MoskaPlayer. This method is meant to be run indirectly, by starting the Thread associated with the player.
+        This function starts a while loop, that runs as long as the players rank is None and there are atleast 2 players in the game.
+        """
+        self._log_table_info()
         #random.seed(self.moskaGame.random_seed)
         while self.rank is None:
             time.sleep(self.delay)     # To avoid one player having the lock at all times, due to a small delay when releasing the lock. This actually makes the program run faster
@@ -341,42 +377,53 @@ class AbstractPlayer(ABC):
             with self.moskaGame.get_lock(self) as ml:
                 if not ml:
                     continue
-                msgd = {
-                    "target" : self.moskaGame.get_target_player().name,
-                    "cards_to_fall" : self.moskaGame.cards_to_fall,
-                    "fell_cards" : self.moskaGame.fell_cards,
-                    "hand" : self.hand,
-                    "Deck" : len(self.moskaGame.deck),
-                    }
-                # If a human is playing, then we print the values to terminal
-                if self.requires_graphic:
-                    print(f"{self.name} playing...",flush=True)
-                    print(self.moskaGame,flush=True)
-                    print(msgd, flush=True)
-                # If there is only 1 active player in the game, the player is last
-                if len(self.moskaGame.get_players_condition(lambda x : x.rank is None)) <= 1:
-                    self._set_rank()
+                if not self._play_turn():
                     break
-                self.plog.debug(f"{msgd}")
-                try:
-                    # Try to play moves, as long as a valid move is played.
-                    success, msg = self._play_move()    # Return (True, "") if a valid move, else (False, <error>)
-                    while not success:
-                        self.plog.warning(msg)
-                        self.ready = False
-                        print(msg, flush=True)
-                        success, msg = self._play_move()
-                except Exception as e:
-                    self.plog.error(traceback.format_exc())
-                    sys.exit(e)
-                # Set the players rank
-                self._set_rank()
-                # Check if self is target and finished
-                if self.rank is not None and self is self.moskaGame.get_target_player():
-                    self.moskaGame._make_move("EndTurn",[self,[]])
         self.plog.info(f"Finished as {self.rank}")
         return
     
+    def _play_turn(self) -> bool:
+        """ Make one decision in the game: Play moves until a valid move is played, and set the players rank.
+        This must be called while holding the games lock; either from '_continuous_play' or from the games single-threaded loop.
+
+        Returns:
+            bool: False if the player was the last player in the game, and should stop playing. Otherwise True.
+        """
+        msgd = {
+            "target" : self.moskaGame.get_target_player().name,
+            "cards_to_fall" : self.moskaGame.cards_to_fall,
+            "fell_cards" : self.moskaGame.fell_cards,
+            "hand" : self.hand,
+            "Deck" : len(self.moskaGame.deck),
+            }
+        # If a human is playing, then we print the values to terminal
+        if self.requires_graphic:
+            print(f"{self.name} playing...",flush=True)
+            print(self.moskaGame,flush=True)
+            print(msgd, flush=True)
+        # If there is only 1 active player in the game, the player is last
+        if len(self.moskaGame.get_players_condition(lambda x : x.rank is None)) <= 1:
+            self._set_rank()
+            return False
+        self.plog.debug(f"{msgd}")
+        try:
+            # Try to play moves, as long as a valid move is played.
+            success, msg = self._play_move()    # Return (True, "") if a valid move, else (False, <error>)
+            while not success:
+                self.plog.warning(msg)
+                self.ready = False
+                print(msg, flush=True)
+                success, msg = self._play_move()
+        except Exception as e:
+            self.plog.error(traceback.format_exc())
+            sys.exit(e)
+        # Set the players rank
+        self._set_rank()
+        # Check if self is target and finished
+        if self.rank is not None and self is self.moskaGame.get_target_player():
+            self.moskaGame._make_move("EndTurn",[self,[]])
+        return True
+    
     @abstractmethod
     def choose_move(self,playable : List[str]) -> str:
         """ Select a move to play.
@@ -483,7 +530,8 @@ class AbstractPlayer(ABC):
         Returns:
             _type_: _description_
         """
-        return [c for c in self.moskaGame.cards_to_fall if self._check_can_fall_card(card,c)]
+        mask = utils.can_fall_mask(card,self.moskaGame.triumph)
+        return [c for c in self.moskaGame.cards_to_fall if mask >> c.id & 1]
     
     def _map_each_to_list(self,from_ = None, to = None) -> Dict[Card,List[Card]]:
         """Map each card in hand, to cards on the table, that can be fallen.
@@ -499,7 +547,8 @@ class AbstractPlayer(ABC):
             to = self.moskaGame.cards_to_fall
         can_fall = {}
         for card in from_:
-            can_fall[card] = [c for c in to if self._check_can_fall_card(card,c)]
+            mask = utils.can_fall_mask(card,self.moskaGame.triumph)
+            can_fall[card] = [c for c in to if mask >> c.id & 1]
         return can_fall
     
     def _make_cost_matrix(self, from_ = None, to = None, scoring : Callable = None, max_val : int = 100000):
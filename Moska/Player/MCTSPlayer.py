@@ -0,0 +1,165 @@
+from __future__ import annotations
+import logging
+import math
+import random
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+from .AbstractPlayer import AbstractPlayer
+from ..Game.DealSampler import DealSampler
+from ..Game.EndgameSolver import EndgameSolver
+from ..Game.FastGame import FastGame, SCORES, candidate_actions, cards_of_action, heuristic_action
+if TYPE_CHECKING:
+    from ..Game.Deck import Card
+    from ..Game.Game import MoskaGame
+
+
+class _Node:
+    """ A node of the search tree, reached with an action of 'player' """
+    __slots__ = ("player", "visits", "avail", "wins", "children")
+    def __init__(self, player : int):
+        self.player = player
+        self.visits = 0
+        # The number of times the node was available for selection
+        self.avail = 1
+        # The number of simulations, in which 'player' didn't lose
+        self.wins = 0
+        self.children : Dict[Tuple,_Node] = {}
+
+
+class MCTSPlayer(AbstractPlayer):
+    """ A player, that searches its decisions with information set Monte Carlo tree search (single observer ISMCTS).
+
+    On each iteration the hidden cards (the unknown cards of the opponents and the deck) are dealt randomly,
+    consistently with what the player has seen (see DealSampler), and the deal is simulated with FastGame:
+    The tree is descended with UCB, restricted to the actions available in the deal, one new action is added to the tree,
+    and the game is played to the end with a cheap rollout policy. The tree nodes count the simulations, in which the player
+    who made the action didn't lose. The branches of each decision are FastGame.candidate_actions, and decisions with a single
+    candidate are played without a node. The most visited action of the root is played.
+    If 'endgame_nodes' is set, the decisions are searched exactly with an EndgameSolver when the deck is empty, as long as it stays within its node budget.
+    """
+    def __init__(self, moskaGame: MoskaGame = None, name: str = "", delay=10 ** -6, requires_graphic: bool = False, log_level=logging.INFO, log_file="",
+                 max_iterations : int = 300, decision_time : float = None, exploration : float = 0.7, rollout_policy : Callable = None, seed : int = None,
+                 endgame_nodes : int = None):
+        """
+        Args:
+            max_iterations (int, optional): The number of simulations per decision. Defaults to 300.
+            decision_time (float, optional): The time budget (seconds) of a decision. The search stops at whichever limit comes first.
+            Should be well below MoskaGame.timeout. Defaults to None (no time limit).
+            exploration (float, optional): The exploration constant of UCB. Defaults to 0.7.
+            rollout_policy (Callable, optional): A callable(FastGame, random.Random) -> (move, arg), used to finish the simulations
+            (see FastGame.heuristic_action and FastGame.random_action). Defaults to FastGame.heuristic_action.
+            seed (int, optional): The seed of the deals and rollouts. Defaults to None.
+            endgame_nodes (int, optional): If set, decisions are searched with an EndgameSolver with this node budget per deal when the deck is empty,
+            and 'decision_time' as its time limit. Positions too large to search, or that run out of budget, are searched with MCTS. Defaults to None (the endgame is searched with MCTS).
+        """
+        if not name:
+            name = "MCTS-"
+        self.max_iterations = max_iterations
+        self.decision_time = decision_time
+        self.exploration = exploration
+        self.rollout_policy = rollout_policy if rollout_policy is not None else heuristic_action
+        self.rng = random.Random(seed)
+        self.endgame_solver = EndgameSolver(max_nodes=endgame_nodes, fallback=self.rollout_policy, seed=seed, time_limit=decision_time) if endgame_nodes is not None else None
+        # The chosen action, which the play methods return
+        self.action = None
+        super().__init__(moskaGame, name, delay, requires_graphic, log_level, log_file)
+
+    def choose_move(self, playable: List[str]) -> str:
+        """ Search the best action among the candidate actions of the playable moves, and return its move """
+        game = FastGame.from_game(self.moskaGame, current=self.pid)
+        actions = [action for action in candidate_actions(game) if action[0] in playable]
+        if not actions:
+            self.plog.warning(f"No candidate actions for {playable}")
+            self.action = None
+            return playable[0]
+        self.action = actions[0] if len(actions) == 1 else None
+        if self.action is None and self.endgame_solver is not None and not game.deck:
+            self.action = self.endgame_solver.choose_action(self.moskaGame, self, playable)
+        if self.action is None:
+            self.action = self.search(game, actions)
+        self.plog.info(f"Chose action {self.action}")
+        return self.action[0]
+
+    def search(self, game : FastGame, actions : List[Tuple]) -> Tuple:
+        """ Run the search from 'game', where the real player decides between 'actions', and return the most visited action """
+        start = time.perf_counter()
+        sampler = DealSampler.from_game(self.moskaGame, self)
+        root = _Node(self.pid)
+        iterations = 0
+        while iterations < self.max_iterations:
+            if self.decision_time is not None and time.perf_counter() - start > self.decision_time:
+                break
+            self._iterate(root, self._determinize(game, sampler), actions)
+            iterations += 1
+        elapsed = time.perf_counter() - start
+        visits = {action : root.children[action].visits if action in root.children else 0 for action in actions}
+        self.plog.info(f"Searched {iterations} iterations in {1000*elapsed:.1f} ms ({iterations/max(elapsed, 1e-9):.0f} per second). Visits: {visits}")
+        return max(actions, key=visits.__getitem__)
+
+    def _determinize(self, game : FastGame, sampler : DealSampler) -> FastGame:
+        """ Return a copy of 'game', where the hidden cards are randomly dealt to the opponents and the deck """
+        game = game.copy()
+        game.hands, game.deck = sampler.sample(self.rng)
+        return game
+
+    def _iterate(self, root : _Node, game : FastGame, root_actions : List[Tuple]) -> None:
+        """ Make one simulation from the root, and update the statistics of the visited nodes """
+        node = root
+        path = []
+        actions = root_actions
+        expanded = False
+        while not expanded and game.current >= 0:
+            if len(actions) == 1:
+                game.apply(*actions[0])
+                actions = candidate_actions(game) if game.current >= 0 else []
+                continue
+            children = node.children
+            untried = [action for action in actions if action not in children]
+            for action in actions:
+                if action in children:
+                    children[action].avail += 1
+            if untried:
+                action = self.rng.choice(untried)
+                children[action] = _Node(game.current)
+                expanded = True
+            else:
+                log_avail = {action : math.log(children[action].avail) for action in actions}
+                action = max(actions, key=lambda a : children[a].wins / children[a].visits + self.exploration * math.sqrt(log_avail[a] / children[a].visits))
+            node = children[action]
+            path.append(node)
+            game.apply(*action)
+            if not expanded and game.current >= 0:
+                actions = candidate_actions(game)
+        loser = game.play_out(self.rollout_policy, self.rng)
+        for node in path:
+            node.visits += 1
+            if node.player != loser:
+                node.wins += 1
+        return
+
+    def _chosen(self, move : str):
+        """ Return the argument of the chosen action of the move, or the argument of the first candidate action of the move """
+        if self.action is None or self.action[0] != move:
+            game = FastGame.from_game(self.moskaGame, current=self.pid)
+            self.action = next((action for action in candidate_actions(game) if action[0] == move), (move, 0))
+        return self.action[1]
+
+    def play_initial(self) -> List[Card]:
+        return cards_of_action(self.moskaGame, self, "InitialPlay", self._chosen("InitialPlay"))
+
+    def play_to_target(self) -> List[Card]:
+        return cards_of_action(self.moskaGame, self, "PlayToOther", self._chosen("PlayToOther"))
+
+    def play_to_self(self) -> List[Card]:
+        return cards_of_action(self.moskaGame, self, "PlayToSelf", self._chosen("PlayToSelf"))
+
+    def play_fall_card_from_hand(self) -> Dict[Card,Card]:
+        return cards_of_action(self.moskaGame, self, "PlayFallFromHand", self._chosen("PlayFallFromHand"))
+
+    def end_turn(self) -> List[Card]:
+        return cards_of_action(self.moskaGame, self, "EndTurn", self._chosen("EndTurn"))
+
+    def deck_lift_fall_method(self, deck_card: Card) -> Tuple[Card, Card]:
+        """ Fall the highest scoring card on the table, like the simulations do """
+        scores = SCORES[self.moskaGame.triumph]
+        return (deck_card, max(self._map_to_list(deck_card), key=lambda card : scores[card.id]))
@@ -1,5 +1,4 @@
 from __future__ import annotations
-from collections import Counter, namedtuple
 import itertools
 import logging
 import random
@@ -7,250 +6,345 @@ import time
 import numpy as np
 import copy
 from .AbstractPlayer import AbstractPlayer
+from . import OpeningBook
+from ._ScoreCards import _ScoreCards
+from .PolicyParameters.HeuristicParameters import HeuristicParameters
 from typing import Dict, List,TYPE_CHECKING, Tuple
-import tensorflow as tf
-from ..Game.GameState import GameState
+import functools
+import heapq
+from ..Game.EndgameSolver import EndgameSolver
+from ..Game.FastGame import cards_of_action
+from ..Game.GameState import GameState, StateBatch
+from ..Game import utils
+from ..Model import ModelRegistry
 if TYPE_CHECKING:
     from ..Game.Deck import Card
     from ..Game.Game import MoskaGame
 
+def _interleave(lists : List[list]) -> list:
+    """ Return the items of the lists, taking the first item of each list, then the second of each, and so on """
+    sentinel = object()
+    return [item for items in itertools.zip_longest(*lists, fillvalue=sentinel) for item in items if item is not sentinel]
+
+
 class ModelBot(AbstractPlayer):
-    def __init__(self, moskaGame: MoskaGame = None, name: str = "", delay=10 ** -6, requires_graphic: bool = False, log_level=logging.INFO, log_file="", max_num_states = 600):
+    state_batch : StateBatch = None
+    scoring : _ScoreCards = None
+    parameters : HeuristicParameters = None
+    def __init__(self, moskaGame: MoskaGame = None, name: str = "", delay=10 ** -6, requires_graphic: bool = False, log_level=logging.INFO, log_file="", max_num_states = 600, batch_size = 600, model_file : str = ModelRegistry.DEFAULT_MODEL_FILE, num_candidates : int = None,
+                 decision_time : float = None, max_evaluations : int = None, chunk_size : int = 64, endgame_nodes : int = None,
+                 opening_book : str = None):
+        """
+        Args:
+            max_num_states (int, optional): The maximum number of plays of a move to evaluate with the model. Defaults to 600.
+            batch_size (int, optional): The number of states evaluated in one call to the model. Defaults to 600.
+            model_file (str, optional): The model to use, loaded through the ModelRegistry. Defaults to ModelRegistry.DEFAULT_MODEL_FILE.
+            num_candidates (int, optional): If set, generate this many candidate plays of a move, rank them with the heuristic card scores,
+            and evaluate only the best 'max_num_states' with the model. Defaults to None, in which case random candidates are evaluated.
+            decision_time (float, optional): The time budget (seconds) of a decision. When it is used, the best plays evaluated so far are chosen.
+            Should be well below MoskaGame.timeout. Defaults to None (no time limit).
+            max_evaluations (int, optional): The maximum number of states evaluated per decision. Defaults to None (no limit).
+            chunk_size (int, optional): The number of states evaluated at a time, when 'decision_time' or 'max_evaluations' is set. Defaults to 64.
+            endgame_nodes (int, optional): If set, decisions are searched with an EndgameSolver with this node budget per deal when the deck is empty,
+            and 'decision_time' as its time limit. Positions too large to search, or that run out of budget, are evaluated with the model.
+            Defaults to None (the model is used in the endgame).
+            opening_book (str, optional): The file of an OpeningBook, from which the first InitialPlay of the game is looked up. Defaults to None.
+        """
         if not name:
             name = "M-"
         self.max_num_states = max_num_states
+        self.num_candidates = num_candidates
+        self.decision_time = decision_time
+        self.max_evaluations = max_evaluations
+        self.chunk_size = chunk_size
+        self.endgame_solver = EndgameSolver(max_nodes=endgame_nodes, time_limit=decision_time) if endgame_nodes is not None else None
+        self.opening_book = opening_book
+        # The time taken by each decision, in seconds
+        self.decision_latencies = []
+        self.batch_size = batch_size
+        # The model is loaded from the ModelRegistry on the first evaluation
+        self.model_file = model_file
+        self.state_batch = None
         #self.model = tf.keras.models.load_model(model_file,compile=False)
         #converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
         #self.model = converter.convert()
         # Load a tflite model and allocate tensors.
         self.move_play_scores = {}
         self.play_fall_from_deck_scores = {}
+        self.deck_card_classes = {}
         super().__init__(moskaGame, name, delay, requires_graphic, log_level, log_file)
+        # The cheap scoring of the candidate plays
+        self.scoring = _ScoreCards(self, default_method="basic")
+        self.parameters = HeuristicParameters(self)
     
     def _play_move(self) -> Tuple[bool, str]:
         out = super()._play_move()
         self.move_play_scores = {}
         return out
     
-    def _get_single_assignments(self, matrix):
-        """ Return all single card assignments from the matrix"""
-        nz = np.nonzero(matrix)
-        inds = zip(nz[0], nz[1])
-        inds = [list(i) for i in inds]
-        return inds
-    
-    
-    def get_assignments(self, start=[], max_assignments : int = 100, found_assignments = None, matrix = None):
-        """ Return a list of lists, containing all possible assignments of cards from the hand to the cards to fall."""
-        #print("Finding assignments", flush=True)
-        if not found_assignments:
-            found_assignments = set()
-        #print("Found assignments: ", found_assignments, flush=True)
-        # If no start is given, find the first assignment
-        # If no matrix is given, create the matrix
+    def get_assignments(self, max_assignments : int = 100, matrix = None, max_work : int = 100000) -> List[Tuple[int,...]]:
+        """ Return distinct assignments of cards from the hand to the cards to fall, as flat tuples (hand_index, table_index, ...).
+        Each set of pairs is returned only once, and the search stops after 'max_assignments' assignments or 'max_work' steps,
+        so the time is bounded also with large hands.
+
+        Args:
+            max_assignments (int, optional): The maximum number of assignments. Defaults to 100.
+            matrix (np.ndarray, optional): Non-zero where the card in hand (row) can fall the card on the table (column). Defaults to a matrix of the hand and the cards to fall.
+            max_work (int, optional): The maximum number of search steps (see utils.iter_assignments). Defaults to 100000.
+        """
         if matrix is None:
             matrix = self._make_cost_matrix(from_ = self.hand.cards, to = self.moskaGame.cards_to_fall,max_val=0,scoring=lambda hc,tc : 1)
-            
-        # If we have found the maximum number of assignments, OR there are no assignments, return the found assignments
-        new_assignments = self._get_single_assignments(matrix)
-        
-        if len(found_assignments) >= max_assignments or not new_assignments:
-            return found_assignments
-        
-        #if not start:
-        #    print("Hand: ", self.hand, flush=True)
-        #    print("Cards to fall: ", self.moskaGame.cards_to_fall, flush=True)
-        #    print("New assignments: ", new_assignments, flush=True)
-        #print("Matrix: \n", matrix, flush=True)
-        
-        for row, col in new_assignments:
-            found_assignments.add(tuple(start + [row,col]))
-            # Get the visited cards
-            # The cards in hand are even (0,2...), the cards on the table are odd (1,3...)
-            hand_cards = [c for i,c in enumerate(start + [row,col]) if i % 2 == 0]
-            table_cards = [c for i,c in enumerate(start + [row,col]) if i % 2 == 1]
-            # Store the values, to restore them later
-            row_vals = matrix[hand_cards,:]
-            col_vals = matrix[:,table_cards]
-            # Mark the cards as visited (0)
-            matrix[hand_cards,:] = 0
-            matrix[:,table_cards] = 0
-            # Find the next assignments, which adds the new assignments to the found_assignments
-            self.get_assignments(start +[row,col], max_assignments, found_assignments, matrix)
-            # Restore matrix
-            matrix[hand_cards,:] = row_vals
-            matrix[:,table_cards] = col_vals
-        return found_assignments
+        row_masks = [sum(1 << int(col) for col in np.flatnonzero(row)) for row in matrix]
+        return list(utils.iter_assignments(row_masks, max_assignments=max_assignments, max_work=max_work))
     
     def get_prediction(self, move : str):
         """ Get a prediction for a moves best 'goodness' """
-        plays, states, evals = self.get_possible_next_states(move, num_states=self.max_num_states)
+        plays, evals = self.get_possible_next_states(move, num_states=self.max_num_states)
+        return self._best_play(move, plays, evals)
+    
+    def get_predictions(self, moves : List[str]) -> Dict[str,Tuple]:
+        """ Return the best play and its evaluation for each move, like 'get_prediction'.
+        The possible next states of all the moves are collected to the same buffer, and evaluated in a single call to the model
+        (unless there are more than 'batch_size' states).
+
+        If 'decision_time' or 'max_evaluations' is set, the plays are instead evaluated in chunks of 'chunk_size' states,
+        taking the most promising play of each move in turn, until the budget is used. The best plays found so far are returned.
+        The first chunk has at least one play of each move, and is always evaluated.
+        """
+        start_time = time.perf_counter()
+        state = GameState.from_game(self.moskaGame)
+        batch = self._get_state_batch(state)
+        move_plays = {move : self._candidate_plays(move, num_states=self.max_num_states) for move in moves}
+        # The plays in the order they are evaluated, taking one play of each move in turn
+        order = _interleave([[(move, play) for play in plays] for move, plays in move_plays.items()])
+        budgeted = self.decision_time is not None or self.max_evaluations is not None
+        if self.max_evaluations is not None:
+            order = order[:max(self.max_evaluations, len(moves))]
+        chunk_size = max(self.chunk_size, len(moves)) if budgeted else max(len(order), 1)
+        nevaluated = 0
+        for i in range(0, len(order), chunk_size):
+            for move, play in order[i:i+chunk_size]:
+                self._add_next_state(move, play, state, batch)
+            batch.flush()
+            nevaluated = min(i + chunk_size, len(order))
+            if self.decision_time is not None and time.perf_counter() - start_time >= self.decision_time:
+                break
+        self._check_state_unchanged(state)
+        evals = batch.finish()
+        # Split the evaluated plays back to the moves
+        results = {move : ([],[]) for move in moves}
+        for (move, play), eval in zip(order[:nevaluated], evals):
+            results[move][0].append(play)
+            results[move][1].append(eval)
+        self._log_latency(time.perf_counter() - start_time, nevaluated, len(order))
+        return {move : self._best_play(move, plays, np.array(evals)) for move, (plays, evals) in results.items()}
+    
+    def _log_latency(self, elapsed : float, nevaluated : int, ncandidates : int) -> None:
+        """ Store the time taken by a decision, and log it with the statistics of the previous decisions """
+        self.decision_latencies.append(elapsed)
+        latencies = np.array(self.decision_latencies)
+        self.plog.info(f"Decision took {1000*elapsed:.1f} ms, evaluated {nevaluated}/{ncandidates} states. "
+                       f"Decision latency (ms): mean {1000*latencies.mean():.1f}, p95 {1000*np.percentile(latencies, 95):.1f}, max {1000*latencies.max():.1f}")
+        return
+    
+    def _best_play(self, move : str, plays : list, evals : np.ndarray) -> Tuple:
+        """ Return the best play of the move and its evaluation """
         if move == "PlayFallFromDeck":
-            self.play_fall_from_deck_scores = {tuple(play) : eval for play, eval in zip(plays, evals)}
+            # The best play of each class of deck cards, and the evaluation weighted by the number of cards in each class
+            self.play_fall_from_deck_scores = {}
+            rep_keys = {cards[0] : key for key, cards in self.deck_card_classes.items()}
+            for play, eval in zip(plays, evals):
+                key = rep_keys[play[0]]
+                table_card = play[1] if len(play) == 2 else None
+                if key not in self.play_fall_from_deck_scores or eval > self.play_fall_from_deck_scores[key][1]:
+                    self.play_fall_from_deck_scores[key] = (table_card, eval)
+            # The classes that were not evaluated (due to a budget) are left out
+            ncards = sum(len(self.deck_card_classes[key]) for key in self.play_fall_from_deck_scores)
             plays = ["unknown"]
-            states = ["unknown"]
-            evals = [np.mean(evals)]
-        combined = list(zip(plays, states, evals))
-        best = max(combined, key=lambda x : x[2])
-        #print("Best play: ", best[0], " with eval: ", best[2], flush=True)
-        return best[0],best[2]
+            evals = [sum(len(self.deck_card_classes[key]) * eval for key, (_, eval) in self.play_fall_from_deck_scores.items()) / max(ncards, 1)]
+        combined = list(zip(plays, evals))
+        best = max(combined, key=lambda x : x[1])
+        #print("Best play: ", best[0], " with eval: ", best[1], flush=True)
+        return best[0],best[1]
         
+    def _deck_card_classes(self, cards : List[Card]) -> Dict[Tuple[bool,int,bool],List[Card]]:
+        """ Group the cards, that might be lifted from the deck, to classes of (nearly) equivalent cards for the current position.
+        The cards in a class have the same triumph status and can fall the same cards on the table.
+        The cards that can't fall anything are also grouped by whether the player can later fall them from hand.
+
+        Returns:
+            Dict[Tuple[bool,int,bool],List[Card]]: (is triumph, mask of the table cards it can fall, can be fallen from hand) : cards
+        """
+        triumph = self.moskaGame.triumph
+        table_mask = 0
+        for card in self.moskaGame.cards_to_fall:
+            table_mask |= 1 << card.id
+        hand_fall_mask = 0
+        for card in self.hand.cards:
+            hand_fall_mask |= utils.can_fall_mask(card, triumph)
+        classes = {}
+        for card in cards:
+            fall_mask = utils.can_fall_mask(card, triumph) & table_mask
+            key = (card.suit == triumph, fall_mask, False if fall_mask else bool(hand_fall_mask >> card.id & 1))
+            classes.setdefault(key, []).append(card)
+        return classes
+    
+    def _heuristic_play_score(self, play, e_lifted : float, most_falls : int) -> float:
+        """ The score of the hand after playing the cards in 'play' (a list, or a dict with the played cards as keys),
+        calculated as in HeuristicParameters.choose_move_scores. Larger is better.
+        """
+        cards_after_play = [c for c in self.hand.cards if c not in play]
+        liftn = self.parameters._lift_n_from_deck(cards_after_play)
+        return self.parameters._calculate_score(cards_after_play, liftn, most_falls, e_lifted)
+    
+    def _select_plays(self, candidates : list, k : int) -> list:
+        """ Return at most 'k' of the candidate plays to evaluate with the model.
+        If 'num_candidates' is not set, the first 'k' candidates are returned.
+        Otherwise the candidates are ranked by the heuristic card scores of the hand after the play, and the best 'k' are returned.
+        """
+        if not self.num_candidates or len(candidates) <= k:
+            return candidates[:k]
+        self.scoring.assign_scores_inplace()
+        self.scoring._assign_scores(self.moskaGame.card_monitor.cards_fall_dict.keys())
+        e_lifted = self.parameters.expected_value_from_lift()
+        most_falls = max((len(falls) for card, falls in self.moskaGame.card_monitor.cards_fall_dict.items()))
+        scores = [self._heuristic_play_score(play, e_lifted, most_falls) for play in candidates]
+        best = heapq.nlargest(k, range(len(candidates)), key=scores.__getitem__)
+        return [candidates[i] for i in best]
+    
+    def _get_state_batch(self, state : GameState) -> StateBatch:
+        """ Return the reusable buffer for the possible next states, with room for 'batch_size' states.
+        The buffer is evaluated with the model in 'model_file'.
+        """
+        vector_length = state.vector_length(with_hand=True)
+        if self.state_batch is None or self.state_batch.vector_length != vector_length:
+            self.state_batch = StateBatch(vector_length, max_rows=self.batch_size)
+        self.state_batch.evaluate = functools.partial(self.moskaGame.model_predict, model_file=self.model_file)
+        self.state_batch.reset()
+        return self.state_batch
+    
     def get_possible_next_states(self, move : str, num_states : int = 100):
+        """ Return the possible plays of a move (at most about 'num_states'), and the models evaluations of the states after each play.
+        The states are encoded to a reusable buffer, and evaluated in chunks of 'batch_size' states.
+        """
         state = GameState.from_game(self.moskaGame)
+        batch = self._get_state_batch(state)
+        plays = self._add_possible_next_states(move, state, batch, num_states)
+        self._check_state_unchanged(state)
+        predictions = batch.finish()
+        return plays, predictions
+    
+    def _check_state_unchanged(self, state : GameState) -> None:
+        """ Check that making the mock moves didn't change the game """
+        if not np.array_equal(GameState.from_game(self.moskaGame).as_array(normalize=False), state.as_array(normalize=False)):
+            raise Exception("State changed during get_possible_next_states")
+    
+    def _add_possible_next_states(self, move : str, state : GameState, batch : StateBatch, num_states : int = 100) -> list:
+        """ Add the states after the possible plays of a move (at most about 'num_states') to 'batch', and return the plays """
+        plays = self._candidate_plays(move, num_states)
+        for play in plays:
+            self._add_next_state(move, play, state, batch)
+        return plays
+    
+    def _candidate_plays(self, move : str, num_states : int = 100) -> list:
+        """ Return the plays of a move to evaluate (at most about 'num_states'), the most promising first """
         if move == "Skip":
-            plays = [[]]
-            states = [state.as_vector(normalize=False) + state.encode_cards(self.hand.cards)]
-            
+            return [[]]
+        # The number of candidates to generate. If 'num_candidates' is set, the candidates are ranked heuristically,
+        # and only the best 'num_states' are evaluated with the model.
+        ncandidates = max(self.num_candidates, num_states) if self.num_candidates else num_states
         if move == "PlayFallFromHand":
-            play_indices = self.get_assignments(max_assignments=num_states)
-            #print("Found plays: ", play_indices, flush=True)
-            plays = []
-            for play in play_indices:
-                hand_cards = [self.hand.cards[ind] for i,ind in enumerate(play) if i % 2 == 0]
-                table_cards = [self.moskaGame.cards_to_fall[ind] for i,ind in enumerate(play) if i % 2 == 1]
-                #hand_cards = [self.hand.cards[i] for i in range(0,len(play),2)]
-                #table_cards = [self.moskaGame.cards_to_fall[i] for i in range(1,len(play),2)]
-                plays.append({hc : tc for hc,tc in zip(hand_cards,table_cards)})
-            states = []
-            self.plog.debug(f"Found plays: {plays}")
-            self.plog.info(f"Found {len(plays)} plays")
-            random.shuffle(plays)
-            for play in plays:
-                if len(states) >= num_states:
-                    break
-                new_state = self.moskaGame._make_mock_move(move,[self, play])
-                state_vector = new_state.as_vector(normalize=False)
-                chand = self.hand.copy()
-                chand.pop_cards(cond=lambda c : c in play.keys())
-                state_vector += state.encode_cards(chand.cards)
-                #print(state_vector, flush=True)
-                states.append(state_vector)
+            candidates = []
+            for play in self.get_assignments(max_assignments=ncandidates):
+                candidates.append({self.hand.cards[play[i]] : self.moskaGame.cards_to_fall[play[i+1]] for i in range(0, len(play), 2)})
+            self.plog.debug(f"Found plays: {candidates}")
+            self.plog.info(f"Found {len(candidates)} plays")
+            random.shuffle(candidates)
+            plays = self._select_plays(candidates, num_states)
                 
-        if move == "PlayToSelf":
+        # The legal plays are generated lazily in a random order, so only the evaluated plays are created
+        elif move == "PlayToSelf":
             playable_from_hand = self._playable_values_from_hand()
-            chand = self.hand.copy()
-            playable_cards = chand.pop_cards(cond=lambda c : c.value in playable_from_hand)
-            plays = []
-            for i in range(1,len(playable_cards)+1):
-                plays += list(itertools.combinations(playable_cards,i))
-            random.shuffle(plays)
-            states = []
-            for i,play in enumerate(plays):
-                if len(states) >= num_states:
-                    break
-                plays[i] = list(play)
-                new_state = self.moskaGame._make_mock_move(move,[self, self, plays[i]])
-                state_vector = new_state.as_vector(normalize=False)
-                chand = self.hand.copy()
-                chand.pop_cards(cond=lambda c : c in play)
-                state_vector += state.encode_cards(chand.cards)
-                states.append(state_vector)
+            playable_cards = [c for c in self.hand.cards if c.value in playable_from_hand]
+            candidates = list(itertools.islice(utils.iter_random_plays(playable_cards, max_size=len(playable_cards)), ncandidates))
+            plays = self._select_plays(candidates, num_states)
                 
-        if move == "PlayToOther":
+        elif move == "PlayToOther":
             playable_from_hand = self._playable_values_from_hand()
-            chand = self.hand.copy()
-            playable_cards = chand.pop_cards(cond=lambda c : c.value in playable_from_hand)
-            plays = []
-            for i in range(1,min(len(playable_cards)+1,self._fits_to_table()+1)):
-                plays += list(itertools.combinations(playable_cards,i))
-            random.shuffle(plays)
-            states = []
-            target = self.moskaGame.get_target_player()
-            for i,play in enumerate(plays):
-                if len(states) >= num_states:
-                    break
-                plays[i] = list(play)
-                # TODO: Currently the model has perfect information about the lifted cards
-                new_state = self.moskaGame._make_mock_move(move,[self, target, plays[i]])
-                state_vector = new_state.as_vector(normalize=False)
-                chand = self.hand.copy()
-                chand.pop_cards(cond=lambda c : c in play)
-                state_vector += state.encode_cards(chand.cards)
-                states.append(state_vector)
+            playable_cards = [c for c in self.hand.cards if c.value in playable_from_hand]
+            candidates = list(itertools.islice(utils.iter_random_plays(playable_cards, max_size=self._fits_to_table()), ncandidates))
+            plays = self._select_plays(candidates, num_states)
                 
-        if move == "EndTurn":
+        elif move == "EndTurn":
             plays = [self.moskaGame.cards_to_fall.copy(), self.moskaGame.cards_to_fall.copy() + self.moskaGame.fell_cards.copy()]
-            states = []
-            for play in plays:
-                # TODO: Currently the model has perfect information about the lifted cards
-                new_state = self.moskaGame._make_mock_move(move,[self, play])
-                state_vector = new_state.as_vector(normalize=False) + new_state.encode_cards(self.hand.cards + play)
-                states.append(state_vector)
         
-        if move == "InitialPlay":
-            chand = self.hand.copy()
-            plays = []
-            for i in range(1,min(len(chand.cards)+1, self._fits_to_table()+1)):
-                plays += list(itertools.combinations(chand.cards,i))
-            target = self.moskaGame.get_target_player()
-            random.shuffle(plays)
-            legal_plays = []
-            states = []
-            
-            cards_possibly_in_deck = self.moskaGame.card_monitor.get_cards_possibly_in_deck(self)
-            
-            for i, play in enumerate(plays):
-                c = Counter([c.value for c in play])
-                if len(states) >= num_states:
-                    break
-                if not (len(play) == 1 or all((count >= 2 for count in c.values()))):
-                    continue
-                legal_plays.append(list(play))
-                
-                new_state = self.moskaGame._make_mock_move(move,[self, target, list(play)])
-                
-                chand = self.hand.copy()
-                chand.pop_cards(cond=lambda c : c in play)
-                state_vector = new_state.as_vector(normalize=False) + new_state.encode_cards(chand.cards)
-                states.append(state_vector)
-            plays = legal_plays
+        elif move == "InitialPlay":
+            # A single card, or only pairs or larger groups of values
+            candidates = list(itertools.islice(utils.iter_random_plays(self.hand.cards, max_size=self._fits_to_table(), min_per_value=2, include_singles=True), ncandidates))
+            plays = self._select_plays(candidates, num_states)
         
-        if move == "PlayFallFromDeck":
+        elif move == "PlayFallFromDeck":
             cards_possibly_in_deck = self.moskaGame.card_monitor.get_cards_possibly_in_deck(self)
-            plays = []
-            states = []
-            # Loop through all cards possibly in deck. Max about 45
-            for card in cards_possibly_in_deck:
-                # If the card can fall cards, make a cost matrix and get the assignments
+            # Only one card of each class of equivalent cards is evaluated, and weighted by the size of the class in get_prediction
+            self.deck_card_classes = self._deck_card_classes(cards_possibly_in_deck)
+            class_plays = []
+            for cards in self.deck_card_classes.values():
+                card = cards[0]
+                # If the card can fall cards, it is evaluated as a 'PlayFallFromHand' play for each card it can fall
                 if self._map_to_list(card):
                     cm = self._make_cost_matrix([card], self.moskaGame.cards_to_fall, scoring=lambda c1,c2 : 1, max_val=0)
                     assignments = self.get_assignments(matrix=cm,max_assignments=num_states)
-                    # Evaluate the assignments. If the deck_card can fall a card, we can check the state as 'PlayFallFromHand' -play
-                    for deck_card_i, table_card_i in assignments:
-                        play = [card, self.moskaGame.cards_to_fall[table_card_i]]
-                        plays.append(play)
-                        
-                        # Add the card to the hand and check the state after playing the card
-                        self.hand.add([card])
-                        #print(self.moskaGame.card_monitor.player_cards[self.name], flush=True)
-                        self.moskaGame.card_monitor.update_unknown(self.name)
-                        new_state = self.moskaGame._make_mock_move("PlayFallFromHand",[self, {play[0]:play[1]}])
-                        # Remove the card from the hand
-                        self.hand.pop_cards(cond=lambda c : c == card)
-                        #print(self.hand)
-                        self.moskaGame.card_monitor.update_unknown(self.name)
-                        #print(self.moskaGame.card_monitor.player_cards[self.name], flush=True)
-                        
-                        state_vector = new_state.as_vector(normalize=False) + new_state.encode_cards(self.hand.cards)
-                        states.append(state_vector)
+                    class_plays.append([[card, self.moskaGame.cards_to_fall[table_card_i]] for deck_card_i, table_card_i in assignments])
                 else:
-                    play = [card]
-                    plays.append(play)
-                    # Add the card to the hand and check the state after playing the card TO SELF
-                    self.hand.add(play)
-                    new_state = self.moskaGame._make_mock_move("PlayToSelfFromDeck",[self, self, play])
-                    state_vector = new_state.as_vector(normalize=False)
-                    # Remove the card from the hand
-                    self.hand.pop_cards(cond=lambda c : c == card)
-                    
-                    state_vector += state.encode_cards(self.hand.cards)
-                    states.append(state_vector)
-                
-        if GameState.from_game(self.moskaGame).as_vector(normalize=False) != state.as_vector(normalize=False):
-            raise Exception("State changed during get_possible_next_states")
-        predictions = self.moskaGame.model_predict(np.array(states, dtype=np.float32))
-        #predictions = self.model.predict(np.array(states),verbose=0)
-        return plays, states, predictions
+                    class_plays.append([[card]])
+            # The first play of each class comes first
+            plays = _interleave(class_plays)
+        return plays
+    
+    def _add_next_state(self, move : str, play, state : GameState, batch : StateBatch) -> None:
+        """ Make a mock move of 'play', and add the state after the move to the batch """
+        if move == "Skip":
+            batch.add(state, hand_cards=self.hand.cards)
+            
+        if move == "PlayFallFromHand":
+            new_state = self.moskaGame._make_mock_move(move,[self, play])
+            chand = self.hand.copy()
+            chand.pop_cards(cond=lambda c : c in play.keys())
+            batch.add(new_state, hand_cards=chand.cards)
+            
+        if move == "PlayToSelf":
+            new_state = self.moskaGame._make_mock_move(move,[self, self, play])
+            chand = self.hand.copy()
+            chand.pop_cards(cond=lambda c : c in play)
+            batch.add(new_state, hand_cards=chand.cards)
+            
+        if move in ("PlayToOther", "InitialPlay"):
+            # TODO: Currently the model has perfect information about the lifted cards
+            new_state = self.moskaGame._make_mock_move(move,[self, self.moskaGame.get_target_player(), play])
+            chand = self.hand.copy()
+            chand.pop_cards(cond=lambda c : c in play)
+            batch.add(new_state, hand_cards=chand.cards)
+            
+        if move == "EndTurn":
+            # TODO: Currently the model has perfect information about the lifted cards
+            new_state = self.moskaGame._make_mock_move(move,[self, play])
+            batch.add(new_state, hand_cards=self.hand.cards + play)
+        
+        if move == "PlayFallFromDeck":
+            card = play[0]
+            # Add the card to the hand and check the state after playing the card
+            self.hand.add([card])
+            if len(play) == 2:
+                self.moskaGame.card_monitor.update_unknown(self.name)
+                new_state = self.moskaGame._make_mock_move("PlayFallFromHand",[self, {play[0]:play[1]}])
+                self.hand.pop_cards(cond=lambda c : c == card)
+                self.moskaGame.card_monitor.update_unknown(self.name)
+            else:
+                # The card can't fall anything, so it is played to self
+                new_state = self.moskaGame._make_mock_move("PlayToSelfFromDeck",[self, self, play])
+                self.hand.pop_cards(cond=lambda c : c == card)
+            batch.add(new_state, hand_cards=self.hand.cards)
+        return
     
     
     def choose_move(self, playable: List[str]) -> str:
@@ -259,9 +353,26 @@ class ModelBot(AbstractPlayer):
         self.plog.debug(f"Hand: {self.hand}")
         self.plog.debug(f"Table: {self.moskaGame.cards_to_fall}")
         self.plog.debug(f"Fell: {self.moskaGame.fell_cards}")
-        move_scores = {}
-        for move in playable:
-            move_scores[move] = self.get_prediction(move)
+        # If the only legal move is to skip or to end the turn, it is played without evaluating it
+        if len(playable) == 1 and playable[0] in ("Skip", "EndTurn"):
+            move = playable[0]
+            self.move_play_scores = {move : (self.moskaGame.cards_to_fall.copy() if move == "EndTurn" else [], None)}
+            self.plog.info(f"Playing the only legal move: {move}")
+            return move
+        if self.opening_book is not None and playable == ["InitialPlay"]:
+            play_cards = OpeningBook.get_book(self.opening_book).play_for(self)
+            if play_cards:
+                self.move_play_scores = {"InitialPlay" : (play_cards, None)}
+                self.plog.info(f"Playing from the opening book: {play_cards}")
+                return "InitialPlay"
+        if self.endgame_solver is not None and len(self.moskaGame.deck) == 0:
+            action = self.endgame_solver.choose_action(self.moskaGame, self, playable)
+            if action is not None:
+                move, arg = action
+                self.move_play_scores = {move : (cards_of_action(self.moskaGame, self, move, arg), None)}
+                self.plog.info(f"Playing the endgame solution: {move}")
+                return move
+        move_scores = self.get_predictions(playable)
         self.plog.info(f"Move scores: {move_scores}")
         # moveid : (arg, eval)
         self.move_play_scores = move_scores
@@ -298,9 +409,14 @@ class ModelBot(AbstractPlayer):
         return out
     
     def deck_lift_fall_method(self, deck_card: Card) -> Tuple[Card, Card]:
-        for play, eval in self.play_fall_from_deck_scores.items():
-            if len(play) == 2 and play[0] == deck_card:
-                return play
+        """ Fall the table card, that was best for the class of the lifted card.
+        The cards in a class can fall the same table cards, so the play of the evaluated card is also valid for 'deck_card'.
+        """
+        key = next(iter(self._deck_card_classes([deck_card])))
+        table_card = self.play_fall_from_deck_scores.get(key, (None,None))[0]
+        if table_card is None:
+            table_card = self._map_to_list(deck_card)[0]
+        return (deck_card, table_card)
         #return (deck_card, random.choice(self.moskaGame.cards_to_fall))
     
     def end_turn(self) -> List[Card]:
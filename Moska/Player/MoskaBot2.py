@@ -60,18 +60,18 @@ class MoskaBot2(AbstractPlayer):
     def _calc_assignment_score_from_hand(self, hcard : Card, tcard : Card) -> float:
         """ Calculate the score of playing hcard (card in hand) to tcard (card on the table).
         The smaller the score, the better."""
-        score = hcard.score - tcard.score
+        score = self.scoring.get_score(hcard) - self.scoring.get_score(tcard)
         # Scale the score with some value (currently not calculated [1])
         score = self.parameters.fall_card_scale_hand_play_score(hcard,tcard)*score
         return score
     
     def _calc_assignment_score_from_deck(self,deck_card : Card, tcard : Card):
-        score = deck_card.score - tcard.score
+        score = self.scoring.get_score(deck_card) - self.scoring.get_score(tcard)
         score = self.parameters.fall_card_scale_deck_play_score(deck_card,tcard) * score
         return score
     
     def _calc_assignment_score_to_self(self,card_in_hand : Card, card_to_self : Card):
-        score = card_in_hand.score - card_to_self.score
+        score = self.scoring.get_score(card_in_hand) - self.scoring.get_score(card_to_self)
         score = self.parameters.to_self_scale_play_score(card_in_hand,card_to_self)*score
         return score  
     
@@ -175,7 +175,7 @@ class MoskaBot2(AbstractPlayer):
         for val in set([c.value for c in self.hand.cards]):
             # A dictionary of value : List[Card], where the cards are sorted in ascending order according to score
             # For example same_values[3] : [S3,A3], where S3.score = 4, S3.score = 6
-            same_values[val] = list(sorted(filter(lambda x : x.value == val, self.hand.cards),key=lambda x : x.score))
+            same_values[val] = list(sorted(filter(lambda x : x.value == val, self.hand.cards),key=lambda x : self.scoring.get_score(x)))
         fits = self._fits_to_table()
         play_cards = []
         new_play_cards = []
@@ -248,7 +248,7 @@ class MoskaBot2(AbstractPlayer):
         ncards = min(fits,len(cards))
         # Get ncards first cards from 'cards'
         play_cards = cards[0:None if ncards == len(cards) else ncards]
-        cards_score = sum([c.score for c in play_cards]) / ncards
+        cards_score = sum([self.scoring.get_score(c) for c in play_cards]) / ncards
         cards_score = self.parameters.initial_play_scale_score(play_cards) * cards_score
         # Return the adjusted average score
         return cards_score
@@ -264,5 +264,5 @@ class MoskaBot2(AbstractPlayer):
         play_cards = []
         if playable_values:
             chand = self.hand.copy()
-            play_cards = chand.pop_cards(cond=lambda x : x.value in playable_values and (x.score < 10 or len(self.moskaGame.deck) <= 0), max_cards = self._fits_to_table())
+            play_cards = chand.pop_cards(cond=lambda x : x.value in playable_values and (self.scoring.get_score(x) < 10 or len(self.moskaGame.deck) <= 0), max_cards = self._fits_to_table())
         return play_cards
\ No newline at end of file
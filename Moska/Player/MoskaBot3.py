@@ -8,6 +8,7 @@ from ._ScoreCards import _ScoreCards
 if TYPE_CHECKING:
     from ..Game.Game import MoskaGame
 from .AbstractPlayer import AbstractPlayer
+from . import OpeningBook
 from .PolicyParameters.HeuristicParameters import HeuristicParameters
 
 from scipy.optimize import linear_sum_assignment
@@ -16,9 +17,15 @@ class MoskaBot3(AbstractPlayer):
     cost_matrix_max = 10000
     scoring : _ScoreCards = None
     parameters : HeuristicParameters = None
-    def __init__(self, moskaGame: MoskaGame = None, name: str = "", delay=10 ** -6, requires_graphic: bool = False, log_level=logging.INFO, log_file="",parameters = {}):
+    def __init__(self, moskaGame: MoskaGame = None, name: str = "", delay=10 ** -6, requires_graphic: bool = False, log_level=logging.INFO, log_file="",parameters = {}, opening_book : str = None):
+        """
+        Args:
+            parameters (dict, optional): The values of the HeuristicParameters. Defaults to the tuned values.
+            opening_book (str, optional): The file of an OpeningBook, from which the first InitialPlay of the game is looked up. Defaults to None.
+        """
         if not name:
             name = "B3-"
+        self.opening_book = opening_book
         super().__init__(moskaGame, name, delay, requires_graphic, log_level, log_file)
         self.scoring = _ScoreCards(self,default_method = "counter")
         if not parameters:
@@ -78,18 +85,18 @@ class MoskaBot3(AbstractPlayer):
     def _calc_assignment_score_from_hand(self, hcard : Card, tcard : Card) -> float:
         """ Calculate the score of playing hcard (card in hand) to tcard (card on the table).
         The smaller the score, the better."""
-        score = hcard.score - tcard.score
+        score = self.scoring.get_score(hcard) - self.scoring.get_score(tcard)
         # Scale the score with some value (currently not calculated [1])
         score = self.parameters.fall_card_scale_hand_play_score(hcard,tcard)*score
         return score
     
     def _calc_assignment_score_from_deck(self,deck_card : Card, tcard : Card):
-        score = deck_card.score - tcard.score
+        score = self.scoring.get_score(deck_card) - self.scoring.get_score(tcard)
         score = self.parameters.fall_card_scale_deck_play_score(deck_card,tcard) * score
         return score
     
     def _calc_assignment_score_to_self(self,card_in_hand : Card, card_to_self : Card):
-        score = card_in_hand.score - card_to_self.score
+        score = self.scoring.get_score(card_in_hand) - self.scoring.get_score(card_to_self)
         score = self.parameters.to_self_scale_play_score(card_in_hand,card_to_self)*score
         return score  
     
@@ -189,11 +196,16 @@ class MoskaBot3(AbstractPlayer):
         Returns:
             List[Card]: _description_
         """
+        if self.opening_book is not None:
+            play_cards = OpeningBook.get_book(self.opening_book).play_for(self)
+            if play_cards:
+                self.plog.info(f"INITIAL: Chose from the opening book: {play_cards}")
+                return play_cards
         same_values = {}
         for val in set([c.value for c in self.hand.cards]):
             # A dictionary of value : List[Card], where the cards are sorted in ascending order according to score
             # For example same_values[3] : [S3,A3], where S3.score = 4, S3.score = 6
-            same_values[val] = list(sorted(filter(lambda x : x.value == val, self.hand.cards),key=lambda x : x.score))
+            same_values[val] = list(sorted(filter(lambda x : x.value == val, self.hand.cards),key=lambda x : self.scoring.get_score(x)))
         fits = self._fits_to_table()
         play_cards = []
         new_play_cards = []
@@ -266,7 +278,7 @@ class MoskaBot3(AbstractPlayer):
         ncards = min(fits,len(cards))
         # Get ncards first cards from 'cards'
         play_cards = cards[0:None if ncards == len(cards) else ncards]
-        cards_score = sum([c.score for c in play_cards]) / ncards
+        cards_score = sum([self.scoring.get_score(c) for c in play_cards]) / ncards
         cards_score = self.parameters.initial_play_scale_score(play_cards) * cards_score
         # Return the adjusted average score
         return cards_score
@@ -282,5 +294,5 @@ class MoskaBot3(AbstractPlayer):
         play_cards = []
         if playable_values:
             chand = self.hand.copy()
-            play_cards = chand.pop_cards(cond=lambda x : x.value in playable_values and (x.score < 10 or len(self.moskaGame.deck) <= 0), max_cards = self._fits_to_table())
+            play_cards = chand.pop_cards(cond=lambda x : x.value in playable_values and (self.scoring.get_score(x) < 10 or len(self.moskaGame.deck) <= 0), max_cards = self._fits_to_table())
         return play_cards
\ No newline at end of file
@@ -0,0 +1,147 @@
+from __future__ import annotations
+import os
+import threading
+from math import comb
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
+import numpy as np
+from ..Game import utils
+from ..Game.FastGame import HAND_SIZE, iter_bits
+if TYPE_CHECKING:
+    from ..Game.Deck import Card
+    from .AbstractPlayer import AbstractPlayer
+
+NSUITS = len(utils.CARD_SUITS)
+# The triumph suit of the canonical hands
+CANONICAL_TRIUMPH = utils.CARD_SUITS[-1]
+# The number of hands of HAND_SIZE cards, and the length of the book
+NHANDS = comb(52, HAND_SIZE)
+# _BINOMIALS[n][k] = comb(n, k)
+_BINOMIALS = tuple(tuple(comb(n, k) for k in range(HAND_SIZE + 1)) for n in range(52))
+
+# _SPREAD[m] is the mask of the cards of suit index 0 with the values in the 13 bit mask m
+_SPREAD = tuple(sum(1 << (v*NSUITS) for v in range(13) if m >> v & 1) for m in range(1 << 13))
+
+def hand_index(mask : int) -> int:
+    """ The index of a hand of HAND_SIZE cards among all such hands (the rank of the combination in colexicographic order) """
+    index = 0
+    for k, c in enumerate(iter_bits(mask)):
+        index += _BINOMIALS[c][k + 1]
+    return index
+
+def canonical_suits(mask : int, triumph : str) -> Tuple[int,...]:
+    """ Return the canonical suit index of each suit in the hand: the triumph suit is the last suit,
+    and the other suits are ordered by the values in the hand (a suit with a higher card first). Suits with the same values are interchangeable.
+    """
+    suit_values = [0]*NSUITS
+    for c in iter_bits(mask):
+        suit_values[c % NSUITS] |= 1 << (c // NSUITS)
+    t = utils.SUIT_INDEX[triumph]
+    others = sorted((s for s in range(NSUITS) if s != t), key=lambda s : suit_values[s], reverse=True)
+    suit_map = [NSUITS - 1]*NSUITS
+    for k, s in enumerate(others):
+        suit_map[s] = k
+    return tuple(suit_map)
+
+def canonical_hand(mask : int, triumph : str) -> Tuple[int,Tuple[int,...]]:
+    """ Return the canonical form of the hand, with CANONICAL_TRIUMPH as the triumph suit, and the suit map (see 'canonical_suits').
+    All hands that are equal up to renaming the suits, keeping the triumph suit as triumph, have the same canonical form.
+    """
+    suit_map = canonical_suits(mask, triumph)
+    canonical = 0
+    for c in iter_bits(mask):
+        canonical |= 1 << (c - c % NSUITS + suit_map[c % NSUITS])
+    return canonical, suit_map
+
+def canonical_hands() -> Iterator[int]:
+    """ Iterate over the canonical hands of HAND_SIZE cards: the values of the three non-triumph suits are in decreasing order (see 'canonical_suits') """
+    # The 13 bit value masks of a suit with k cards, in increasing order
+    by_count = [[m for m in range(1 << 13) if m.bit_count() == k] for k in range(HAND_SIZE + 1)]
+    t = utils.SUIT_INDEX[CANONICAL_TRIUMPH]
+    for kt in range(HAND_SIZE + 1):
+        left = HAND_SIZE - kt
+        for triumphs in by_count[kt]:
+            hand = _SPREAD[triumphs] << t
+            for ka in range(left + 1):
+                for kb in range(left - ka + 1):
+                    kc = left - ka - kb
+                    for a in by_count[ka]:
+                        for b in by_count[kb]:
+                            if b > a:
+                                break
+                            for c in by_count[kc]:
+                                if c > b:
+                                    break
+                                yield hand | _SPREAD[a] | _SPREAD[b] << 1 | _SPREAD[c] << 2
+
+class OpeningBook:
+    """ A book of the first InitialPlay of a game, when the initiator has HAND_SIZE cards, the table is empty and the deck is full.
+
+    The book is indexed by the canonical form of the initiators hand (see 'canonical_hand'), so the hands that only differ
+    by the names of the non-triumph suits share an entry. The value of the triumph card at the bottom of the deck is not a part of the key.
+    Each entry is a single byte: a bit mask of the cards to play, over the cards of the canonical hand in increasing order of their ids,
+    or 0 if the hand is not in the book. Looking a hand up takes constant time.
+    The book is created offline with Analysis/make-opening-book.py.
+    """
+    def __init__(self, nplayers : int, plays : np.ndarray = None):
+        """
+        Args:
+            nplayers (int): The number of players in the games of the book.
+            plays (np.ndarray, optional): The uint8 entries of the book, indexed by 'hand_index'. Defaults to an empty book.
+        """
+        self.nplayers = nplayers
+        self.plays = plays if plays is not None else np.zeros(NHANDS, dtype=np.uint8)
+        if self.plays.shape != (NHANDS,):
+            raise ValueError(f"The book must have {NHANDS} entries, not {self.plays.shape}")
+
+    def __len__(self) -> int:
+        """ The number of hands in the book """
+        return int(np.count_nonzero(self.plays))
+
+    def get(self, hand : int, triumph : str) -> int:
+        """ Return the mask of the cards to play from 'hand' (a mask of HAND_SIZE cards) or 0 if the hand is not in the book """
+        canonical, suit_map = canonical_hand(hand, triumph)
+        entry = int(self.plays[hand_index(canonical)])
+        if not entry:
+            return 0
+        # The order of the cards in the canonical hand
+        cards = sorted(iter_bits(hand), key=lambda c : c - c % NSUITS + suit_map[c % NSUITS])
+        return sum(1 << c for k, c in enumerate(cards) if entry >> k & 1)
+
+    def set(self, hand : int, triumph : str, play : int) -> None:
+        """ Store the mask of the cards 'play' to play from 'hand' (a mask of HAND_SIZE cards) """
+        canonical, suit_map = canonical_hand(hand, triumph)
+        cards = sorted(iter_bits(hand), key=lambda c : c - c % NSUITS + suit_map[c % NSUITS])
+        self.plays[hand_index(canonical)] = sum(1 << k for k, c in enumerate(cards) if play >> c & 1)
+
+    def play_for(self, player : AbstractPlayer) -> List[Card]:
+        """ Return the cards 'player' should play on the first InitialPlay of the game, or None if it isn't the first play or the hand is not in the book """
+        game = player.moskaGame
+        if (len(game.players) != self.nplayers or len(player.hand) != HAND_SIZE or game.cards_to_fall or game.fell_cards
+            or len(game.deck) != 52 - HAND_SIZE*self.nplayers):
+            return None
+        play = self.get(player.hand.card_set.mask, game.triumph)
+        if not play:
+            return None
+        return [card for card in player.hand.cards if play >> card.id & 1]
+
+    def save(self, path : str) -> None:
+        """ Save the book to a compressed .npz file """
+        np.savez_compressed(path, plays=self.plays, nplayers=self.nplayers)
+
+    @classmethod
+    def load(cls, path : str) -> OpeningBook:
+        """ Load a book saved with 'save' """
+        with np.load(path) as data:
+            return cls(int(data["nplayers"]), data["plays"])
+
+
+_books : Dict[str,OpeningBook] = {}
+_lock = threading.Lock()
+
+def get_book(path : str) -> OpeningBook:
+    """ Return the book loaded from 'path'. The book is loaded once per process, and shared by all players. """
+    path = os.path.abspath(path)
+    with _lock:
+        if path not in _books:
+            _books[path] = OpeningBook.load(path)
+        return _books[path]
@@ -43,7 +43,7 @@ class HeuristicParameters():
     
     def _calculate_score(self, cards_after_play : List[Card], lifted_from_deck : int, most_falls : int, e_lifted : float) -> float:
         """ Evaluate the hand after playing, or the excpected value of the hand"""
-        sc = sum((c.score for c in cards_after_play)) + self._adjust_for_missing_cards(cards_after_play,most_falls,lifted=lifted_from_deck) + self._e_score_from_lifted(e_lifted, lifted_from_deck)
+        sc = sum((self.player.scoring.get_score(c) for c in cards_after_play)) + self._adjust_for_missing_cards(cards_after_play,most_falls,lifted=lifted_from_deck) + self._e_score_from_lifted(e_lifted, lifted_from_deck)
         try:
             sc = sc / (len(cards_after_play) + lifted_from_deck)
         except ZeroDivisionError as zde:
@@ -113,7 +113,7 @@ class HeuristicParameters():
         self.player.plog.debug(f"Cards NOT in deck: {len(cards_not_in_deck)}")
         cards_possibly_in_deck = set(game.card_monitor.cards_fall_dict.keys()).difference(cards_not_in_deck)
         self.player.plog.debug(f"Cards possibly in deck: {len(cards_possibly_in_deck)}")
-        total_possible_falls = sum((c.score for c in cards_possibly_in_deck))
+        total_possible_falls = sum((self.player.scoring.get_score(c) for c in cards_possibly_in_deck))
         try:
             e_lifted = total_possible_falls / len(cards_possibly_in_deck)
         except ZeroDivisionError as ze:
@@ -129,9 +129,10 @@ class HeuristicParameters():
         if tcard.value in set([c.value for c in self.player.hand.cards]):
             scale += self.method_values["fall_card_same_value_already_in_hand"]
         # If the card has been kopled and is preventing us from kopling again
-        if tcard.kopled and len(self.player.moskaGame.deck) > 0:
+        if self.player.moskaGame.is_kopled(tcard) and len(self.player.moskaGame.deck) > 0:
             scale += self.method_values["fall_card_card_is_preventing_kopling"]
-        scale = scale*(hcard.score + tcard.score)/(hcard.score - tcard.score)
+        hscore, tscore = self.player.scoring.get_score(hcard), self.player.scoring.get_score(tcard)
+        scale = scale*(hscore + tscore)/(hscore - tscore)
         #scale = scale*(hcard.score - tcard.score)/tcard.score
         return scale
     
@@ -146,13 +147,15 @@ class HeuristicParameters():
                 break
         if can_fall_with_other_cards:
             scale += self.method_values["fall_card_deck_card_not_played_to_unique"]
-        scale = scale*(deck_card.score + tcard.score) / (deck_card.score - tcard.score)
+        dscore, tscore = self.player.scoring.get_score(deck_card), self.player.scoring.get_score(tcard)
+        scale = scale*(dscore + tscore) / (dscore - tscore)
         #scale = scale*(hcard.score - tcard.score)/(tcard.score + deck_card.score)
         return scale
     
     def to_self_scale_play_score(self, card_in_hand: Card, card_to_self: Card):
         scale = 1#(card_in_hand.score - card_to_self.score)/card_to_self.score
-        scale = scale*(card_in_hand.score + card_to_self.score) / (card_in_hand.score - card_to_self.score)
+        hscore, sscore = self.player.scoring.get_score(card_in_hand), self.player.scoring.get_score(card_to_self)
+        scale = scale*(hscore + sscore) / (hscore - sscore)
         return scale
     
     def fall_card_maximum_play_score_from_hand(self, **kwargs):
@@ -9,10 +9,12 @@ class _ScoreCards:
     Each player who uses a scoring system, has a separate instance of this class.
     This class is used to assing scores to cards in the players hand, and in the table,
     to determine which cards are the best to play.
+    The scores are stored in this instance, indexed by the cards id, so players don't overwrite each others scores.
     """
     default_method : Callable = None
     player : AbstractPlayer = None
     methods : dict[str,Callable] = {}
+    scores : List[float] = []
     
     def __init__(self,player : AbstractPlayer,
                  default_method : Callable | str = "basic",
@@ -25,14 +27,19 @@ class _ScoreCards:
         self.default_method = self.methods[default_method]
         self.methods["default"] = self.default_method
         self.player = player
+        self.scores = [None]*52
     
     def assign_scores_inplace(self, method : str = "default") -> None:
-        """ Assign scores to cards in the players hand and in the table inplace. The method
+        """ Assign scores to cards in the players hand and in the table. The method
         is the value at 'default' key in self.methods, which is defined at __init__.
         """
-        self.player.moskaGame.cards_to_fall = self._assign_scores(self.player.moskaGame.cards_to_fall,method)
-        self.player.hand.cards = self._assign_scores(self.player.hand.cards,method)
+        self._assign_scores(self.player.moskaGame.cards_to_fall,method)
+        self._assign_scores(self.player.hand.cards,method)
         return
+    
+    def get_score(self, card : Card) -> float:
+        """ Return the score last assigned to the card """
+        return self.scores[card.id]
 
     def get_sm_score_in_list(self, cards : List[Card]) -> int:
         """Return the smallest score in the list of cards.
@@ -41,12 +48,12 @@ class _ScoreCards:
         if not cards:
             return None
         try:
-            sm_score = min((c.score for c in cards))
+            sm_score = min((self.scores[c.id] for c in cards))
         except Exception as e:
             print(e)
             print(f"Assign scores to cards first")
             raise Exception(e)
-        return list(filter(lambda x : x.score == sm_score,cards))[0]
+        return list(filter(lambda x : self.scores[x.id] == sm_score,cards))[0]
     
     def _count_cards_score(self, card : Card):
         """ Return how many cards can the input card fall. Uses the card_monitor to count the cards."""
@@ -71,18 +78,18 @@ class _ScoreCards:
             return 12 - (14 - card.value)
     
     def _assign_scores(self, cards : Iterable[Card],method : Callable = "default") -> List[Card]:
-        """Create new Card instances, with the Card instances from Iterable.
-        Return the new cards
+        """Calculate and store the score of each card in the Iterable.
+        Return the cards as a list
 
         Args:
-            cards (Iterable[Card]): The cards which are copied to the new list of cards, along with the score
+            cards (Iterable[Card]): The cards whose scores to calculate
             
         Returns:
-            List[Card]: list of the same cards, with a score -attribute
+            List[Card]: list of the same cards, whose scores can be read with 'get_score'
         """
         method = self.methods[method]
         new_cards = []
         for card in cards:
-            card.score = method(card)
+            self.scores[card.id] = method(card)
             new_cards.append(card)
         return new_cards
\ No newline at end of file
@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Game import Deck, utils
+from Moska.Game.CardSet import CardSet
+
+class TestCardSet(unittest.TestCase):
+    cards = None
+    def setUp(self) -> None:
+        self.cards = Deck.StandardDeck(shuffle = True).pop_cards(52)
+    
+    def test_card_index_is_reference_order(self):
+        deck = Deck.StandardDeck(shuffle = False).pop_cards(52)
+        self.assertEqual([utils.card_index(c) for c in deck], list(range(52)))
+        
+    def test_from_cards_and_back(self):
+        cs = CardSet.from_cards(self.cards[:10])
+        self.assertEqual(len(cs), 10)
+        self.assertEqual(set(cs.cards()), set(self.cards[:10]))
+        self.assertTrue(all(c in cs for c in self.cards[:10]))
+        self.assertFalse(any(c in cs for c in self.cards[10:]))
+    
+    def test_set_operations(self):
+        a = CardSet.from_cards(self.cards[:20])
+        b = CardSet.from_cards(self.cards[10:30])
+        self.assertEqual(set(a | b), set(self.cards[:30]))
+        self.assertEqual(set(a & b), set(self.cards[10:20]))
+        self.assertEqual(set(a - b), set(self.cards[:10]))
+        self.assertTrue(CardSet.from_cards(self.cards[12:15]) <= a)
+        self.assertFalse(b <= a)
+        
+    def test_value_and_suit_masks(self):
+        cs = CardSet.from_cards(self.cards)
+        for v in utils.CARD_VALUES:
+            self.assertEqual(set(cs.with_value(v)), {c for c in self.cards if c.value == v})
+        for s in utils.CARD_SUITS:
+            self.assertEqual(set(cs.with_suit(s)), {c for c in self.cards if c.suit == s})
+    
+    def test_values(self):
+        cs = CardSet.from_cards(self.cards[:8])
+        self.assertEqual(cs.values(), {c.value for c in self.cards[:8]})
+        
+    def test_with_values_of(self):
+        hand = CardSet.from_cards(self.cards[:15])
+        table = CardSet.from_cards(self.cards[40:45])
+        table_values = {c.value for c in self.cards[40:45]}
+        self.assertEqual(set(hand.with_values_of(table)), {c for c in self.cards[:15] if c.value in table_values})
+        
+if __name__ == "__main__":
+    unittest.main()
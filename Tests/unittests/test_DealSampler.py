@@ -0,0 +1,49 @@
+import unittest
+import random
+import sys
+import os
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+import numpy as np
+from Moska.Game.DealSampler import DealSampler
+
+class TestDealSampler(unittest.TestCase):
+    # Player 0 knows its hand (cards 0-5), and one card (6) of player 1. The bottom card of the deck is 51.
+    known = [sum(1 << c for c in range(6)), 1 << 6, 0]
+    hidden = list(range(7, 20))
+    def make_sampler(self):
+        return DealSampler(self.hidden, self.known, [0, 5, 6], 3, 51)
+
+    def test_sample_is_consistent(self):
+        sampler = self.make_sampler()
+        rng = random.Random(0)
+        for _ in range(20):
+            hands, deck = sampler.sample(rng)
+            self.assertEqual(hands[0], self.known[0])
+            self.assertEqual(hands[1] & self.known[1], self.known[1])
+            self.assertEqual([hand.bit_count() for hand in hands], [6, 6, 6])
+            self.assertEqual(len(deck), 3)
+            self.assertEqual(deck[0], 51)
+            dealt = (hands[1] | hands[2]) & ~self.known[1]
+            self.assertEqual(dealt | sum(1 << c for c in deck[1:]), sum(1 << c for c in self.hidden))
+
+    def test_sample_batch_is_consistent(self):
+        hands, decks = self.make_sampler().sample_batch(50, np.random.default_rng(0))
+        self.assertEqual(hands.shape, (50, 3))
+        self.assertEqual(decks.shape, (50, 3))
+        self.assertTrue(np.all(decks[:, 0] == 51))
+        self.assertTrue(np.all(hands[:, 0] == self.known[0]))
+        for row, deck in zip(hands, decks):
+            self.assertEqual(int(row[1]) & self.known[1], self.known[1])
+            self.assertEqual([int(hand).bit_count() for hand in row], [6, 6, 6])
+            dealt = (int(row[1]) | int(row[2])) & ~self.known[1]
+            self.assertEqual(dealt | sum(1 << int(c) for c in deck[1:]), sum(1 << c for c in self.hidden))
+
+    def test_inconsistent_counts_raise(self):
+        with self.assertRaises(ValueError):
+            DealSampler(self.hidden, self.known, [0, 5, 6], 4, 51)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,13 @@
 import unittest
 import copy
+import pickle
 import sys
 import os
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
 SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
 #print(SCRIPT_DIR)
 sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
-from Moska import Deck
+from Moska.Game import Deck
 
 class TestDeck(unittest.TestCase):
     deck = None
@@ -29,5 +30,24 @@ class TestDeck(unittest.TestCase):
         deck_list = self.deck.pop_cards(len(self.deck))
         self.assertTrue(len(set(deck_list)) == 51,"All cards were not unique. Length of set is not 51.")
         
+class TestCard(unittest.TestCase):
+    def test_cards_are_interned(self):
+        card = Deck.Card(10, "H")
+        self.assertIs(Deck.Card(10, "H"), card)
+        self.assertIs(copy.copy(card), card)
+        self.assertIs(copy.deepcopy(card), card)
+        self.assertIs(copy.deepcopy([card])[0], card)
+        self.assertIs(pickle.loads(pickle.dumps(card)), card)
+        self.assertIs(pickle.loads(pickle.dumps(Deck.UNKNOWN_CARD)), Deck.UNKNOWN_CARD)
+        self.assertIs(Deck.REFERENCE_DECK[card.id], card)
+
+    def test_cards_are_immutable(self):
+        card = Deck.Card(10, "H")
+        with self.assertRaises(TypeError):
+            card.value = 11
+        with self.assertRaises(TypeError):
+            card.kopled = True
+        self.assertEqual(card.value, 10)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
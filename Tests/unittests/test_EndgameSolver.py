@@ -0,0 +1,99 @@
+import unittest
+import random
+import sys
+import os
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Game import FastGame
+from Moska.Game.DealSampler import DealSampler
+from Moska.Game.EndgameSolver import BudgetExceeded, EndgameSolver
+from Moska.Game.Game import MoskaGame
+from test_FastGame import random_game
+
+def empty_deck_game(rng : random.Random, nplayers : int) -> FastGame.FastGame:
+    """ Play random games with the heuristic policy, until a game is left with an empty deck """
+    while True:
+        game = random_game(rng, nplayers)
+        while game.deck and not game.is_over():
+            game.apply(*FastGame.heuristic_action(game, rng))
+        if not game.is_over():
+            return game
+
+class TestEndgameSolver(unittest.TestCase):
+    def test_best_action_is_optimal(self):
+        rng = random.Random(0)
+        solver = EndgameSolver(max_nodes=10**6, seed=0)
+        for _ in range(10):
+            game = empty_deck_game(rng, 2)
+            loser = solver.solve(game)
+            action, loss = solver.best_action(game)
+            # The player loses only if every action loses
+            self.assertEqual(loss, 1.0 if loser == game.current else 0.0)
+            game.apply(*action)
+            self.assertEqual(solver.solve(game), loser)
+
+    def test_budget_exceeded(self):
+        game = empty_deck_game(random.Random(1), 4)
+        with self.assertRaises(BudgetExceeded):
+            EndgameSolver(max_nodes=1).solve(game)
+
+    def test_table_is_reused(self):
+        rng = random.Random(3)
+        solver = EndgameSolver(max_nodes=10**6, seed=0)
+        for _ in range(10):
+            game = empty_deck_game(rng, 3)
+            loser = solver.solve(game)
+            # Positions with repetitions below them are stored too, so the second search is a lookup
+            self.assertEqual(solver.solve(game), loser)
+            self.assertEqual(solver.nodes, 0)
+
+    def test_play_outs_count_against_the_budget(self):
+        game = empty_deck_game(random.Random(4), 4)
+        with self.assertRaises(BudgetExceeded):
+            EndgameSolver(max_nodes=5, max_depth=0).solve(game)
+
+    def test_best_action_over_the_solved_deals(self):
+        game = empty_deck_game(random.Random(5), 3)
+        i = game.current
+        hidden = [c for pid, hand in enumerate(game.hands) if pid != i for c in FastGame.iter_bits(hand)]
+        known = [hand if pid == i else 0 for pid, hand in enumerate(game.hands)]
+        nunknown = [0 if pid == i else hand.bit_count() for pid, hand in enumerate(game.hands)]
+        sampler = DealSampler(hidden, known, nunknown, 0)
+        solver = EndgameSolver(max_nodes=10**6, ndeals=4, seed=0)
+        solver.best_action(game, sampler=sampler)
+        self.assertEqual(solver.deals_solved, 4)
+
+        class OneDealSolver(EndgameSolver):
+            """ Runs out of budget after the first deal """
+            def _visit(self):
+                if self.deals_solved >= 1:
+                    raise BudgetExceeded()
+                super()._visit()
+        solver = OneDealSolver(max_nodes=10**6, ndeals=4, seed=0)
+        action, loss = solver.best_action(game, sampler=sampler)
+        self.assertEqual(solver.deals_solved, 1)
+        self.assertIn(action, FastGame.candidate_actions(game))
+        self.assertIn(loss, (0.0, 1.0))
+
+    def test_large_positions_are_not_searched(self):
+        game = MoskaGame(nplayers=4, random_seed=1)
+        game._set_triumph()
+        game._create_locks()
+        game._start_players()
+        game = game.clone()
+        solver = EndgameSolver(max_cards=23)
+        # 24 cards in the hands
+        self.assertIsNone(solver.choose_action(game, game.get_initiating_player(), ["InitialPlay"]))
+        self.assertEqual(solver.nodes, 0)
+
+    def test_solve_doesnt_change_the_game(self):
+        game = empty_deck_game(random.Random(2), 2)
+        copy = game.copy()
+        EndgameSolver().solve(game)
+        self.assertEqual(repr(game), repr(copy))
+        self.assertEqual(game.ready, copy.ready)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import sys
+import os
+import numpy as np
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Model.EvaluationCache import EvaluationCache
+
+class _SumModel:
+    def __init__(self):
+        self.evaluated = 0
+    
+    def predict(self, X):
+        self.evaluated += len(X)
+        return X.sum(axis=1, keepdims=True)
+
+class TestEvaluationCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.model = _SumModel()
+        self.cache = EvaluationCache(self.model, maxsize=3)
+    
+    def test_cached_states_are_not_evaluated(self):
+        X = np.array([[1,2],[3,4],[1,2]], dtype=np.float32)
+        self.assertTrue(np.array_equal(self.cache.predict(X), [[3],[7],[3]]))
+        # The repeated state is evaluated once
+        self.assertEqual(self.model.evaluated, 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+        self.model.evaluated = 0
+        self.assertTrue(np.array_equal(self.cache.predict(X[::-1].copy()), [[3],[7],[3]]))
+        self.assertEqual(self.model.evaluated, 0)
+        self.assertEqual((self.cache.hits, self.cache.misses), (4, 2))
+    
+    def test_least_recently_used_is_evicted(self):
+        self.cache.predict(np.array([[1],[2],[3]], dtype=np.float32))
+        self.cache.predict(np.array([[1]], dtype=np.float32))
+        self.cache.predict(np.array([[4]], dtype=np.float32))
+        self.model.evaluated = 0
+        self.cache.predict(np.array([[1],[3],[4]], dtype=np.float32))
+        self.assertEqual(self.model.evaluated, 0)
+        self.cache.predict(np.array([[2]], dtype=np.float32))
+        self.assertEqual(self.model.evaluated, 1)
+
+if __name__ == "__main__":
+    unittest.main()
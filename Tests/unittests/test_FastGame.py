@@ -0,0 +1,84 @@
+import unittest
+import random
+import sys
+import os
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Game import FastGame
+from Moska.Game.Game import MoskaGame
+from Moska.Player.MoskaBot3 import MoskaBot3
+
+def random_game(rng : random.Random, nplayers : int = 4) -> FastGame.FastGame:
+    deck = list(range(52))
+    rng.shuffle(deck)
+    hands = [sum(1 << deck.pop() for _ in range(6)) for _ in range(nplayers)]
+    # The triumph card is at the bottom of the deck
+    triumph = deck.pop()
+    deck.insert(0, triumph)
+    return FastGame.FastGame(hands, deck, "CDHS"[triumph % 4])
+
+class CheckedMoskaBot3(MoskaBot3):
+    """ A MoskaBot3, that records the decisions where FastGame.legal_moves differs from _playable_moves """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.decisions = 0
+        self.mismatches = []
+
+    def _playable_moves(self):
+        playable = super()._playable_moves()
+        legal = FastGame.FastGame.from_game(self.moskaGame, current=self.pid).legal_moves()
+        self.decisions += 1
+        if sorted(legal) != sorted(playable):
+            self.mismatches.append((playable, legal))
+        return playable
+
+class TestFastGame(unittest.TestCase):
+    def test_legal_moves_at_start(self):
+        game = random_game(random.Random(0))
+        # Player 0 is the target, and the previous player initiates
+        self.assertEqual(game.legal_moves(), ["Skip"])
+        game.apply("Skip")
+        self.assertEqual(game.current, 1)
+        self.assertEqual(game.initiator(), 3)
+        game.current = 3
+        self.assertEqual(game.legal_moves(), ["InitialPlay"])
+
+    def test_copy_is_independent(self):
+        game = random_game(random.Random(1))
+        copy = game.copy()
+        copy.play_out()
+        self.assertEqual(game.hands[0].bit_count(), 6)
+        self.assertEqual(len(game.deck), 52 - 4*6)
+        self.assertEqual(game.loser(), -1)
+        self.assertNotEqual(copy.loser(), -1)
+
+    def test_play_out_ranks_all_players(self):
+        rng = random.Random(2)
+        for policy in (FastGame.heuristic_action, FastGame.random_action):
+            for nplayers in (2, 4, 6):
+                game = random_game(rng, nplayers)
+                loser = game.play_out(policy, rng)
+                self.assertTrue(game.is_over())
+                self.assertEqual(sorted(game.ranks), list(range(1, nplayers + 1)))
+                self.assertEqual(game.ranks[loser], nplayers)
+                # All cards except the losers are out of the game
+                self.assertEqual(len(game.deck), 0)
+                self.assertTrue(all(hand == 0 for i, hand in enumerate(game.hands) if i != loser))
+
+    def test_legal_moves_match_playable_moves(self):
+        for seed in range(1, 6):
+            players = [CheckedMoskaBot3() for _ in range(4)]
+            game = MoskaGame(players=players, random_seed=seed, timeout=100)
+            # Play the game, without writing the state vectors
+            game._set_triumph()
+            game._create_locks()
+            game._start_players()
+            self.assertTrue(game._play_single_threaded())
+            self.assertGreater(sum(pl.decisions for pl in players), 0)
+            for pl in players:
+                self.assertEqual(pl.mismatches, [])
+
+if __name__ == "__main__":
+    unittest.main()
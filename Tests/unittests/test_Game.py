@@ -0,0 +1,129 @@
+import unittest
+import sys
+import os
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Game import Game
+from Moska.Game.CardSet import cards_to_mask
+from Moska.Game.GameState import GameState
+from Moska.Model import ModelRegistry
+from Moska.Player.MoskaBot2 import MoskaBot2
+from Moska.Player.MoskaBot3 import MoskaBot3
+import numpy as np
+
+class _ZeroModel:
+    """ A model, that evaluates every state to 0 """
+    def __init__(self, model_file):
+        pass
+
+    def predict(self, X):
+        return np.zeros((len(X), 1), dtype=np.float32)
+
+def play_game(random_seed : int, threaded : bool = False) -> Game.MoskaGame:
+    """ Play a game of MoskaBot2s and MoskaBot3s, without writing the state vectors """
+    players = [MoskaBot3(), MoskaBot2(), MoskaBot3(), MoskaBot2()]
+    game = Game.MoskaGame(players=players, random_seed=random_seed, threaded=threaded, timeout=10)
+    game._set_triumph()
+    game._create_locks()
+    if threaded:
+        game._start_player_threads()
+        assert game._join_threads(), "The game didn't finish"
+    else:
+        game._start_players()
+        assert game._play_single_threaded(), "The game didn't finish"
+    return game
+
+class TestPlay(unittest.TestCase):
+    def test_single_threaded_game_is_deterministic(self):
+        for seed in (1, 2, 3):
+            first = play_game(seed)
+            second = play_game(seed)
+            self.assertEqual([pl.rank for pl in first.players], [pl.rank for pl in second.players])
+            for pl1, pl2 in zip(first.players, second.players):
+                self.assertGreater(len(pl1.state_vectors), 0)
+                self.assertEqual(pl1.state_vectors, pl2.state_vectors)
+
+    def test_threaded_game_finishes(self):
+        game = play_game(1, threaded=True)
+        self.assertEqual(sorted(pl.rank for pl in game.players), [1, 2, 3, 4])
+
+class TestClone(unittest.TestCase):
+    game = None
+    def setUp(self) -> None:
+        self.game = Game.MoskaGame(nplayers=4)
+        # Start the game, without playing it
+        self.game._set_triumph()
+        self.game._create_locks()
+        self.game._start_players()
+
+    def test_clone_copies_the_state(self):
+        clone = self.game.clone()
+        self.assertEqual(GameState.from_game(clone).as_vector(), GameState.from_game(self.game).as_vector())
+        self.assertEqual(list(clone.deck.cards), list(self.game.deck.cards))
+        self.assertEqual(clone.turnCycle.ptr, self.game.turnCycle.ptr)
+        for pl, cpl in zip(self.game.players, clone.players):
+            self.assertIsNot(pl, cpl)
+            self.assertIs(type(pl), type(cpl))
+            self.assertIs(cpl.moskaGame, clone)
+            self.assertEqual(pl.hand.cards, cpl.hand.cards)
+        self.assertEqual(clone.threads, {})
+        self.assertIsNone(clone.main_lock)
+
+    def test_moves_on_clone_dont_change_the_game(self):
+        vector = GameState.from_game(self.game).as_vector()
+        deck = list(self.game.deck.cards)
+        clone = self.game.clone()
+        initiator = clone.get_initiating_player()
+        card = initiator.hand.cards[0]
+        success, msg = clone._make_move("InitialPlay", [initiator, clone.get_target_player(), [card]])
+        self.assertTrue(success, msg)
+        self.assertEqual(clone.cards_to_fall, [card])
+        self.assertEqual(len(clone.deck), len(deck) - 1)
+        clone.card_monitor.remove_from_game([card])
+        self.assertEqual(self.game.cards_to_fall, [])
+        self.assertEqual(list(self.game.deck.cards), deck)
+        self.assertEqual(GameState.from_game(self.game).as_vector(), vector)
+        self.assertIn(card, self.game.card_monitor.cards_fall_dict)
+
+    def test_model_predict_on_clone(self):
+        ModelRegistry.MODEL_LOADERS[".zero"] = _ZeroModel
+        try:
+            clone = self.game.clone()
+            X = np.array([GameState.from_game(clone).as_vector()], dtype=np.float32)
+            self.assertEqual(clone.model_predict(X, model_file="model.zero").shape, (1, 1))
+        finally:
+            ModelRegistry.MODEL_LOADERS.pop(".zero")
+            ModelRegistry.clear()
+
+class TestEndTurn(unittest.TestCase):
+    game = None
+    def setUp(self) -> None:
+        game = Game.MoskaGame(nplayers=4, random_seed=2)
+        game._set_triumph()
+        game._create_locks()
+        game._start_players()
+        self.game = game.clone()
+
+    def test_finished_target_removes_cards_on_table(self):
+        game = self.game
+        target = game.get_target_player()
+        game.deck.pop_cards(len(game.deck))
+        # The target has fallen their last cards, and there are still cards to fall
+        cards = target.hand.pop_cards()
+        game.add_cards_to_fall(cards[:2])
+        game.fell_cards.extend(cards[2:4])
+        game.fell_mask = cards_to_mask(cards[2:4])
+        target.rank = 1
+        success, msg = game._make_move("EndTurn", [target, []])
+        self.assertTrue(success, msg)
+        self.assertEqual(game.cards_to_fall + game.fell_cards, [])
+        self.assertEqual(game.get_table_card_set().mask, 0)
+        for card in cards[:4]:
+            self.assertNotIn(card, game.card_monitor.cards_fall_dict)
+        for card, falls in game.card_monitor.cards_fall_dict.items():
+            self.assertFalse(set(falls) & set(cards[:4]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import random
+import sys
+import os
+import numpy as np
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Game import Deck, GameState
+
+class TestGameState(unittest.TestCase):
+    state = None
+    def setUp(self) -> None:
+        cards = list(Deck.REFERENCE_DECK)
+        random.shuffle(cards)
+        unknown = Deck.UNKNOWN_CARD
+        player_cards = [cards[0:4] + [unknown,unknown], cards[4:10], [unknown]*3, []]
+        # Some cards have been removed from the game
+        cards_fall = {card : random.sample(cards, random.randint(0,20)) for card in cards[:40]}
+        self.hand = cards[4:10]
+        self.state = GameState.GameState(17, player_cards, cards_fall, cards[10:14], cards[14:18], [0,1,0,0])
+
+    def test_as_array_equals_as_vector(self):
+        for normalize in (True, False):
+            vec = np.array(self.state.as_vector(normalize=normalize), dtype=np.float32)
+            arr = self.state.as_array(normalize=normalize)
+            self.assertEqual(arr.dtype, np.float32)
+            self.assertTrue(np.array_equal(vec, arr))
+
+    def test_as_array_with_hand(self):
+        vec = self.state.as_vector(normalize=False) + self.state.encode_cards(self.hand)
+        out = np.zeros(self.state.vector_length(with_hand=True), dtype=np.float32)
+        arr = self.state.as_array(normalize=False, out=out, hand_cards=self.hand)
+        self.assertIs(arr, out)
+        self.assertTrue(np.array_equal(np.array(vec, dtype=np.float32), arr))
+
+    def test_state_batch_streams_chunks(self):
+        calls = []
+        def evaluate(X):
+            calls.append(X.shape[0])
+            return X.sum(axis=1, keepdims=True)
+        batch = GameState.StateBatch(self.state.vector_length(with_hand=True), max_rows=3, evaluate=evaluate)
+        hands = [self.hand[:i] for i in range(7)]
+        for hand in hands:
+            batch.add(self.state, hand_cards=hand)
+        self.assertEqual(len(batch), 7)
+        evals = batch.finish()
+        self.assertEqual(calls, [3,3,1])
+        expected = [self.state.as_array(normalize=False, hand_cards=hand).sum() for hand in hands]
+        self.assertTrue(np.array_equal(evals[:,0], np.array(expected, dtype=np.float32)))
+        self.assertEqual(len(batch), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,7 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
 SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
 #print(SCRIPT_DIR)
 sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
-from Moska import Hand,Game,Deck
+from Moska.Game import Hand,Game,Deck
 
 class TestHand(unittest.TestCase):
     game = None
@@ -44,6 +44,17 @@ class TestHand(unittest.TestCase):
         self.assertTrue(len(self.hand) == 12)
         self.hand.pop_cards(lambda x : x in cards)
         self.assertTrue(len(self.hand) == 6)
+    
+    def test_card_set_follows_cards(self):
+        cards = self.deck.pop_cards(6)
+        self.hand.add(cards)
+        self.assertEqual(set(self.hand.card_set), set(self.hand.cards))
+        self.hand.pop_cards(lambda x : x in cards[:3])
+        self.assertEqual(set(self.hand.card_set), set(self.hand.cards))
+        self.hand.cards += cards[:3]
+        self.assertEqual(set(self.hand.card_set), set(self.hand.cards))
+        self.hand.draw(2)
+        self.assertEqual(set(self.hand.card_set), set(self.hand.cards))
             
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
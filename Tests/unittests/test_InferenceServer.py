@@ -0,0 +1,69 @@
+import unittest
+import multiprocessing
+import signal
+import time
+import sys
+import os
+import numpy as np
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Model import ModelRegistry
+from Moska.Model.InferenceServer import InferenceClient, InferenceServer
+
+class _SumModel:
+    def __init__(self, model_file):
+        self.model_file = model_file
+    
+    def predict(self, X):
+        return X.sum(axis=1, keepdims=True)
+
+class _SlowModel(_SumModel):
+    def predict(self, X):
+        time.sleep(0.5)
+        return super().predict(X)
+
+@unittest.skipUnless(multiprocessing.get_start_method() == "fork", "The test model is registered by forking")
+class TestInferenceServer(unittest.TestCase):
+    def setUp(self) -> None:
+        ModelRegistry.MODEL_LOADERS[".sum"] = _SumModel
+        ModelRegistry.MODEL_LOADERS[".slow"] = _SlowModel
+        self.server = InferenceServer(max_latency=0.01)
+        self.server.start()
+        ModelRegistry.connect(self.server.handle)
+    
+    def tearDown(self) -> None:
+        ModelRegistry.disconnect()
+        self.server.stop()
+        ModelRegistry.MODEL_LOADERS.pop(".sum")
+        ModelRegistry.MODEL_LOADERS.pop(".slow")
+    
+    def test_predict_on_server(self):
+        X = np.arange(12, dtype=np.float32).reshape(4,3)
+        evals = ModelRegistry.get_model("model.sum").predict(X)
+        self.assertTrue(np.array_equal(evals, X.sum(axis=1, keepdims=True)))
+        self.assertFalse(ModelRegistry.is_loaded("model.sum"))
+    
+    def test_errors_are_raised_in_client(self):
+        with self.assertRaises(ValueError):
+            ModelRegistry.get_model("model.unknown").predict(np.zeros((1,3), dtype=np.float32))
+
+    def test_timeout(self):
+        client = InferenceClient(self.server.handle, timeout=0.1, poll_interval=0.02)
+        X = np.ones((2,3), dtype=np.float32)
+        with self.assertRaises(TimeoutError):
+            client.predict(X, "model.slow")
+        # The late response to the timed out request is discarded
+        client.timeout = 5
+        self.assertTrue(np.array_equal(client.predict(X, "model.sum"), X.sum(axis=1, keepdims=True)))
+
+    def test_server_exit_raises_in_client(self):
+        model = ModelRegistry.get_model("model.sum")
+        # The server isn't joined, like when it dies while the games are running
+        os.kill(self.server.process.pid, signal.SIGKILL)
+        with self.assertRaises(RuntimeError):
+            model.predict(np.zeros((1,3), dtype=np.float32))
+
+if __name__ == "__main__":
+    unittest.main()
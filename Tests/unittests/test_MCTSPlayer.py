@@ -0,0 +1,27 @@
+import unittest
+import sys
+import os
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Game.Game import MoskaGame
+from Moska.Player.MCTSPlayer import MCTSPlayer
+
+class TestMCTSPlayer(unittest.TestCase):
+    def test_full_game(self):
+        players = [MCTSPlayer(max_iterations=10, seed=0), MCTSPlayer(max_iterations=10, seed=1)]
+        game = MoskaGame(players=players, random_seed=1, timeout=100)
+        # Play the game, without writing the state vectors
+        game._set_triumph()
+        game._create_locks()
+        game._start_players()
+        self.assertTrue(game._play_single_threaded())
+        self.assertEqual(sorted(pl.rank for pl in players), [1, 2])
+        self.assertEqual(len(game.deck), 0)
+        # Only the loser has cards left
+        loser = [pl for pl in players if pl.rank == 2][0]
+        self.assertTrue(all(len(pl.hand) == 0 for pl in players if pl is not loser))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+from unittest import mock
+import numpy as np
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Game.Game import MoskaGame
+from Moska.Player.ModelBot import ModelBot
+from Moska.Player.MoskaBot3 import MoskaBot3
+
+class RecordingModelBot(ModelBot):
+    """ A ModelBot, that records the number of states evaluated in each call to the model during each decision """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.decisions = []
+        self.deck_plays = []
+
+    def choose_move(self, playable):
+        self.calls = []
+        move = super().choose_move(playable)
+        self.decisions.append((playable, self.calls))
+        if "PlayFallFromDeck" in playable:
+            plays = self._candidate_plays("PlayFallFromDeck", num_states=1000)
+            self.deck_plays.append((plays, dict(self.deck_card_classes), self.moskaGame.card_monitor.get_cards_possibly_in_deck(self)))
+        return move
+
+def model_predict(game, X, model_file=None):
+    """ Record the number of states, and evaluate them randomly """
+    game.threads[game.lock_holder].calls.append(len(X))
+    return np.random.default_rng(len(X)).random((len(X), 1), dtype=np.float32)
+
+def play_game(random_seed : int, **kwargs) -> RecordingModelBot:
+    """ Play a game of a RecordingModelBot against MoskaBot3s, and return the ModelBot """
+    bot = RecordingModelBot(**kwargs)
+    game = MoskaGame(players=[bot, MoskaBot3(), MoskaBot3(), MoskaBot3()], random_seed=random_seed, timeout=100)
+    with mock.patch.object(MoskaGame, "model_predict", model_predict):
+        game._set_triumph()
+        game._create_locks()
+        game._start_players()
+        assert game._play_single_threaded(), "The game didn't finish"
+    return bot
+
+class TestModelBot(unittest.TestCase):
+    def test_one_model_call_per_decision(self):
+        for seed in (1, 2):
+            bot = play_game(seed, batch_size=10**5)
+            evaluated = [(playable, calls) for playable, calls in bot.decisions if calls]
+            self.assertTrue(any(len(playable) > 1 for playable, calls in evaluated))
+            for playable, calls in evaluated:
+                self.assertEqual(len(calls), 1, f"{len(calls)} model calls with playable moves {playable}")
+
+    def test_one_deck_card_per_class(self):
+        deck_plays = []
+        for seed in (1, 2, 3, 4):
+            deck_plays += play_game(seed).deck_plays
+        self.assertGreater(len(deck_plays), 0)
+        for plays, classes, cards in deck_plays:
+            # The classes partition the cards possibly in the deck
+            self.assertEqual(sorted((c for cl in classes.values() for c in cl), key=lambda c : c.id), sorted(cards, key=lambda c : c.id))
+            # Only the first card of each class is evaluated
+            self.assertEqual({play[0] for play in plays}, {cl[0] for cl in classes.values()})
+
+    def test_max_evaluations(self):
+        bot = play_game(1, max_evaluations=5, chunk_size=2)
+        self.assertGreater(len(bot.decisions), 0)
+        for playable, calls in bot.decisions:
+            self.assertLessEqual(sum(calls), max(5, len(playable)))
+
+    def test_decision_time(self):
+        # Only the first chunk is evaluated, when the time is up immediately
+        bot = play_game(1, decision_time=0, chunk_size=4)
+        self.assertGreater(len(bot.decisions), 0)
+        for playable, calls in bot.decisions:
+            self.assertLessEqual(len(calls), 1)
+            self.assertLessEqual(sum(calls), max(4, len(playable)))
+
+if __name__ == "__main__":
+    unittest.main()
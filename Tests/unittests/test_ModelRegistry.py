@@ -0,0 +1,38 @@
+import unittest
+import sys
+import os
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Model import ModelRegistry
+
+class _CountingModel:
+    loads = 0
+    def __init__(self, model_file):
+        _CountingModel.loads += 1
+        self.model_file = model_file
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        ModelRegistry.clear()
+        ModelRegistry.MODEL_LOADERS[".counting"] = _CountingModel
+        _CountingModel.loads = 0
+    
+    def tearDown(self) -> None:
+        ModelRegistry.MODEL_LOADERS.pop(".counting")
+        ModelRegistry.clear()
+    
+    def test_model_is_loaded_once(self):
+        self.assertFalse(ModelRegistry.is_loaded("model.counting"))
+        model = ModelRegistry.get_model("model.counting")
+        self.assertIs(ModelRegistry.get_model("model.counting"), model)
+        self.assertEqual(_CountingModel.loads, 1)
+        self.assertTrue(ModelRegistry.is_loaded("model.counting"))
+    
+    def test_unknown_file_type(self):
+        with self.assertRaises(ValueError):
+            ModelRegistry.get_model("model.unknown")
+
+if __name__ == "__main__":
+    unittest.main()
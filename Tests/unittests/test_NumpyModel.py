@@ -0,0 +1,50 @@
+import unittest
+import tempfile
+import sys
+import os
+import numpy as np
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Model.NumpyModel import NumpyModel, fold_batch_norms, save_model
+
+class TestNumpyModel(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(1)
+        def bn(n):
+            return ("batchnorm", rng.uniform(0.5,2,n), rng.normal(size=n), rng.normal(size=n), rng.uniform(0.5,2,n), 0.001)
+        def dense(n_in, n_out, act):
+            return ("dense", rng.normal(size=(n_in,n_out)) / np.sqrt(n_in), rng.normal(size=n_out), act)
+        self.layers = [bn(20), dense(20,16,"relu"), bn(16), bn(16), dense(16,8,"tanh"), dense(8,1,"sigmoid")]
+        self.X = rng.integers(-1, 8, size=(50,20)).astype(np.float32)
+    
+    def _unfolded_predict(self, X):
+        h = X.astype(np.float64)
+        acts = {"relu" : lambda x : np.maximum(x,0), "tanh" : np.tanh, "sigmoid" : lambda x : 1/(1+np.exp(-x))}
+        for layer in self.layers:
+            if layer[0] == "batchnorm":
+                gamma, beta, mean, var, eps = layer[1:]
+                h = gamma * (h - mean) / np.sqrt(var + eps) + beta
+            else:
+                h = acts[layer[3]](h @ layer[1] + layer[2])
+        return h
+    
+    def test_folded_model_matches_layers(self):
+        weights, biases, activations = fold_batch_norms(self.layers)
+        self.assertEqual(activations, ["relu","tanh","sigmoid"])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "model.npz")
+            save_model(path, weights, biases, activations)
+            model = NumpyModel(path)
+        out = model.predict(self.X)
+        self.assertEqual(out.shape, (50,1))
+        self.assertEqual(out.dtype, np.float32)
+        self.assertTrue(np.allclose(out, self._unfolded_predict(self.X), atol=1e-5))
+    
+    def test_trailing_batch_norm_is_rejected(self):
+        with self.assertRaises(ValueError):
+            fold_batch_norms(self.layers[:2] + self.layers[2:3])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import random
+import sys
+import os
+import tempfile
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Player import OpeningBook
+
+def rename_suits(cards, triumph : str, rng : random.Random):
+    """ Randomly rename the non-triumph suits of the cards """
+    t = "CDHS".index(triumph)
+    others = [s for s in range(4) if s != t]
+    renamed = others.copy()
+    rng.shuffle(renamed)
+    suit_map = list(range(4))
+    for s, r in zip(others, renamed):
+        suit_map[s] = r
+    return [c - c % 4 + suit_map[c % 4] for c in cards]
+
+class TestOpeningBook(unittest.TestCase):
+    def test_hand_index(self):
+        self.assertEqual(OpeningBook.hand_index(0b111111), 0)
+        self.assertEqual(OpeningBook.hand_index(0b111111 << 46), OpeningBook.NHANDS - 1)
+        rng = random.Random(0)
+        hands = set(sum(1 << c for c in rng.sample(range(52), 6)) for _ in range(1000))
+        self.assertEqual(len(set(OpeningBook.hand_index(hand) for hand in hands)), len(hands))
+
+    def test_renamed_suits_share_the_entry(self):
+        rng = random.Random(1)
+        book = OpeningBook.OpeningBook(4)
+        for _ in range(100):
+            triumph = rng.choice("CDHS")
+            cards = rng.sample(range(52), 6)
+            play = cards[:2]
+            book.set(sum(1 << c for c in cards), triumph, sum(1 << c for c in play))
+            renamed = rename_suits(cards, triumph, rng)
+            canonical = OpeningBook.canonical_hand(sum(1 << c for c in cards), triumph)[0]
+            self.assertEqual(OpeningBook.canonical_hand(sum(1 << c for c in renamed), triumph)[0], canonical)
+            got = book.get(sum(1 << c for c in renamed), triumph)
+            # The play is the renamed play, or an equivalent play in a suit with the same values in the hand
+            self.assertEqual(got.bit_count(), 2)
+            self.assertEqual(sorted(c // 4 for c in OpeningBook.iter_bits(got)), sorted(c // 4 for c in play))
+            self.assertEqual(book.get(sum(1 << c for c in renamed), triumph) & ~sum(1 << c for c in renamed), 0)
+
+    def test_save_and_load(self):
+        book = OpeningBook.OpeningBook(3)
+        hand = sum(1 << c for c in range(0, 24, 4))
+        book.set(hand, "S", 1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "book.npz")
+            book.save(path)
+            loaded = OpeningBook.OpeningBook.load(path)
+        self.assertEqual(loaded.nplayers, 3)
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded.get(hand, "S"), 1)
+
+if __name__ == "__main__":
+    unittest.main()
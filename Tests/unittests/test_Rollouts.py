@@ -0,0 +1,48 @@
+import unittest
+import sys
+import os
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Game import FastGame
+from Moska.Game.Game import MoskaGame
+from Moska.Game.GameState import GameState
+from Moska.Game.Rollouts import RolloutEvaluator
+
+class TestRolloutEvaluator(unittest.TestCase):
+    game = None
+    def setUp(self) -> None:
+        self.game = MoskaGame(nplayers=4, random_seed=1)
+        # Start the game, without playing it
+        self.game._set_triumph()
+        self.game._create_locks()
+        self.game._start_players()
+
+    def test_evaluate_game_doesnt_change_the_game(self):
+        vector = GameState.from_game(self.game).as_vector()
+        deck = list(self.game.deck.cards)
+        for policy in (FastGame.heuristic_action, FastGame.random_action):
+            losses = RolloutEvaluator(policy, seed=0).evaluate_game(self.game, 20, player=self.game.players[0])
+            self.assertEqual(len(losses), 4)
+            self.assertAlmostEqual(losses.sum(), 1)
+        self.assertEqual(GameState.from_game(self.game).as_vector(), vector)
+        self.assertEqual(list(self.game.deck.cards), deck)
+
+    def test_evaluate_state(self):
+        state = GameState.from_game(self.game)
+        game = FastGame.FastGame.from_state(state)
+        self.assertEqual(game.triumph, self.game.triumph)
+        self.assertEqual(game.target, self.game.get_target_player().pid)
+        self.assertEqual(game.current, self.game.get_initiating_player().pid)
+        losses = RolloutEvaluator(seed=0).evaluate_state(state, 20)
+        self.assertAlmostEqual(losses.sum(), 1)
+
+    def test_evaluate_ended_game(self):
+        # Player 0 has finished, so player 1 lost
+        game = FastGame.FastGame([0, 1 << 10], [], "S", current=1, ranks=[1, None])
+        game.current = game._next_player(0)
+        self.assertEqual(list(RolloutEvaluator().evaluate(game, 5)), [0, 1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+import sys
+import os
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Game.Deck import Card
+from Moska.Player._ScoreCards import _ScoreCards
+
+class TestScoreCards(unittest.TestCase):
+    def test_scores_are_per_player(self):
+        card = Card(10, "H")
+        first = _ScoreCards(None)
+        second = _ScoreCards(None)
+        first.methods["one"] = lambda c : 1
+        second.methods["two"] = lambda c : 2
+        first._assign_scores([card], "one")
+        self.assertEqual(first.get_score(card), 1)
+        self.assertIsNone(second.get_score(card))
+        second._assign_scores([card], "two")
+        self.assertEqual(first.get_score(card), 1)
+        self.assertEqual(second.get_score(card), 2)
+
+if __name__ == "__main__":
+    unittest.main()
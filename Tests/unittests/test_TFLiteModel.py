@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+import types
+from unittest import mock
+import numpy as np
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Model.TFLiteModel import TFLiteModel
+
+class _StubInterpreter:
+    """ An interpreter of a model, that sums the inputs. Records the shapes of the inputs. """
+    input_shapes = []
+    def __init__(self, model_path):
+        self.shape = (1, 3)
+
+    def get_input_details(self):
+        return [{"index" : 0, "shape" : np.array([1, 3]), "dtype" : np.float32, "quantization" : (0.0, 0)}]
+
+    def get_output_details(self):
+        return [{"index" : 1, "dtype" : np.float32, "quantization" : (0.0, 0)}]
+
+    def resize_tensor_input(self, index, shape):
+        self.shape = tuple(shape)
+
+    def allocate_tensors(self):
+        pass
+
+    def set_tensor(self, index, X):
+        assert X.shape == self.shape, f"Input of shape {X.shape} to a tensor of shape {self.shape}"
+        _StubInterpreter.input_shapes.append(X.shape)
+        self.X = X.copy()
+
+    def invoke(self):
+        self.out = self.X.sum(axis=1, keepdims=True)
+
+    def get_tensor(self, index):
+        return self.out.copy()
+
+class TestTFLiteModel(unittest.TestCase):
+    def setUp(self) -> None:
+        stub = types.ModuleType("tensorflow")
+        stub.lite = types.SimpleNamespace(Interpreter=_StubInterpreter)
+        patcher = mock.patch.dict(sys.modules, {"tensorflow" : stub})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        _StubInterpreter.input_shapes = []
+        self.model = TFLiteModel("model.tflite")
+
+    def test_inputs_are_padded_to_buckets(self):
+        for n, bucket in ((1, 1), (5, 8), (8, 8), (9, 64), (3, 8)):
+            X = np.random.rand(n, 3).astype(np.float32)
+            evals = self.model.predict(X)
+            self.assertEqual(_StubInterpreter.input_shapes[-1], (bucket, 3))
+            self.assertEqual(evals.shape, (n, 1))
+            self.assertTrue(np.allclose(evals, X.sum(axis=1, keepdims=True)))
+
+    def test_large_batches_are_split(self):
+        X = np.random.rand(2500, 3).astype(np.float32)
+        evals = self.model.predict(X)
+        self.assertEqual(_StubInterpreter.input_shapes, [(1024, 3)]*3)
+        self.assertEqual(evals.shape, (2500, 1))
+        self.assertTrue(np.allclose(evals, X.sum(axis=1, keepdims=True)))
+
+    def test_empty_batch(self):
+        self.assertEqual(self.model.predict(np.empty((0, 3), dtype=np.float32)).shape, (0, 1))
+
+if __name__ == "__main__":
+    unittest.main()
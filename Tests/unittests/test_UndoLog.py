@@ -0,0 +1,44 @@
+import unittest
+import sys
+import os
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
+SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
+#print(SCRIPT_DIR)
+sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
+from Moska.Game import Game, UndoLog
+
+class TestUndoLog(unittest.TestCase):
+    game = None
+    def setUp(self) -> None:
+        self.game = Game.MoskaGame(nplayers=4)
+        self.hand = self.game.players[0].hand
+
+    def test_undo_restores_hand_and_deck(self):
+        cards = list(self.hand.cards)
+        mask = self.hand.card_set.mask
+        deck = list(self.game.deck.cards)
+        log = UndoLog.UndoLog(self.game)
+        log.save_hand(self.hand)
+        log.save_deck(6)
+        self.hand.pop_cards(max_cards=4)
+        self.hand.draw(4)
+        log.undo()
+        self.assertEqual(self.hand.cards, cards)
+        self.assertEqual(self.hand.card_set.mask, mask)
+        self.assertEqual(list(self.game.deck.cards), deck)
+
+    def test_undo_is_inplace(self):
+        table = self.game.cards_to_fall
+        table_cards = list(table)
+        log = UndoLog.UndoLog(self.game)
+        log.save_list(table)
+        log.save_attr(self.game.turnCycle, "ptr")
+        self.game.add_cards_to_fall(self.hand.cards[:2])
+        self.game.turnCycle.get_next()
+        log.undo()
+        self.assertIs(self.game.cards_to_fall, table)
+        self.assertEqual(table, table_cards)
+        self.assertEqual(self.game.turnCycle.ptr, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,7 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__)).split("/")
 SCRIPT_DIR = "\\".join(SCRIPT_DIR[0:-2])
 #print(SCRIPT_DIR)
 sys.path.insert(1,os.path.dirname(SCRIPT_DIR))
-from Moska import Hand,Game,Deck,utils, Player
+from Moska.Game import Hand,Game,Deck,utils
 
 class TestUtils(unittest.TestCase):
     game = None
@@ -23,6 +23,11 @@ class TestUtils(unittest.TestCase):
         #del self.deck, self.game.turnCycle, self.game, self.player, self.game
         return super().tearDown()
     
+    def test_can_fall_mask_of_unknown_card(self):
+        self.assertEqual(utils.can_fall_mask(Deck.Card(2,"H"),"H") >> Deck.Card(14,"S").id & 1, 1)
+        with self.assertRaises(ValueError):
+            utils.can_fall_mask(Deck.UNKNOWN_CARD,"H")
+
     def test_can_fall(self):
         cards = []
         triumph = "H"
@@ -68,8 +73,45 @@ class TestUtils(unittest.TestCase):
         self.assertTrue(not out)
         tc.ptr = 0
     
-                
-                
+
+
+class TestCanFallMasks(unittest.TestCase):
+    def test_masks_match_rule(self):
+        deck = Deck.StandardDeck(shuffle = False).pop_cards(52)
+        for triumph in utils.CARD_SUITS:
+            for card in deck:
+                for fcard in deck:
+                    expected = (card.suit == fcard.suit and card.value > fcard.value) or (card.suit == triumph and fcard.suit != triumph)
+                    self.assertEqual(utils.check_can_fall_card(card,fcard,triumph), expected)
+    
+    def test_can_fall_mask(self):
+        deck = Deck.StandardDeck(shuffle = False).pop_cards(52)
+        # The triumph ace can fall every other card
+        self.assertEqual(bin(utils.can_fall_mask(Deck.Card(14,"S"),"S")).count("1"), 51)
+        # A non-triumph 2 can't fall anything
+        self.assertEqual(utils.can_fall_mask(Deck.Card(2,"H"),"S"), 0)
+    
+    def test_iter_assignments_distinct(self):
+        # Two rows that can both fall both columns: 4 single pairs and 2 full matchings
+        assignments = list(utils.iter_assignments([0b11, 0b11]))
+        self.assertEqual(len(assignments), 6)
+        self.assertEqual(len(set(frozenset(zip(a[::2],a[1::2])) for a in assignments)), 6)
+        # A row that can't fall anything is never assigned
+        self.assertEqual(list(utils.iter_assignments([0, 0b1])), [(1, 0)])
+        # The limits stop the search
+        self.assertEqual(len(list(utils.iter_assignments([2**20 - 1]*20, max_assignments=50))), 50)
+        self.assertLess(len(list(utils.iter_assignments([2**20 - 1]*20, max_work=1000))), 1000)
+    
+    def test_iter_random_plays(self):
+        cards = [Deck.Card(2,"H"), Deck.Card(2,"S"), Deck.Card(3,"H"), Deck.Card(5,"C"), Deck.Card(5,"D")]
+        # All non-empty subsets of at most 3 cards
+        plays = list(utils.iter_random_plays(cards, max_size=3))
+        self.assertEqual(len(plays), 5 + 10 + 10)
+        self.assertEqual(len(set(frozenset(p) for p in plays)), len(plays))
+        # Initial plays: the 5 single cards, the two pairs and both pairs
+        plays = list(utils.iter_random_plays(cards, max_size=5, min_per_value=2, include_singles=True))
+        self.assertEqual(len(plays), 8)
+        self.assertIn(frozenset(cards[:2] + cards[3:]), set(frozenset(p) for p in plays))
       
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -14,6 +14,8 @@ from Moska.Player.MoskaBot0 import MoskaBot0
 from Moska.Player.MoskaBot1 import MoskaBot1
 from Moska.Player.RandomPlayer import RandomPlayer
 from Moska.Player.ModelBot import ModelBot
+from Moska.Model import ModelRegistry
+from Moska.Model.InferenceServer import InferenceServer
 import random
 import numpy as np
 from scipy.optimize import minimize
@@ -93,9 +95,9 @@ def args_to_game(
 def play_as_human():
     players = [
         (HumanPlayer,lambda x : {"name":"Human-","log_file":"human.log"}),
-        (ModelBot,lambda x : {"name" : f"M-{x}-1-","log_file":f"Game-{x}-M-1.log","log_level" : logging.DEBUG, "model_file":"/home/ilmari/python/moska/Model5-300/model.h5"}),
-        (ModelBot,lambda x : {"name" : f"M-{x}-2-","log_file":f"Game-{x}-M-2.log","log_level" : logging.DEBUG, "model_file":"/home/ilmari/python/moska/Model5-300/model.h5"}),
-        (ModelBot,lambda x :{f"log_file" : f"M-{x}-3-.log","log_level" : logging.DEBUG, "model_file":"/home/ilmari/python/moska/Model5-300/model.h5"})
+        (ModelBot,lambda x : {"name" : f"M-{x}-1-","log_file":f"Game-{x}-M-1.log","log_level" : logging.DEBUG, "model_file":"/home/ilmari/python/moska/Model5-300/model.tflite"}),
+        (ModelBot,lambda x : {"name" : f"M-{x}-2-","log_file":f"Game-{x}-M-2.log","log_level" : logging.DEBUG, "model_file":"/home/ilmari/python/moska/Model5-300/model.tflite"}),
+        (ModelBot,lambda x :{f"log_file" : f"M-{x}-3-.log","log_level" : logging.DEBUG, "model_file":"/home/ilmari/python/moska/Model5-300/model.tflite"})
                ]
     gamekwargs = lambda x : {
         "log_file" : "Humangame.log",
@@ -117,6 +119,7 @@ def play_games(players : List[Tuple[AbstractPlayer,Callable]],
                chunksize : int = -1,
                shuffle_player_order = True,
                disable_logging = False,
+               use_inference_server = False,
                ):
     """ Simulate moska games with specified players. Return loss percent of each player.
     The players are specified by a list of tuples, with AbstractPlayer subclass and argument pairs.
@@ -128,6 +131,8 @@ def play_games(players : List[Tuple[AbstractPlayer,Callable]],
         cpus (int, optional): Number of processes to start simultaneously. Defaults to the number of cpus.
         chunksize (int, optional): How many games to initially give each process. Defaults to defaults to n // cpus.
         shuffle_player_order (bool, optional) : Whether to randomly shuffle the player order in the game.
+        use_inference_server (bool, optional) : Whether to evaluate the models of all processes in a single InferenceServer process,
+        which combines the evaluations of the games to larger batches. Defaults to False.
 
     Returns:
         Dict: _description_
@@ -140,27 +145,38 @@ def play_games(players : List[Tuple[AbstractPlayer,Callable]],
     
     arg_gen = (args_to_game(game_kwargs,players,i,shuffle_player_order,disable_logging=disable_logging) for i in range(n))
     results = []
-    print(f"Starting a pool with {cpus} processes and {chunksize} chunksize...")
-    with multiprocessing.Pool(cpus) as pool:
-        print("Games running...")
-        gen = pool.imap_unordered(run_game,arg_gen,chunksize = chunksize)
-        failed_games = 0
-        state_data = []
-        start = time.time()
-        while gen and time.time() - start < 800:
-            if int(time.time() - start) % 10 == 0:
-                print("Elapsed time: ",time.time() - start,"s")
-            try:
-                res,states = next(gen)
-            except StopIteration as si:
-                break
-            if res is None:
-                failed_games += 1
-                res = None
-            if states is not None:
-                state_data += states
-            #print(res)
-            results.append(res)
+    pool_kwargs = {}
+    server = None
+    if use_inference_server:
+        server = InferenceServer()
+        server.start()
+        pool_kwargs = {"initializer" : ModelRegistry.connect, "initargs" : (server.handle,)}
+    try:
+        print(f"Starting a pool with {cpus} processes and {chunksize} chunksize...")
+        with multiprocessing.Pool(cpus,**pool_kwargs) as pool:
+            print("Games running...")
+            gen = pool.imap_unordered(run_game,arg_gen,chunksize = chunksize)
+            failed_games = 0
+            state_data = []
+            start = time.time()
+            while gen and time.time() - start < 800:
+                if int(time.time() - start) % 10 == 0:
+                    print("Elapsed time: ",time.time() - start,"s")
+                try:
+                    res,states = next(gen)
+                except StopIteration as si:
+                    break
+                if res is None:
+                    failed_games += 1
+                    res = None
+                if states is not None:
+                    state_data += states
+                #print(res)
+                results.append(res)
+    finally:
+        # Stop the server also if the pool fails, so the process isn't left running
+        if server is not None:
+            server.stop()
     print(f"Simulated {len(results)} games. {len(results) - failed_games} succesful games. {failed_games} failed.")
     print(f"Time taken: {time.time() - start_time}")
     ranks = {}